@@ -1,4 +1,5 @@
 import os
+import sys
 import tempfile
 import streamlit as st
 from langchain_openai import ChatOpenAI
@@ -12,11 +13,20 @@ from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationalRetrievalChain
 from dotenv import load_dotenv
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.telemetry import CHUNKING, EMBEDDING, PDF, llm_callbacks, span
+from sutra_common.token_budget import session_budget
+
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("SUTRA_API_KEY")
 embedding_api_key = os.getenv("OPENAI_API_KEY")  
 
+# Chunks retrieved per question; fewer once the session nears its token budget
+RETRIEVER_K = 4
+
 # Page configuration
 st.set_page_config(
     page_title="Sutra RAG Chat",
@@ -50,20 +60,21 @@ class StreamHandler(BaseCallbackHandler):
 def get_streaming_chat_model(callback_handler=None):
     return ChatOpenAI(
         api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
         streaming=True,
-        callbacks=[callback_handler] if callback_handler else None
+        callbacks=llm_callbacks(callback_handler)
     )
 
 # Get regular chat model for RAG
 def get_chat_model():
     return ChatOpenAI(
         api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
-        temperature=0.7
+        temperature=0.7,
+        callbacks=llm_callbacks()
     )
 
 # Initialize session state
@@ -81,30 +92,35 @@ def process_documents(uploaded_files, chunk_size=1000, chunk_overlap=100):
     documents = []
     temp_dir = tempfile.TemporaryDirectory()
     
-    for file in uploaded_files:
-        # Save the uploaded file to a temporary file
-        temp_path = os.path.join(temp_dir.name, file.name)
-        with open(temp_path, "wb") as f:
-            f.write(file.getbuffer())
-        
-        # Process based on file type
-        if file.name.endswith(".pdf"):
-            loader = PyPDFLoader(temp_path)
-            documents.extend(loader.load())
-        elif file.name.endswith(".docx"):
-            loader = Docx2txtLoader(temp_path)
-            documents.extend(loader.load())
+    with span("rag.load", PDF, files=len(uploaded_files)) as load_span:
+        for file in uploaded_files:
+            # Save the uploaded file to a temporary file
+            temp_path = os.path.join(temp_dir.name, file.name)
+            with open(temp_path, "wb") as f:
+                f.write(file.getbuffer())
+            
+            # Process based on file type
+            if file.name.endswith(".pdf"):
+                loader = PyPDFLoader(temp_path)
+                documents.extend(loader.load())
+            elif file.name.endswith(".docx"):
+                loader = Docx2txtLoader(temp_path)
+                documents.extend(loader.load())
+        load_span.set_attribute("pages", len(documents))
     
     # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
-    )
-    document_chunks = text_splitter.split_documents(documents)
+    with span("rag.split", CHUNKING, chunk_size=chunk_size) as split_span:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        document_chunks = text_splitter.split_documents(documents)
+        split_span.set_attribute("chunks", len(document_chunks))
     
     # Create embeddings and vector store
-    embeddings = OpenAIEmbeddings(api_key=embedding_api_key)
-    vectorstore = FAISS.from_documents(document_chunks, embeddings)
+    with span("rag.index", EMBEDDING, chunks=len(document_chunks)):
+        embeddings = OpenAIEmbeddings(api_key=embedding_api_key)
+        vectorstore = FAISS.from_documents(document_chunks, embeddings)
     
     # Create conversation chain
     memory = ConversationBufferMemory(
@@ -114,7 +130,7 @@ def process_documents(uploaded_files, chunk_size=1000, chunk_overlap=100):
     
     conversation_chain = ConversationalRetrievalChain.from_llm(
         llm=get_chat_model(),
-        retriever=vectorstore.as_retriever(),
+        retriever=vectorstore.as_retriever(search_kwargs={"k": RETRIEVER_K}),
         memory=memory
     )
     
@@ -153,6 +169,12 @@ with st.sidebar:
     
     st.divider()
     st.markdown(f"Responses will be in: **{selected_language}**")
+    
+    # Token use of this session
+    with st.expander("🪙 Token usage"):
+        budget = session_budget(st.session_state)
+        st.caption(budget.summary())
+        st.dataframe(budget.report(), use_container_width=True, hide_index=True)
 
 # Main chat area
 if not st.session_state.documents_processed:
@@ -187,8 +209,12 @@ else:
                 # Get streaming model with handler
                 chat = get_streaming_chat_model(stream_handler)
                 
-                # Get RAG context first
-                rag_response = st.session_state.conversation.invoke(user_input)
+                # Get RAG context first; the callbacks reach the retriever as well as the model
+                budget = session_budget(st.session_state)
+                st.session_state.conversation.retriever.search_kwargs["k"] = budget.scale(RETRIEVER_K)
+                rag_response = st.session_state.conversation.invoke(
+                    user_input, config={"callbacks": llm_callbacks(budget.callback("rag.retrieve"))}
+                )
                 context = rag_response["answer"]
                 
                 # Now generate a response with Sutra in the selected language
@@ -206,7 +232,7 @@ else:
                     HumanMessage(content=f"{system_message}\n\nQuestion: {user_input}")
                 ]
                 
-                response = chat.invoke(messages)
+                response = chat.invoke(messages, config={"callbacks": [budget.callback("rag.answer")]})
                 answer = response.content
                 
                 # Add assistant response to chat history
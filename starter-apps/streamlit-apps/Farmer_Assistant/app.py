@@ -1,10 +1,17 @@
 import os
+import sys
 import streamlit as st
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.callbacks.base import BaseCallbackHandler
 from dotenv import load_dotenv
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.single_flight import invoke_coalesced
+from sutra_common.telemetry import llm_callbacks
+
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("SUTRA_API_KEY")
@@ -109,21 +116,10 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model():
     return ChatOpenAI(
         api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
-        model="sutra-v2",
-        temperature=0.7,
-    )
-
-# Create a streaming version of the model with callback handler
-def get_streaming_chat_model(callback_handler=None):
-    # Create a new instance with streaming enabled
-    return ChatOpenAI(
-        api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
-        streaming=True,
-        callbacks=[callback_handler] if callback_handler else None
+        callbacks=llm_callbacks()
     )
 
 # Sidebar for advanced chat options
@@ -222,9 +218,6 @@ if user_input:
             # Create a stream handler
             stream_handler = StreamHandler(response_placeholder)
             
-            # Get streaming model with handler
-            chat = get_streaming_chat_model(stream_handler)
-            
             # Create system message for the farming assistant with detailed context
             system_message = f"""You are Krishi Mitra (कृषि मित्र), a specialized farming assistant for agricultural advice.
             The farmer is asking about: {selected_main_category} > {selected_subcategory}.
@@ -247,7 +240,8 @@ if user_input:
                 HumanMessage(content=user_input)
             ]
             
-            response = chat.invoke(messages)
+            # Identical concurrent requests share one upstream call and its streamed tokens
+            response = invoke_coalesced(get_base_chat_model(), messages, stream_handler)
             answer = response.content
             
             # Add assistant response to chat history
@@ -3,7 +3,14 @@ from educhain import Educhain, LLMConfig
 from educhain.engines import qna_engine
 from langchain_openai import ChatOpenAI
 import os
+import sys
 from dotenv import load_dotenv
+from sharded_generation import SHARD_SIZE, generate_sharded
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.telemetry import llm_callbacks
 
 # Load environment variables if available
 load_dotenv()
@@ -48,7 +55,14 @@ with st.sidebar:
     selected_language = st.selectbox("Language for questions:", languages)
     
     # Number of questions
-    num_questions = st.slider("Number of Questions", 1, 8, 3)
+    num_questions = st.slider("Number of Questions", 1, 50, 3)
+
+    # Parallel shards keep large sets about as fast as small ones
+    sharded_mode = st.checkbox(
+        "Generate in parallel batches",
+        value=True,
+        help=f"Splits the request into concurrent batches of {SHARD_SIZE} questions, each on a different angle of the topic, then removes duplicates"
+    )
     
     st.markdown("---")
     st.markdown("**Powered by** [Educhain](https://github.com/satvik314/educhain)")
@@ -63,41 +77,69 @@ def initialize_educhain(api_key):
 
     sutra_model = ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
-        temperature=0.9
+        temperature=0.9,
+        callbacks=llm_callbacks()
     )
     llm_config = LLMConfig(custom_model=sutra_model)
     return Educhain(llm_config)
 
-# --- Utility Function to Display Questions ---
+# --- Utility Functions to Display Questions ---
+def display_question(number, question):
+    st.subheader(f"Question {number}:")
+
+    if hasattr(question, 'options'):  # Multiple Choice
+        st.write(f"**Question:** {question.question}")
+        st.write("**Options:**")
+        for j, option in enumerate(question.options):
+            st.write(f"   {chr(65 + j)}. {option}")
+        if hasattr(question, 'answer'):
+            st.write(f"**Correct Answer:** {question.answer}")
+        if hasattr(question, 'explanation') and question.explanation:
+            st.write(f"**Explanation:** {question.explanation}")
+
+    else:  # Short Answer, True/False, Fill in the Blank
+        st.write(f"**Question:** {question.question}")
+        if hasattr(question, 'answer'):
+            st.write(f"**Answer:** {question.answer}")
+        if hasattr(question, 'explanation') and question.explanation:
+            st.write(f"**Explanation:** {question.explanation}")
+        if hasattr(question, 'keywords') and question.keywords:  # Display keywords if present
+            st.write(f"**Keywords:** {', '.join(question.keywords)}")
+
+    st.markdown("---")
+
 def display_questions(questions, language):
     if questions and hasattr(questions, "questions"):
         st.success(f"Generated {len(questions.questions)} questions in {language}")
-        
+
         for i, question in enumerate(questions.questions):
-            st.subheader(f"Question {i + 1}:")
-
-            if hasattr(question, 'options'):  # Multiple Choice
-                st.write(f"**Question:** {question.question}")
-                st.write("**Options:**")
-                for j, option in enumerate(question.options):
-                    st.write(f"   {chr(65 + j)}. {option}")
-                if hasattr(question, 'answer'):
-                    st.write(f"**Correct Answer:** {question.answer}")
-                if hasattr(question, 'explanation') and question.explanation:
-                    st.write(f"**Explanation:** {question.explanation}")
-
-            else:  # Short Answer, True/False, Fill in the Blank
-                st.write(f"**Question:** {question.question}")
-                if hasattr(question, 'answer'):
-                    st.write(f"**Answer:** {question.answer}")
-                if hasattr(question, 'explanation') and question.explanation:
-                    st.write(f"**Explanation:** {question.explanation}")
-                if hasattr(question, 'keywords') and question.keywords:  # Display keywords if present
-                    st.write(f"**Keywords:** {', '.join(question.keywords)}")
-
-            st.markdown("---")
+            display_question(i + 1, question)
+
+def display_questions_progressively(results, num, language):
+    """Render each batch of questions as soon as it arrives"""
+    status = st.empty()
+    progress = st.progress(0.0)
+    shown = 0
+    failures = []
+    status.info(f"Generating {num} questions in {language}...")
+    for result in results:
+        if result.error is not None:
+            failures.append(result.error)
+        for question in result.questions:
+            shown += 1
+            display_question(shown, question)
+        progress.progress(min(shown / num, 1.0))
+        status.info(f"Generated {shown} of {num} questions in {language}...")
+    progress.empty()
+
+    if shown == 0:
+        status.error(f"Failed to generate questions: {str(failures[0]) if failures else 'no questions returned'}")
+    elif shown < num:
+        status.warning(f"Generated {shown} of {num} questions in {language}; some batches failed or only repeated earlier questions")
+    else:
+        status.success(f"Generated {shown} questions in {language}")
 
 # Function to add language instruction to custom instructions
 def add_language_instruction(custom_instr, language):
@@ -145,11 +187,24 @@ language_custom_instructions = add_language_instruction(custom_instructions, sel
 
 # Generate button
 if st.button("Generate Questions"):
-    with st.spinner(f"Generating {num_questions} {selected_question_type.lower()} questions in {selected_language}..."):
-        questions = qna_engine.generate_questions(
-            topic=topic,
-            num=num_questions,
-            question_type=selected_question_type,
-            custom_instructions=language_custom_instructions
+    if sharded_mode and num_questions > SHARD_SIZE:
+        display_questions_progressively(
+            generate_sharded(
+                qna_engine,
+                topic=topic,
+                num=num_questions,
+                question_type=selected_question_type,
+                custom_instructions=language_custom_instructions
+            ),
+            num_questions,
+            selected_language
         )
-        display_questions(questions, selected_language)
+    else:
+        with st.spinner(f"Generating {num_questions} {selected_question_type.lower()} questions in {selected_language}..."):
+            questions = qna_engine.generate_questions(
+                topic=topic,
+                num=num_questions,
+                question_type=selected_question_type,
+                custom_instructions=language_custom_instructions
+            )
+            display_questions(questions, selected_language)
@@ -0,0 +1,117 @@
+import os
+import sys
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Set
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.near_duplicates import is_near_duplicate, token_set
+
+# Small shards keep each request short and well inside the output limit
+SHARD_SIZE = 5
+# Enough for the 50-question maximum to run as a single round
+MAX_WORKERS = 10
+
+# Rotated across shards so parallel requests do not all write the same obvious questions
+ANGLES = [
+    "core definitions and basic facts",
+    "real-world applications and everyday examples",
+    "history, discoveries and key people",
+    "causes, effects and underlying processes",
+    "common misconceptions",
+    "comparisons and differences between related ideas",
+    "problem solving and applying the concepts",
+    "recent developments and open questions",
+    "important numbers, dates and measurements",
+    "vocabulary and terminology",
+]
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    size: int
+    hint: str
+
+
+@dataclass
+class ShardResult:
+    """Questions one shard added after de-duplication, or the error it failed with"""
+    shard: Shard
+    questions: List[Any]
+    error: Optional[Exception] = None
+
+
+def plan_shards(num: int, shard_size: int = SHARD_SIZE, seed: Optional[int] = None) -> List[Shard]:
+    """Split num questions into shards, each with its own angle on the topic"""
+    rng = random.Random(seed)
+    angles = rng.sample(ANGLES, len(ANGLES))
+    shards = []
+    for index, start in enumerate(range(0, num, shard_size)):
+        angle = angles[index % len(angles)]
+        hint = (
+            f"Focus on {angle}. This is part {index + 1} of a larger set, "
+            f"so avoid the most obvious questions on the topic (variation seed {rng.randint(1000, 9999)})."
+        )
+        shards.append(Shard(index, min(shard_size, num - start), hint))
+    return shards
+
+
+def generate_sharded(
+    qna_engine: Any,
+    topic: str,
+    num: int,
+    question_type: str,
+    custom_instructions: str = "",
+    shard_size: int = SHARD_SIZE,
+    max_workers: int = MAX_WORKERS
+) -> Iterator[ShardResult]:
+    """
+    Generate num questions as concurrent shards, yielding each shard's new questions as it finishes
+
+    Questions that repeat an earlier one are dropped. If that leaves the set short, one more
+    round of shards is requested for the difference, so the total wall time stays around two
+    shard latencies at worst. Runs the requests on worker threads; consume it on the script thread.
+    """
+    seen: List[Set[str]] = []
+    kept = 0
+    shards = plan_shards(num, shard_size)
+    for _ in range(2):
+        workers = max(1, min(max_workers, len(shards)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="question-shard") as executor:
+            futures = {
+                executor.submit(
+                    qna_engine.generate_questions,
+                    topic=topic,
+                    num=shard.size,
+                    question_type=question_type,
+                    custom_instructions=f"{custom_instructions} {shard.hint}".strip()
+                ): shard
+                for shard in shards
+            }
+            for future in as_completed(futures):
+                shard = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield ShardResult(shard, [], e)
+                    continue
+                fresh = []
+                for question in getattr(result, "questions", None) or []:
+                    tokens = token_set(getattr(question, "question", ""))
+                    if kept >= num or not tokens or any(is_near_duplicate(tokens, other) for other in seen):
+                        continue
+                    seen.append(tokens)
+                    fresh.append(question)
+                    kept += 1
+                yield ShardResult(shard, fresh)
+
+        missing = num - kept
+        if missing <= 0:
+            return
+        shards = [
+            Shard(len(shards) + shard.index, shard.size, shard.hint)
+            for shard in plan_shards(missing, shard_size)
+        ]
@@ -0,0 +1,54 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sharded_generation import generate_sharded
+
+HINDI_QUESTIONS = [
+    "पानी का रंग क्या है?",
+    "पेन का रंग क्या है?",
+    "पीना का रंग क्या है?",
+    "पौना का रंग क्या है?",
+    "पूनी का रंग क्या है?",
+    "पिन का रंग क्या है?",
+]
+
+
+class _Engine:
+    """Returns the scripted question lists in order, one per generate_questions() call"""
+
+    def __init__(self, batches):
+        self._batches = list(batches)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_questions(self, topic, num, question_type, custom_instructions):
+        with self._lock:
+            self.calls += 1
+            batch = self._batches.pop(0) if self._batches else []
+        return SimpleNamespace(questions=[SimpleNamespace(question=text) for text in batch])
+
+
+def _questions(results):
+    return [question.question for result in results for question in result.questions]
+
+
+def test_hindi_questions_differing_in_vowel_signs_are_all_kept():
+    engine = _Engine([HINDI_QUESTIONS[:3], HINDI_QUESTIONS[3:]])
+
+    kept = _questions(generate_sharded(engine, "रंग", 6, "MCQ", shard_size=3))
+
+    assert sorted(kept) == sorted(HINDI_QUESTIONS)
+    # Nothing was dropped, so no top-up round was needed
+    assert engine.calls == 2
+
+
+def test_repeats_across_shards_are_dropped_and_topped_up():
+    engine = _Engine([HINDI_QUESTIONS[:3], ["पानी का रंग क्या है", *HINDI_QUESTIONS[3:5]], HINDI_QUESTIONS[5:]])
+
+    kept = _questions(generate_sharded(engine, "रंग", 6, "MCQ", shard_size=3, max_workers=1))
+
+    assert sorted(kept) == sorted(HINDI_QUESTIONS)
+    assert engine.calls == 3
@@ -1,14 +1,31 @@
 import streamlit as st
-from typing import Optional, List, Type, Any
+import re
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Type, Any, Iterator, Tuple
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain.output_parsers import PydanticOutputParser
 import os
+import sys
 from dotenv import load_dotenv
 load_dotenv()
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.streaming_json import StreamingJSONParser
+from sutra_common.structured_runtime import (
+    LLMConfig,
+    StructuredOutputError,
+    StructuredRuntime,
+    get_llm,
+    get_metrics,
+    get_prompt,
+)
+
+logger = logging.getLogger(__name__)
+
 # Set page configuration
 st.set_page_config(page_title="Multilingual Flashcard Generator", page_icon="🌐", layout="wide")
 
@@ -27,25 +44,6 @@ languages = [
     "Tagalog", "Swahili"
 ]
 
-class LLMConfig:
-    def __init__(
-        self,
-        api_key: Optional[str] = None,
-        model_name: str = "sutra-v2",
-        max_tokens: int = 1500,
-        temperature: float = 0.7,
-        custom_model: Optional[Any] = None,
-        base_url: Optional[str] = "https://api.two.ai/v2",
-        default_headers: Optional[dict] = None
-    ):
-        self.api_key = api_key
-        self.model_name = model_name
-        self.max_tokens = max_tokens
-        self.temperature = temperature
-        self.custom_model = custom_model
-        self.base_url = base_url
-        self.default_headers = default_headers
-
 class Flashcard(BaseModel):
     front: str = Field(..., description="The front side of the flashcard with a question or key term")
     back: str = Field(..., description="The back side of the flashcard with the answer or definition")
@@ -55,41 +53,33 @@ class FlashcardSet(BaseModel):
     title: str = Field(..., description="The title or topic of the flashcard set")
     flashcards: List[Flashcard] = Field(..., description="A list of flashcards in this set")
 
+# Focus areas used to split large decks into shards, with their share of the deck
+FOCUS_AREAS = [
+    ("foundational concepts", 0.3),
+    ("key terminology", 0.3),
+    ("important processes or procedures", 0.2),
+    ("advanced applications or edge cases", 0.2),
+]
+
+_FRONT_NOISE = re.compile(r"[\W_]+")
+
+def normalize_front(front: str) -> str:
+    """Key used to detect duplicate cards across shards"""
+    return _FRONT_NOISE.sub(" ", front.casefold()).strip()
+
 class ContentEngine:
     def __init__(self, llm_config: Optional[LLMConfig] = None):
         if llm_config is None:
             llm_config = LLMConfig()
-        self.llm = self._initialize_llm(llm_config)
+        self.llm = get_llm(llm_config)
+        self.runtime = StructuredRuntime(self.llm)
 
-    def _initialize_llm(self, llm_config: LLMConfig):
-        if llm_config.custom_model:
-            return llm_config.custom_model
-        else:
-            return ChatOpenAI(
-                model=llm_config.model_name,
-                api_key=llm_config.api_key,
-                max_tokens=llm_config.max_tokens,
-                temperature=llm_config.temperature,
-                base_url=llm_config.base_url,
-                default_headers=llm_config.default_headers
-            )
-    
-    def generate_flashcards(
+    def _flashcard_prompt(
         self,
-        topic: str,
-        language: str = "English",
-        num: int = 10,
+        format_instructions: str,
         prompt_template: Optional[str] = None,
-        custom_instructions: Optional[str] = None,
-        response_model: Optional[Type[Any]] = None,
-        llm: Optional[Any] = None,
-        **kwargs
-    ) -> FlashcardSet:
-        if response_model is None:
-            response_model = FlashcardSet
-        parser = PydanticOutputParser(pydantic_object=response_model)
-        format_instructions = parser.get_format_instructions()
-
+        custom_instructions: Optional[str] = None
+    ) -> PromptTemplate:
         if prompt_template is None:
             prompt_template = """
             You are an expert educational content creator specializing in creating high-quality, professional flashcards that meet industry standards. Your task is to generate a set of {num} exceptional flashcards on the topic: {topic}.
@@ -138,32 +128,250 @@ class ContentEngine:
               - explanation: Enhanced context with examples or applications
             """
 
+        # Instructions are filled in as a variable, so braces in them are never parsed as
+        # placeholders and the template text stays the same from request to request
+        input_variables = ["num", "topic", "language"]
         if custom_instructions:
-            prompt_template += f"\n\nAdditional Instructions:\n{custom_instructions}"
+            prompt_template += "\n\nAdditional Instructions:\n{custom_instructions}"
+            input_variables.append("custom_instructions")
 
         prompt_template += "\n\nThe response should be in JSON format.\n{format_instructions}"
 
-        flashcard_prompt = PromptTemplate(
-            input_variables=["num", "topic", "language"],
-            template=prompt_template,
-            partial_variables={"format_instructions": format_instructions}
+        return get_prompt(
+            prompt_template,
+            input_variables,
+            {"format_instructions": format_instructions}
         )
 
-        llm_to_use = llm if llm is not None else self.llm
-        flashcard_chain = flashcard_prompt | llm_to_use
-        results = flashcard_chain.invoke(
-            {"num": num, "topic": topic, "language": language, **kwargs},
-        )
+    @staticmethod
+    def _flashcard_inputs(
+        topic: str, language: str, num: int, custom_instructions: Optional[str], extra: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        inputs = {"num": num, "topic": topic, "language": language, **extra}
+        if custom_instructions:
+            inputs["custom_instructions"] = custom_instructions
+        return inputs
+
+    def generate_flashcards(
+        self,
+        topic: str,
+        language: str = "English",
+        num: int = 10,
+        prompt_template: Optional[str] = None,
+        custom_instructions: Optional[str] = None,
+        response_model: Optional[Type[Any]] = None,
+        llm: Optional[Any] = None,
+        **kwargs
+    ) -> FlashcardSet:
+        if response_model is None:
+            response_model = FlashcardSet
+        parser = PydanticOutputParser(pydantic_object=response_model)
+        format_instructions = parser.get_format_instructions()
+
+        flashcard_prompt = self._flashcard_prompt(format_instructions, prompt_template, custom_instructions)
 
         try:
-            structured_output = parser.parse(results.content)
-            return structured_output
-        except Exception as e:
-            print(f"Error parsing output: {e}")
-            print("Raw output:")
-            print(results.content)
+            return self.runtime.generate(
+                flashcard_prompt,
+                self._flashcard_inputs(topic, language, num, custom_instructions, kwargs),
+                response_model,
+                name="flashcards",
+                llm=llm
+            )
+        except StructuredOutputError as e:
+            logger.warning(f"Error parsing flashcard output: {e}")
+            logger.debug(f"Raw flashcard output: {e.raw}")
+            if response_model is FlashcardSet:
+                # Keep the cards that are valid instead of dropping the whole set
+                title, flashcards = self._parse_valid_flashcards(e.raw)
+                return FlashcardSet(title=title or topic, flashcards=flashcards)
             return FlashcardSet(title=topic, flashcards=[])
 
+    def _parse_valid_flashcards(self, content: str) -> Tuple[Optional[str], List[Flashcard]]:
+        """Lenient parse that validates each card on its own and skips malformed ones"""
+        content = content.strip().replace("```json", "").replace("```", "").strip()
+        start, end = content.find("{"), content.rfind("}")
+        if start == -1 or end == -1:
+            return None, []
+        try:
+            data = json.loads(content[start:end + 1])
+        except json.JSONDecodeError:
+            return None, []
+
+        flashcards = []
+        for card in data.get("flashcards", []) if isinstance(data, dict) else []:
+            try:
+                flashcards.append(Flashcard.model_validate(card))
+            except Exception:
+                continue
+        return data.get("title") if isinstance(data, dict) else None, flashcards
+
+    def stream_flashcards(
+        self,
+        topic: str,
+        language: str = "English",
+        num: int = 10,
+        custom_instructions: Optional[str] = None,
+        llm: Optional[Any] = None,
+        **kwargs
+    ) -> Iterator[Any]:
+        """
+        Stream a deck, yielding each Flashcard as soon as its JSON object is complete
+
+        The last item yielded is the FlashcardSet validated against the full response, or a
+        set of the cards that were streamed if the full response does not validate.
+        """
+        parser = PydanticOutputParser(pydantic_object=FlashcardSet)
+        flashcard_prompt = self._flashcard_prompt(parser.get_format_instructions(), None, custom_instructions)
+        inputs = self._flashcard_inputs(topic, language, num, custom_instructions, kwargs)
+
+        stream_parser = StreamingJSONParser(item_paths=["flashcards"])
+        streamed: List[Flashcard] = []
+        for text in self.runtime.stream(flashcard_prompt, inputs, name="flashcards (stream)", llm=llm):
+            for event in stream_parser.feed(text):
+                try:
+                    flashcard = Flashcard.model_validate(event.value)
+                except Exception as e:
+                    logger.warning(f"Skipping malformed flashcard {event.index + 1}: {e}")
+                    continue
+                streamed.append(flashcard)
+                yield flashcard
+
+        try:
+            yield self.runtime.validate(
+                stream_parser.buffer,
+                FlashcardSet,
+                flashcard_prompt.format(**inputs),
+                name="flashcards (stream)",
+                llm=llm
+            )
+        except StructuredOutputError as e:
+            logger.warning(f"Error validating streamed flashcards: {e}")
+            yield FlashcardSet(title=topic, flashcards=streamed)
+
+    def plan_shards(self, num: int, shard_size: int = 8) -> List[Tuple[str, int]]:
+        """Split a deck of num cards into (focus area, count) shards of at most shard_size cards"""
+        counts = [int(num * share) for _, share in FOCUS_AREAS]
+        # Hand out the cards lost to rounding, largest share first
+        for i in range(num - sum(counts)):
+            counts[i % len(counts)] += 1
+
+        shards = []
+        for (focus, _), count in zip(FOCUS_AREAS, counts):
+            parts = -(-count // shard_size)
+            for part in range(parts):
+                size = min(shard_size, count - part * shard_size)
+                # Numbered parts steer each shard of the same area towards different sub-topics
+                label = focus if parts == 1 else f"{focus} (part {part + 1} of {parts}, covering different sub-topics than the other parts)"
+                shards.append((label, size))
+        return shards
+
+    def _generate_shard(
+        self,
+        topic: str,
+        language: str,
+        focus: str,
+        count: int,
+        custom_instructions: Optional[str],
+        avoid: List[str],
+        max_retries: int
+    ) -> List[Flashcard]:
+        shard_instructions = (
+            f"Generate exactly {count} flashcards that focus ONLY on {focus} of {topic}. "
+            "Ignore the coverage percentages above; other parts of the deck cover the remaining areas."
+        )
+        if avoid:
+            shard_instructions += " Do not repeat these existing flashcards: " + "; ".join(avoid[:30])
+        if custom_instructions:
+            shard_instructions += f"\n{custom_instructions}"
+
+        for attempt in range(max_retries + 1):
+            flashcard_set = self.generate_flashcards(
+                topic=topic,
+                language=language,
+                num=count,
+                custom_instructions=shard_instructions
+            )
+            if flashcard_set.flashcards:
+                return flashcard_set.flashcards
+        raise ValueError(f"No valid flashcards for '{focus}' after {max_retries + 1} attempts")
+
+    def generate_flashcards_sharded(
+        self,
+        topic: str,
+        language: str = "English",
+        num: int = 10,
+        custom_instructions: Optional[str] = None,
+        shard_size: int = 8,
+        max_workers: int = 8,
+        max_retries: int = 1
+    ) -> Iterator[Flashcard]:
+        """
+        Generate a large deck as concurrent shards, yielding each validated card as its shard finishes
+
+        Cards whose front duplicates an earlier card are dropped, and a failed shard is retried on
+        its own. If duplicates or failures leave the deck short, one extra shard tops it up.
+        """
+        seen = set()
+        produced = 0
+
+        def accept(flashcards: List[Flashcard]) -> Iterator[Flashcard]:
+            nonlocal produced
+            for flashcard in flashcards:
+                key = normalize_front(flashcard.front)
+                if produced >= num or not key or key in seen:
+                    continue
+                seen.add(key)
+                produced += 1
+                yield flashcard
+
+        accepted_fronts: List[str] = []
+        shards = self.plan_shards(num, shard_size)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+            futures = [
+                executor.submit(self._generate_shard, topic, language, focus, count, custom_instructions, [], max_retries)
+                for focus, count in shards
+            ]
+            for future in as_completed(futures):
+                try:
+                    flashcards = future.result()
+                except Exception as e:
+                    logger.warning(f"Flashcard shard failed: {e}")
+                    continue
+                for flashcard in accept(flashcards):
+                    accepted_fronts.append(flashcard.front)
+                    yield flashcard
+
+        missing = num - produced
+        if missing > 0:
+            try:
+                flashcards = self._generate_shard(
+                    topic, language, "any remaining important aspects", min(missing, shard_size),
+                    custom_instructions, accepted_fronts, max_retries
+                )
+                yield from accept(flashcards)
+            except Exception as e:
+                logger.warning(f"Flashcard top-up shard failed: {e}")
+
+# Largest deck generated in a single call; bigger decks are split into concurrent shards
+SHARD_SIZE = 8
+
+def render_flashcard(i: int, flashcard: Flashcard):
+    with st.expander(f"**Flashcard {i}**", expanded=False):
+        st.markdown(f"""
+        <div class="flashcard-container">
+            <div class="flashcard">
+                <div class="flashcard-front">
+                    <h3 style="margin-top:0;">{flashcard.front}</h3>
+                </div>
+                <div class="flashcard-back">
+                    <p style="margin-bottom:0;">{flashcard.back}</p>
+                </div>
+                {f'<div class="flashcard-explanation"><p style="margin:0;"><strong>💡 Explanation:</strong> {flashcard.explanation}</p></div>' if flashcard.explanation else ''}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
 # --- Sidebar Configuration ---
 with st.sidebar:
     st.header("⚙️ Configuration")
@@ -179,7 +387,8 @@ with st.sidebar:
     selected_language = st.selectbox("Language for flashcards:", languages)
     
     # Number of flashcards
-    num_cards = st.slider("Number of Flashcards", 1, 8, 3)
+    num_cards = st.slider("Number of Flashcards", 1, 100, 3,
+                          help=f"Decks larger than {SHARD_SIZE} cards are generated in parallel shards")
     
     # Custom instructions
     custom_instructions = st.text_area(
@@ -234,32 +443,6 @@ full_instructions = custom_instructions if custom_instructions else ""
 # Generate button
 if st.button("🚀 Generate Professional Flashcards", type="primary", use_container_width=True):
     if topic:
-        with st.spinner(f"🧠 Generating {num_cards} flashcards in {selected_language}..."):
-            flashcard_set = content_engine.generate_flashcards(
-                topic=topic,
-                language=selected_language,
-                num=num_cards,
-                custom_instructions=full_instructions
-            )
-        
-        # Success message without background colors
-        st.markdown(f"""
-        <div style="padding: 1rem; margin: 1.5rem 0; border: 1px solid;">
-            <h3 style="margin-top: 0; font-size: 1.25rem;">✅ Flashcards Successfully Generated</h3>
-            <p style="margin-bottom: 0;">Created {len(flashcard_set.flashcards)} professional flashcards on <strong>{flashcard_set.title}</strong> in {selected_language}</p>
-        </div>
-        
-        <div style="padding: 1rem; margin-bottom: 2rem; border: 1px solid;">
-            <h4 style="margin-top: 0;">Studying Tips:</h4>
-            <ul>
-                <li>Review cards regularly using spaced repetition</li>
-                <li>Test yourself by trying to recall before viewing the answer</li>
-                <li>Connect new concepts with what you already know</li>
-                <li>Study in short, focused sessions rather than long marathons</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
         # Display flashcards in a single column with minimal styling
         st.markdown("""
         <style>
@@ -286,22 +469,79 @@ if st.button("🚀 Generate Professional Flashcards", type="primary", use_contai
         </style>
         """, unsafe_allow_html=True)
         
-        # Display flashcards in a single column
-        for i, flashcard in enumerate(flashcard_set.flashcards, 1):
-            with st.expander(f"**Flashcard {i}**", expanded=False):
-                st.markdown(f"""
-                <div class="flashcard-container">
-                    <div class="flashcard">
-                        <div class="flashcard-front">
-                            <h3 style="margin-top:0;">{flashcard.front}</h3>
-                        </div>
-                        <div class="flashcard-back">
-                            <p style="margin-bottom:0;">{flashcard.back}</p>
-                        </div>
-                        {f'<div class="flashcard-explanation"><p style="margin:0;"><strong>💡 Explanation:</strong> {flashcard.explanation}</p></div>' if flashcard.explanation else ''}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        summary_placeholder = st.empty()
+        cards_container = st.container()
+        
+        if num_cards <= SHARD_SIZE:
+            # Small decks: stream one response and show each card as soon as its JSON closes
+            progress = summary_placeholder.progress(0.0, text=f"🧠 Generating {num_cards} flashcards in {selected_language}...")
+            flashcards = []
+            flashcard_set = None
+            for item in content_engine.stream_flashcards(
+                topic=topic,
+                language=selected_language,
+                num=num_cards,
+                custom_instructions=full_instructions
+            ):
+                if isinstance(item, FlashcardSet):
+                    flashcard_set = item
+                    break
+                flashcards.append(item)
+                with cards_container:
+                    render_flashcard(len(flashcards), item)
+                progress.progress(min(len(flashcards) / num_cards, 1.0), text=f"🧠 Generated {len(flashcards)} of {num_cards} flashcards...")
+
+            if flashcard_set is None or not flashcard_set.flashcards:
+                # Nothing usable streamed; fall back to the lenient single-shot parser
+                flashcard_set = content_engine.generate_flashcards(
+                    topic=topic,
+                    language=selected_language,
+                    num=num_cards,
+                    custom_instructions=full_instructions
+                )
+            with cards_container:
+                for i, flashcard in enumerate(flashcard_set.flashcards[len(flashcards):], len(flashcards) + 1):
+                    render_flashcard(i, flashcard)
+        else:
+            # Large decks: show each card as soon as its shard is parsed
+            progress = summary_placeholder.progress(0.0, text=f"🧠 Generating {num_cards} flashcards in {selected_language}...")
+            flashcards = []
+            for flashcard in content_engine.generate_flashcards_sharded(
+                topic=topic,
+                language=selected_language,
+                num=num_cards,
+                custom_instructions=full_instructions,
+                shard_size=SHARD_SIZE
+            ):
+                flashcards.append(flashcard)
+                with cards_container:
+                    render_flashcard(len(flashcards), flashcard)
+                progress.progress(min(len(flashcards) / num_cards, 1.0), text=f"🧠 Generated {len(flashcards)} of {num_cards} flashcards...")
+            flashcard_set = FlashcardSet(title=topic, flashcards=flashcards)
+            if len(flashcards) < num_cards:
+                st.warning(f"Only {len(flashcards)} of {num_cards} flashcards could be generated. Try again for a full deck.")
+        
+        # Success message without background colors
+        summary_placeholder.markdown(f"""
+        <div style="padding: 1rem; margin: 1.5rem 0; border: 1px solid;">
+            <h3 style="margin-top: 0; font-size: 1.25rem;">✅ Flashcards Successfully Generated</h3>
+            <p style="margin-bottom: 0;">Created {len(flashcard_set.flashcards)} professional flashcards on <strong>{flashcard_set.title}</strong> in {selected_language}</p>
+        </div>
+        
+        <div style="padding: 1rem; margin-bottom: 2rem; border: 1px solid;">
+            <h4 style="margin-top: 0;">Studying Tips:</h4>
+            <ul>
+                <li>Review cards regularly using spaced repetition</li>
+                <li>Test yourself by trying to recall before viewing the answer</li>
+                <li>Connect new concepts with what you already know</li>
+                <li>Study in short, focused sessions rather than long marathons</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+
+        with st.expander("📈 Generation metrics"):
+            st.caption("LLM calls made by this server since it started")
+            st.dataframe(get_metrics().report(), use_container_width=True, hide_index=True)
     else:
         st.warning("⚠️ Please enter a topic for the flashcards.")
 
@@ -1,4 +1,5 @@
 import os
+import sys
 import streamlit as st
 import requests
 from bs4 import BeautifulSoup
@@ -9,6 +10,12 @@ from langchain.schema import HumanMessage
 from langchain.callbacks.base import BaseCallbackHandler
 from dotenv import load_dotenv
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.single_flight import invoke_coalesced
+from sutra_common.telemetry import llm_callbacks
+
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("SUTRA_API_KEY")
@@ -51,21 +58,10 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model():
     return ChatOpenAI(
         api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
-        model="sutra-v2",
-        temperature=0.7,
-    )
-
-# Create a streaming version of the model with callback handler
-def get_streaming_chat_model(callback_handler=None):
-    # Create a new instance with streaming enabled
-    return ChatOpenAI(
-        api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
-        streaming=True,
-        callbacks=[callback_handler] if callback_handler else None
+        callbacks=llm_callbacks()
     )
 
 # App header and branding
@@ -260,9 +256,6 @@ with tab1:
                 # Create a stream handler
                 stream_handler = StreamHandler(response_placeholder)
                 
-                # Get streaming model with handler
-                chat = get_streaming_chat_model(stream_handler)
-                
                 # Create prompt based on user selections
                 focus_points = ", ".join(summary_focus) if summary_focus else "Key Facts"
                 
@@ -283,7 +276,8 @@ with tab1:
                 
                 # Generate streaming response
                 messages = [HumanMessage(content=prompt)]
-                response = chat.invoke(messages)
+                # Identical concurrent requests share one upstream call and its streamed tokens
+                response = invoke_coalesced(get_base_chat_model(), messages, stream_handler)
                 summary = response.content
                 
                 # Add to history
@@ -385,7 +379,7 @@ if "translating" in st.session_state and st.session_state.translating:
                     
                     # Generate translation
                     messages = [HumanMessage(content=prompt)]
-                    response = chat.invoke(messages)
+                    response = invoke_coalesced(chat, messages)
                     translation = response.content
                     
                     # Add to history
@@ -0,0 +1,117 @@
+"""
+Pre-generate stories for the most requested combinations so the app can serve them instantly.
+
+Run it off-peak, e.g. from cron:
+
+    python prebuild_stories.py --top 50 --per-combo 3 --workers 4 --rpm 30
+
+Combinations come from the request counts the app records. On a fresh install, or with --seed,
+every theme x age group is also covered for the given languages with the default advanced options.
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from typing import List
+
+from dotenv import load_dotenv
+
+from story_engine import (
+    STORY_MAX_TOKENS,
+    StoryGenerator,
+    age_groups,
+    character_names,
+    character_types,
+    moral_values,
+    story_settings,
+    story_themes,
+)
+from story_library import DEFAULT_STORIES_PER_COMBO, StoryParams, get_story_library
+# story_engine has already put ../sutra_common on sys.path
+from sutra_common.rate_limiter import BACKGROUND, get_rate_limiter
+from sutra_common.structured_runtime import LLMConfig
+
+
+def seed_combinations(languages: List[str]) -> List[StoryParams]:
+    """Every theme and age group in each language, with the app's default advanced options"""
+    return [
+        StoryParams(
+            theme=theme,
+            language=language,
+            age_group=age_group,
+            story_length="short",
+            character_type=character_types[0],
+            setting=story_settings[0],
+            moral=moral_values[0],
+            name_style=next(iter(character_names))
+        )
+        for language in languages
+        for age_group in age_groups
+        for theme in story_themes
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate popular stories into the story library")
+    parser.add_argument("--top", type=int, default=50, help="Most requested combinations to cover")
+    parser.add_argument("--per-combo", type=int, default=DEFAULT_STORIES_PER_COMBO, help="Stories to keep per combination")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent generations")
+    parser.add_argument("--rpm", type=float, default=30, help="Maximum generation requests per minute")
+    parser.add_argument("--seed", action="store_true", help="Also cover every theme x age group with default options")
+    parser.add_argument("--languages", nargs="+", default=["English"], help="Languages for --seed")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would be generated")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = os.getenv("SUTRA_API_KEY", "")
+    if not api_key and not args.dry_run:
+        parser.error("Set SUTRA_API_KEY in the environment or a .env file")
+
+    library = get_story_library()
+    top = library.top_requests(args.top)
+    combinations = [params for params, _ in top]
+    if args.seed or not combinations:
+        combinations += [params for params in seed_combinations(args.languages) if params not in combinations]
+
+    jobs = []
+    for params in combinations:
+        jobs += [params] * max(0, args.per_combo - library.count(params))
+    print(f"{len(combinations)} combinations, {len(jobs)} stories to generate")
+    if args.dry_run or not jobs:
+        for params in dict.fromkeys(jobs):
+            print(f"  {params.theme} | {params.age_group} | {params.language} | {params.moral}")
+        return
+
+    generator = StoryGenerator(LLMConfig(api_key=api_key, max_tokens=STORY_MAX_TOKENS))
+    limiter = get_rate_limiter()
+    # A burst of one spaces request starts evenly across the minute
+    limiter.configure("sutra", args.rpm, burst=1)
+
+    def build(params: StoryParams):
+        limiter.acquire("sutra", BACKGROUND)
+        story = generator.generate_story(**asdict(params), strict=True)
+        library.add(params, story, source="batch")
+        return story
+
+    started = time.perf_counter()
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(build, params): params for params in jobs}
+        for future in as_completed(futures):
+            params = futures[future]
+            try:
+                story = future.result()
+                done += 1
+                print(f"[{done + failed}/{len(jobs)}] {params.theme} / {params.language}: {story.title}")
+            except Exception as e:
+                failed += 1
+                print(f"[{done + failed}/{len(jobs)}] {params.theme} / {params.language} failed: {e}")
+
+    stored, covered = library.stats()
+    print(f"Generated {done} stories ({failed} failed) in {time.perf_counter() - started:.0f}s; "
+          f"library holds {stored} stories across {covered} combinations")
+
+
+if __name__ == "__main__":
+    main()
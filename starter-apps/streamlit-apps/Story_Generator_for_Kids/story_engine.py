@@ -0,0 +1,414 @@
+import os
+import sys
+import random
+import logging
+from typing import Optional, List, Type, Any, Iterator, Tuple
+from pydantic import BaseModel, Field
+from langchain.prompts import PromptTemplate
+from langchain.output_parsers import PydanticOutputParser
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.streaming_json import ItemEvent, ParagraphSplitter, StreamingJSONParser, TextEvent
+from sutra_common.structured_runtime import (
+    LLMConfig,
+    StructuredOutputError,
+    StructuredRuntime,
+    get_llm,
+    get_prompt,
+)
+
+logger = logging.getLogger(__name__)
+
+# Define languages with their native names for better representation
+languages = [
+    "English", 
+    "Hindi (हिन्दी)", 
+    "Gujarati (ગુજરાતી)", 
+    "Bengali (বাংলা)", 
+    "Tamil (தமிழ்)", 
+    "Telugu (తెలుగు)", 
+    "Kannada (ಕನ್ನಡ)", 
+    "Malayalam (മലയാളം)", 
+    "Punjabi (ਪੰਜਾਬੀ)", 
+    "Marathi (मराठी)", 
+    "Urdu (اردو)",
+    "Assamese (অসমীয়া)", 
+    "Odia (ଓଡ଼ିଆ)", 
+    "Sanskrit (संस्कृतम्)",
+    "Nepali (नेपाली)",
+    "Konkani (कोंकणी)",
+    "Manipuri (মৈতৈলোন्)",
+    "Kashmiri (कॉशुर)",
+    "Santali (ᱥᱟᱱᱛᱟᱲᱤ)",
+    "Sindhi (سنڌي)",
+    "Bodo (बड़ो)",
+    "Dogri (डोगरी)"
+]
+
+# Story themes for kids
+story_themes = [
+    "Adventure", 
+    "Friendship", 
+    "Animals", 
+    "Magic", 
+    "Family",
+    "Outer Space", 
+    "Underwater World", 
+    "Fairy Tales", 
+    "Superheroes", 
+    "Nature",
+    "School", 
+    "Holidays", 
+    "Seasons", 
+    "Sports", 
+    "Music",
+    "Vehicles", 
+    "Mystery", 
+    "History", 
+    "Science", 
+    "Art",
+    "Food", 
+    "Travel", 
+    "Dreams", 
+    "Festivals"
+]
+
+# Age groups
+age_groups = [
+    "3-5 years (Preschool)",
+    "6-8 years (Early Elementary)",
+    "9-12 years (Upper Elementary)"
+]
+
+# Story length options
+story_lengths = {
+    "Short (2-3 minutes)": "short",
+    "Medium (5-7 minutes)": "medium",
+    "Long (10-15 minutes)": "long"
+}
+
+# Character types
+character_types = [
+    "Children", 
+    "Animals", 
+    "Magical Creatures", 
+    "Toys", 
+    "Plants",
+    "Robots", 
+    "Aliens", 
+    "Historical Figures", 
+    "Cartoon Characters", 
+    "Everyday Objects"
+]
+
+# Settings for stories
+story_settings = [
+    "Forest", 
+    "Beach", 
+    "Mountains", 
+    "City", 
+    "Village",
+    "School", 
+    "Space", 
+    "Underwater", 
+    "Desert", 
+    "Jungle",
+    "Castle", 
+    "Farm", 
+    "Island", 
+    "Playground", 
+    "Home",
+    "Imaginary World", 
+    "Ancient Kingdom", 
+    "Future City", 
+    "Arctic", 
+    "Rainforest"
+]
+
+# Story moral values
+moral_values = [
+    "Honesty", 
+    "Kindness", 
+    "Courage", 
+    "Perseverance", 
+    "Friendship",
+    "Sharing", 
+    "Respect", 
+    "Responsibility", 
+    "Patience", 
+    "Cooperation",
+    "Gratitude", 
+    "Empathy", 
+    "Forgiveness", 
+    "Generosity", 
+    "Self-confidence",
+    "Hard work", 
+    "Creativity", 
+    "Curiosity", 
+    "Helpfulness", 
+    "Humility"
+]
+
+# Define character names by culture
+character_names = {
+    "Indian": ["Aarav", "Advait", "Arjun", "Dhruv", "Ishaan", "Kabir", "Reyansh", "Vihaan", "Vivaan", "Zayan", 
+               "Aanya", "Diya", "Kiara", "Myra", "Pari", "Saanvi", "Samaira", "Shanaya", "Tara", "Zara"],
+    "International": ["Alex", "Ben", "Charlie", "Daniel", "Ethan", "Felix", "George", "Henry", "Isaac", "Jack",
+                      "Amelia", "Bella", "Chloe", "Daisy", "Emma", "Freya", "Grace", "Hannah", "Ivy", "Julia"],
+    "Fantasy": ["Auryn", "Blade", "Cosmos", "Drax", "Eldin", "Flare", "Glimmer", "Helix", "Ignis", "Jinx",
+                "Astra", "Brynn", "Crystal", "Delphi", "Echo", "Fable", "Gaia", "Halo", "Iris", "Jewel"]
+}
+
+# Story structure
+class StoryCharacter(BaseModel):
+    name: str = Field(..., description="The name of the character")
+    description: str = Field(..., description="Brief description of the character")
+
+class Story(BaseModel):
+    title: str = Field(..., description="An engaging and age-appropriate title for the story")
+    characters: List[StoryCharacter] = Field(..., description="List of main characters in the story")
+    content: str = Field(..., description="The complete story text")
+    moral: Optional[str] = Field(None, description="The moral or lesson of the story, if applicable")
+    fun_question: Optional[str] = Field(None, description="An engaging question to ask the child after the story")
+
+# Longer stories need more room than the shared default
+STORY_MAX_TOKENS = 2500
+
+# Title of the placeholder story returned when generation fails; never stored in the library
+FALLBACK_TITLE = "Story Generation Issue"
+
+class StoryGenerator:
+    def __init__(self, llm_config: Optional[LLMConfig] = None):
+        if llm_config is None:
+            llm_config = LLMConfig(max_tokens=STORY_MAX_TOKENS)
+        self.llm = get_llm(llm_config)
+        self.runtime = StructuredRuntime(self.llm)
+
+    def _story_prompt(
+        self,
+        format_instructions: str,
+        name_style: str,
+        prompt_template: Optional[str] = None,
+        custom_instructions: Optional[str] = None
+    ) -> Tuple[PromptTemplate, str]:
+        # Character names based on selected style
+        possible_names = character_names.get(name_style, character_names["Fantasy"])
+        random_names = random.sample(possible_names, min(3, len(possible_names)))
+        character_name_examples = ", ".join(random_names)
+
+        if prompt_template is None:
+            prompt_template = """
+            You are an expert children's story writer specializing in creating engaging, educational, and 
+            culturally appropriate stories for young readers. Your task is to create a delightful story 
+            based on the following parameters:
+
+            IMPORTANT LANGUAGE INSTRUCTION: Write the ENTIRE story in {language} language with proper grammar, 
+            natural phrasing, and culturally appropriate context as if written by a native speaker. 
+            Use simple vocabulary and sentence structure appropriate for the specified age group.
+
+            STORY PARAMETERS:
+            - Theme: {theme}
+            - Target Age: {age_group}
+            - Length: {story_length} 
+            - Main Character Type: {character_type}
+            - Setting: {setting}
+            - Moral/Value to Convey: {moral}
+            - Character Name Style: Names like {character_name_examples}
+
+            STORY WRITING GUIDELINES:
+            1. CREATE AGE-APPROPRIATE CONTENT:
+               - For 3-5 years: Use very simple language, repetition, and rhymes. Keep sentences short.
+               - For 6-8 years: Use clear language with some new vocabulary. Include simple dialogue.
+               - For 9-12 years: Use more complex sentence structures and vocabulary with nuanced themes.
+
+            2. LENGTH GUIDELINES:
+               - Short: 300-400 words (~2-3 minutes read-aloud time)
+               - Medium: 500-700 words (~5-7 minutes read-aloud time)
+               - Long: 800-1200 words (~10-15 minutes read-aloud time)
+
+            3. STORY STRUCTURE:
+               - Begin with an engaging opening that introduces the main character(s)
+               - Present a problem or challenge appropriate to the age group
+               - Develop the story with age-appropriate tension/excitement
+               - Resolve the conflict in a satisfying way
+               - End with a clear conclusion that reinforces the moral/value
+
+            4. CULTURAL SENSITIVITY:
+               - Incorporate culturally relevant elements if writing in a regional language
+               - Avoid stereotypes and ensure respectful representation
+               - Use culturally appropriate names, settings, and references
+
+            5. EDUCATIONAL VALUE:
+               - Naturally embed the specified moral/value without being preachy
+               - Include 2-3 new vocabulary words appropriate for the age group
+               - Make the story both entertaining and enriching
+
+            6. ENGAGEMENT ELEMENTS:
+               - Include sensory details (sights, sounds, smells, textures)
+               - Add elements of surprise, humor, or wonder
+               - Create memorable characters that children can relate to
+               - For younger ages, include opportunities for interaction (questions, sound effects)
+
+            IMPORTANT NOTES:
+            - Ensure complete safety and appropriateness for children
+            - Avoid any frightening elements, violence, or mature themes
+            - Make the story engaging, positive, and uplifting
+            - End with a gentle moral that reinforces positive values
+
+            The output must include:
+            - An age-appropriate title
+            - A list of main characters with brief descriptions
+            - The complete story text
+            - A moral or lesson from the story
+            - A fun question to engage the child after the story
+            """
+
+        if custom_instructions:
+            prompt_template += f"\n\nAdditional Instructions:\n{custom_instructions}"
+
+        prompt_template += "\n\nThe response should be in JSON format.\n{format_instructions}"
+
+        story_prompt = get_prompt(
+            prompt_template,
+            ["theme", "language", "age_group", "story_length", "character_type",
+             "setting", "moral", "character_name_examples"],
+            {"format_instructions": format_instructions}
+        )
+
+        return story_prompt, character_name_examples
+
+    def generate_story(
+        self,
+        theme: str,
+        language: str,
+        age_group: str,
+        story_length: str,
+        character_type: str,
+        setting: str,
+        moral: str,
+        name_style: str,
+        prompt_template: Optional[str] = None,
+        custom_instructions: Optional[str] = None,
+        response_model: Optional[Type[Any]] = None,
+        llm: Optional[Any] = None,
+        strict: bool = False,
+    ) -> Story:
+        if response_model is None:
+            response_model = Story
+        parser = PydanticOutputParser(pydantic_object=response_model)
+        format_instructions = parser.get_format_instructions()
+
+        story_prompt, character_name_examples = self._story_prompt(
+            format_instructions, name_style, prompt_template, custom_instructions
+        )
+
+        try:
+            return self.runtime.generate(
+                story_prompt,
+                {
+                    "theme": theme,
+                    "language": language,
+                    "age_group": age_group,
+                    "story_length": story_length,
+                    "character_type": character_type,
+                    "setting": setting,
+                    "moral": moral,
+                    "character_name_examples": character_name_examples
+                },
+                response_model,
+                name="story",
+                llm=llm
+            )
+        except StructuredOutputError as e:
+            if strict:
+                raise
+            logger.warning(f"Error parsing story output: {e}")
+            logger.debug(f"Raw story output: {e.raw}")
+            # Return a default story in case of parsing error
+            return self._fallback_story(e.raw)
+
+    def _fallback_story(self, content: str) -> Story:
+        return Story(
+            title=FALLBACK_TITLE,
+            characters=[StoryCharacter(name="Error", description="There was an issue generating the story")],
+            content=content,
+            moral="Sometimes technology needs a little help!",
+            fun_question="Can you help create your own story instead?"
+        )
+
+    def stream_story(
+        self,
+        theme: str,
+        language: str,
+        age_group: str,
+        story_length: str,
+        character_type: str,
+        setting: str,
+        moral: str,
+        name_style: str,
+        custom_instructions: Optional[str] = None,
+        llm: Optional[Any] = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream a story as (kind, value) events while the model is still writing
+
+        Yields ("title", str), ("character", StoryCharacter), ("paragraph", str),
+        ("moral", str) and ("fun_question", str) as each part completes, then
+        ("story", Story) validated against the full response.
+        """
+        parser = PydanticOutputParser(pydantic_object=Story)
+        story_prompt, character_name_examples = self._story_prompt(
+            parser.get_format_instructions(), name_style, None, custom_instructions
+        )
+        inputs = {
+            "theme": theme,
+            "language": language,
+            "age_group": age_group,
+            "story_length": story_length,
+            "character_type": character_type,
+            "setting": setting,
+            "moral": moral,
+            "character_name_examples": character_name_examples
+        }
+
+        stream_parser = StreamingJSONParser(
+            item_paths=["characters"],
+            value_paths=["title", "content", "moral", "fun_question"],
+            text_paths=["content"]
+        )
+        paragraphs = ParagraphSplitter()
+        for text in self.runtime.stream(story_prompt, inputs, name="story (stream)", llm=llm):
+            for event in stream_parser.feed(text):
+                if isinstance(event, TextEvent):
+                    for paragraph in paragraphs.feed(event.text):
+                        yield "paragraph", paragraph
+                elif isinstance(event, ItemEvent):
+                    try:
+                        yield "character", StoryCharacter.model_validate(event.value)
+                    except Exception as e:
+                        logger.warning(f"Skipping malformed character: {e}")
+                elif event.path == "content":
+                    # The story text has closed, so whatever is pending is the last paragraph
+                    last_paragraph = paragraphs.flush()
+                    if last_paragraph:
+                        yield "paragraph", last_paragraph
+                elif isinstance(event.value, str):
+                    yield event.path, event.value
+
+        last_paragraph = paragraphs.flush()
+        if last_paragraph:
+            yield "paragraph", last_paragraph
+
+        try:
+            yield "story", self.runtime.validate(
+                stream_parser.buffer,
+                Story,
+                story_prompt.format(**inputs),
+                name="story (stream)",
+                llm=llm
+            )
+        except StructuredOutputError as e:
+            logger.warning(f"Error validating streamed story: {e}")
+            logger.debug(f"Raw story output: {e.raw}")
+            yield "story", self._fallback_story(e.raw)
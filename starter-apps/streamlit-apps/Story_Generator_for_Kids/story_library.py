@@ -0,0 +1,156 @@
+import os
+import time
+import random
+import sqlite3
+import logging
+import threading
+from dataclasses import astuple, dataclass, fields
+from typing import List, Optional, Tuple
+
+from story_engine import Story
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sutra-cookbook", "story_library.db")
+
+# Stories kept per combination so repeat visitors do not always get the same one
+DEFAULT_STORIES_PER_COMBO = 3
+
+
+@dataclass(frozen=True)
+class StoryParams:
+    """Every setting that changes the generated story"""
+    theme: str
+    language: str
+    age_group: str
+    story_length: str
+    character_type: str
+    setting: str
+    moral: str
+    name_style: str
+
+    def key(self) -> Tuple[str, ...]:
+        return astuple(self)
+
+
+_PARAM_FIELDS = [f.name for f in fields(StoryParams)]
+_PARAM_COLUMNS = ", ".join(_PARAM_FIELDS)
+_PARAM_DEFINITIONS = ", ".join(f"{name} TEXT NOT NULL" for name in _PARAM_FIELDS)
+_PARAM_MATCH = " AND ".join(f"{name} = ?" for name in _PARAM_FIELDS)
+_PARAM_PLACEHOLDERS = ", ".join("?" for _ in _PARAM_FIELDS)
+
+
+class StoryLibrary:
+    """SQLite store of finished stories indexed by their parameters, plus request counts"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {_PARAM_DEFINITIONS},
+                story TEXT NOT NULL,
+                source TEXT NOT NULL,
+                served_count INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_stories_params ON stories ({_PARAM_COLUMNS});
+            CREATE TABLE IF NOT EXISTS story_requests (
+                {_PARAM_DEFINITIONS},
+                requests INTEGER NOT NULL DEFAULT 0,
+                last_requested REAL NOT NULL,
+                PRIMARY KEY ({_PARAM_COLUMNS})
+            );
+            """
+        )
+        self._conn.commit()
+
+    def record_request(self, params: StoryParams) -> None:
+        """Count a request so the batch job knows which combinations are popular"""
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO story_requests ({_PARAM_COLUMNS}, requests, last_requested) "
+                f"VALUES ({_PARAM_PLACEHOLDERS}, 1, ?) "
+                f"ON CONFLICT ({_PARAM_COLUMNS}) DO UPDATE SET "
+                "requests = requests + 1, last_requested = excluded.last_requested",
+                (*params.key(), time.time())
+            )
+            self._conn.commit()
+
+    def count(self, params: StoryParams) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM stories WHERE {_PARAM_MATCH}", params.key()
+            ).fetchone()[0]
+
+    def add(self, params: StoryParams, story: Story, source: str = "live") -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO stories ({_PARAM_COLUMNS}, story, source, created_at) "
+                f"VALUES ({_PARAM_PLACEHOLDERS}, ?, ?, ?)",
+                (*params.key(), story.model_dump_json(), source, time.time())
+            )
+            self._conn.commit()
+
+    def pick(self, params: StoryParams) -> Optional[Story]:
+        """A stored story for params, preferring the ones served least; None when uncovered"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, story FROM stories WHERE {_PARAM_MATCH} "
+                f"AND served_count = (SELECT MIN(served_count) FROM stories WHERE {_PARAM_MATCH})",
+                params.key() * 2
+            ).fetchall()
+            if not rows:
+                return None
+            story_id, story_json = random.choice(rows)
+            self._conn.execute("UPDATE stories SET served_count = served_count + 1 WHERE id = ?", (story_id,))
+            self._conn.commit()
+        try:
+            return Story.model_validate_json(story_json)
+        except ValueError as e:
+            logger.warning(f"Dropping unreadable story {story_id}: {str(e)}")
+            with self._lock:
+                self._conn.execute("DELETE FROM stories WHERE id = ?", (story_id,))
+                self._conn.commit()
+            return None
+
+    def top_requests(self, limit: int = 50) -> List[Tuple[StoryParams, int]]:
+        """Most requested combinations with their request counts"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_PARAM_COLUMNS}, requests FROM story_requests "
+                "ORDER BY requests DESC, last_requested DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(StoryParams(*row[:-1]), row[-1]) for row in rows]
+
+    def stats(self) -> Tuple[int, int]:
+        """(stories stored, combinations covered)"""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*), (SELECT COUNT(*) FROM (SELECT DISTINCT {_PARAM_COLUMNS} FROM stories)) FROM stories"
+            ).fetchone()
+
+
+_library: Optional[StoryLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_story_library() -> StoryLibrary:
+    """Process-wide story library shared by the app and the batch job"""
+    global _library
+    with _library_lock:
+        if _library is None:
+            db_path = os.getenv("SUTRA_STORY_LIBRARY_PATH", DEFAULT_DB_PATH)
+            try:
+                _library = StoryLibrary(db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open story library at {db_path}: {str(e)}. Using in-memory store.")
+                _library = StoryLibrary(":memory:")
+        return _library
@@ -5,10 +5,32 @@ from serpapi import GoogleSearch
 from agno.agent import Agent
 from agno.tools.serpapi import SerpApiTools
 from agno.models.openai.like import OpenAILike
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
+import sys
+import functools
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL, use_serpapi_base_url
+from sutra_common.rate_limiter import BACKGROUND, INTERACTIVE, get_rate_limiter
+from sutra_common.result_cache import ResultCache
+from sutra_common.task_graph import TaskFailed, TaskGraph
+from sutra_common.telemetry import llm_callbacks
+from sutra_common.tool_cache import get_tool_cache
+from sutra_common.translation_memory import (
+    SEGMENT_PROMPT_VERSION, build_segment_prompt, get_translation_memory, parse_json_list
+)
+
+# Lets SERPAPI_BASE_URL redirect the flight searches and the agents' SerpAPI tool
+use_serpapi_base_url()
 
+# Concurrent SerpAPI requests when searching a range of dates
+FLIGHT_SEARCH_WORKERS = 5
 
 # Set up Streamlit UI with a travel-friendly theme
 st.set_page_config(page_title="🌍 AI Travel Planner", layout="wide")
@@ -44,6 +66,12 @@ serpapi_key_input = st.sidebar.text_input("Enter your SerpAPI Key:", type="passw
 # Language selector in sidebar only
 st.sidebar.subheader("🌐 Language Settings")
 output_language = st.sidebar.selectbox("Select language for your travel plan:", languages, key="sidebar_language_selector")
+structured_output = st.sidebar.checkbox(
+    "🧩 Write plan directly in this language",
+    value=True,
+    help="The planner returns a structured plan (days, time blocks, costs) in the selected language in one call, "
+         "instead of translating each section afterwards. An English version is available on demand."
+)
 
 
 # Travel Preferences
@@ -58,6 +86,13 @@ visa_required = st.sidebar.checkbox("🛃 Check Visa Requirements")
 travel_insurance = st.sidebar.checkbox("🛡️ Get Travel Insurance")
 currency_converter = st.sidebar.checkbox("💱 Currency Exchange Rates")
 
+# Agent search cache metrics
+with st.sidebar.expander("🗄️ Search Cache"):
+    tool_cache_stats = get_tool_cache().metrics.totals()
+    st.markdown(f"**Hits:** {tool_cache_stats.hits} | **Misses:** {tool_cache_stats.misses}")
+    st.markdown(f"**Hit rate:** {tool_cache_stats.hit_rate:.0%}")
+    st.markdown(f"**Time saved:** {tool_cache_stats.saved_seconds:.1f}s")
+
 st.markdown(
     """
     <style>
@@ -143,6 +178,10 @@ activity_preferences = st.text_area(
 
 departure_date = st.date_input("Departure Date")
 return_date = st.date_input("Return Date")
+flex_days = st.slider(
+    "📅 Flexible dates (± days):", 0, 2, 0,
+    help="Also search nearby departure and return dates and show the cheapest price for each combination"
+)
 
 # Get API keys from environment variables or UI inputs
 SERPAPI_KEY = os.getenv("SERPAPI_KEY") or serpapi_key_input
@@ -160,50 +199,167 @@ if not SUTRA_API_KEY:
 def get_sutra_model(api_key):
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
+        callbacks=llm_callbacks()
     )
 
 # Function to translate text using Sutra LLM
-def translate_text(text, target_language, sutra_api_key):
+def translate_text(text, target_language, sutra_api_key, errors=None):
     if not sutra_api_key or target_language == "English":
         return text
     
     try:
         sutra = get_sutra_model(sutra_api_key)
-        translation_prompt = f"Translate the following text to {target_language}. Keep all formatting including bullet points, numbers, and emojis intact. Here's the text:\n\n{text}"
         
-        messages = [HumanMessage(content=translation_prompt)]
-        response = sutra.invoke(messages)
+        # Translate only the lines that are not already in the shared translation memory
+        def translate_batch(segments):
+            response = sutra.invoke([HumanMessage(content=build_segment_prompt(segments, target_language))])
+            return parse_json_list(response.content)
         
-        return response.content
+        try:
+            return get_translation_memory().translate_segments(text, target_language, SEGMENT_PROMPT_VERSION, translate_batch)
+        except ValueError:
+            # The model did not return one translation per line - translate the whole text at once
+            translation_prompt = f"Translate the following text to {target_language}. Keep all formatting including bullet points, numbers, and emojis intact. Here's the text:\n\n{text}"
+            
+            messages = [HumanMessage(content=translation_prompt)]
+            response = sutra.invoke(messages)
+            
+            return response.content
     except Exception as e:
-        st.warning(f"Translation error: {str(e)}. Showing original text.")
+        message = f"Translation error: {str(e)}. Showing original text."
+        # Task-graph threads have no page to write to; they hand errors back to the script thread
+        if errors is not None:
+            errors.append(message)
+        else:
+            st.warning(message)
         return text
 
+# Flight results change slowly; reuse identical searches for ten minutes across sessions
+@st.cache_resource
+def get_flight_cache():
+    return ResultCache(ttl=600, prefetch_workers=FLIGHT_SEARCH_WORKERS)
+
+# SerpAPI reports quota and key problems as an "error" field; only real results are cached
+def is_flight_result(result):
+    return (
+        isinstance(result, dict)
+        and "error" not in result
+        and bool(result.get("best_flights") or result.get("other_flights"))
+    )
+
+# Every SerpAPI search goes through the shared limiter, which paces requests and retries 429s
+def serpapi_search(params, priority=INTERACTIVE):
+    return get_rate_limiter().call("serpapi", lambda: GoogleSearch(params).get_dict(), priority)
+
 # Function to fetch flight data
-def fetch_flights(source, destination, departure_date, return_date):
+def fetch_flights(source, destination, departure_date, return_date, currency="INR", priority=INTERACTIVE):
     params = {
         "engine": "google_flights",
         "departure_id": source,
         "arrival_id": destination,
         "outbound_date": str(departure_date),
         "return_date": str(return_date),
-        "currency": "INR",
+        "currency": currency,
         "hl": "en",
         "api_key": SERPAPI_KEY
     }
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    key = ResultCache.make_key(
+        "google_flights",
+        f"{source}-{destination}",
+        {"outbound_date": str(departure_date), "return_date": str(return_date), "currency": currency}
+    )
+    return get_flight_cache().get_or_load(key, lambda: serpapi_search(params, priority), should_cache=is_flight_result)
+
+# Function to search every departure/return date combination within flex_days of the chosen dates
+def fetch_flights_date_range(source, destination, departure_date, return_date, flex_days=1, currency="INR"):
+    date_pairs = []
+    for departure_offset in range(-flex_days, flex_days + 1):
+        for return_offset in range(-flex_days, flex_days + 1):
+            outbound = departure_date + timedelta(days=departure_offset)
+            inbound = return_date + timedelta(days=return_offset)
+            if inbound >= outbound:
+                date_pairs.append((outbound, inbound))
+    
+    # Queries are independent, so run them concurrently; cached pairs return immediately.
+    # The grid can be dozens of searches, so it queues behind single searches and agent tool calls
+    results = {}
+    with ThreadPoolExecutor(max_workers=FLIGHT_SEARCH_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_flights, source, destination, outbound, inbound, currency, BACKGROUND): (outbound, inbound)
+            for outbound, inbound in date_pairs
+        }
+        for future, date_pair in futures.items():
+            try:
+                results[date_pair] = future.result()
+            except Exception:
+                # One failed date pair should not hide the rest of the matrix
+                results[date_pair] = {}
     return results
 
-# Function to extract top 3 cheapest flights
-def extract_cheapest_flights(flight_data):
-    best_flights = flight_data.get("best_flights", [])
-    sorted_flights = sorted(best_flights, key=lambda x: x.get("price", float("inf")))[:3]  # Get top 3 cheapest
+# Function to extract top 3 cheapest flights from one search result or several
+def extract_cheapest_flights(flight_data, limit=3):
+    if isinstance(flight_data, dict) and flight_data and all(isinstance(key, tuple) for key in flight_data):
+        flight_data = list(flight_data.values())  # Date range results keyed by (departure, return)
+    results = flight_data if isinstance(flight_data, list) else [flight_data]
+    
+    best_flights = []
+    for result in results:
+        search_parameters = result.get("search_parameters", {})
+        for flight in result.get("best_flights", []):
+            # Remember which dates each flight belongs to, for booking links and the date matrix
+            best_flights.append({
+                **flight,
+                "outbound_date": search_parameters.get("outbound_date"),
+                "return_date": search_parameters.get("return_date")
+            })
+    sorted_flights = sorted(best_flights, key=lambda x: x.get("price", float("inf")))[:limit]  # Get top 3 cheapest
     return sorted_flights
 
+# Function to build a cheapest-price table with departure dates as rows and return dates as columns
+def build_price_matrix(date_results):
+    return_dates = sorted({inbound for _, inbound in date_results})
+    rows = []
+    for outbound in sorted({outbound for outbound, _ in date_results}):
+        row = {"Departure": outbound.strftime("%b-%d")}
+        for inbound in return_dates:
+            cheapest = extract_cheapest_flights(date_results.get((outbound, inbound), {}), limit=1)
+            price = cheapest[0].get("price") if cheapest else None
+            row[inbound.strftime("%b-%d")] = f"₹{price:,}" if isinstance(price, (int, float)) else "—"
+        rows.append(row)
+    return rows
+
+# Function to get a booking link for a flight; lookups are cached like flight searches
+def fetch_booking_link(source, destination, outbound_date, return_date, departure_token, idx, currency="INR"):
+    params = {
+        "engine": "google_flights",
+        "departure_id": source,
+        "arrival_id": destination,
+        "outbound_date": str(outbound_date),
+        "return_date": str(return_date),
+        "currency": currency,
+        "hl": "en",
+        "departure_token": departure_token,
+        "api_key": SERPAPI_KEY
+    }
+    key = ResultCache.make_key(
+        "google_flights_booking",
+        f"{source}-{destination}",
+        {"outbound_date": str(outbound_date), "return_date": str(return_date), "currency": currency, "token": departure_token}
+    )
+    results_with_booking = get_flight_cache().get_or_load(
+        key, lambda: serpapi_search(params), should_cache=is_flight_result
+    )
+    
+    # Check if we have valid booking data
+    if 'best_flights' in results_with_booking and len(results_with_booking['best_flights']) > idx:
+        booking_token = results_with_booking['best_flights'][idx].get('booking_token')
+        if booking_token:
+            return f"https://www.google.com/travel/flights?tfs={booking_token}"
+    return "#"
+
 # Function to create optimized prompts for Sutra
 def create_optimized_prompt(action, destination, preferences, constraints):
     """
@@ -221,8 +377,22 @@ def create_optimized_prompt(action, destination, preferences, constraints):
     # Create a focused prompt that emphasizes what's most important
     return f"{action} for {destination}. Preferences: {preferences}. Constraints: {constraints}. BE CONCISE."
 
+# SerpApiTools whose Google searches are served from the shared tool cache when possible.
+# The wrapped method keeps the original name, signature and docstring, so agents see the same tool.
+class CachedSerpApiTools(SerpApiTools):
+    @functools.wraps(SerpApiTools.search_google)
+    def search_google(self, query: str, num_results: int = 10) -> str:
+        search = super().search_google
+        return get_tool_cache().call(
+            "search_google",
+            # Cache misses share the SerpAPI quota with the flight searches
+            lambda **arguments: get_rate_limiter().call("serpapi", lambda: search(**arguments)),
+            query=query,
+            num_results=num_results
+        )
+
 # AI Agents with Sutra model
-def create_sutra_agent(name, instructions):
+def create_sutra_agent(name, instructions, response_model=None):
     # Check if API key is available
     if not SUTRA_API_KEY:
         st.sidebar.error(f"⚠️ Can't initialize {name} agent: No Sutra API key provided.")
@@ -235,13 +405,83 @@ def create_sutra_agent(name, instructions):
         model=OpenAILike(
             id="sutra-v2",
             api_key=SUTRA_API_KEY,
-            base_url="https://api.two.ai/v2"
+            base_url=SUTRA_BASE_URL
         ),
-        tools=[SerpApiTools(api_key=SERPAPI_KEY)] if name != "Planner" else None,
+        tools=[CachedSerpApiTools(api_key=SERPAPI_KEY)] if name != "Planner" else None,
+        response_model=response_model,
+        use_json_mode=response_model is not None,  # Structured output via JSON mode, supported by OpenAI-compatible APIs
         add_datetime_to_instructions=True,
-        markdown=True
+        markdown=response_model is None
     )
 
+# Structured travel plan, written by the Planner directly in the selected language
+class TimeBlock(BaseModel):
+    period: str = Field(..., description="Morning, Afternoon or Evening, written in the plan language")
+    activities: List[str] = Field(..., description="2-3 short activity descriptions")
+    estimated_cost: str = Field("", description="Estimated cost for this block, with currency")
+
+class DayPlan(BaseModel):
+    day: int = Field(..., description="Day number, starting at 1")
+    title: str = Field(..., description="Short theme for the day")
+    blocks: List[TimeBlock]
+
+class CostItem(BaseModel):
+    item: str = Field(..., description="What the cost is for, e.g. hotel, food, transport")
+    amount: str = Field(..., description="Estimated amount with currency")
+
+class TravelPlan(BaseModel):
+    summary: str = Field(..., description="One or two sentence overview of the trip")
+    days: List[DayPlan]
+    hotels_and_restaurants: List[str] = Field(..., description="Recommended hotels and restaurants with price range and rating")
+    research_highlights: List[str] = Field(..., description="Must-know facts: key attractions, safety and local tips")
+    costs: List[CostItem]
+    total_estimated_cost: str = Field(..., description="Estimated total cost with currency")
+
+# Function to read a TravelPlan from an agent response, which may be a parsed model or raw JSON text
+def parse_travel_plan(content):
+    if isinstance(content, TravelPlan):
+        return content
+    text = str(content).strip().replace("```json", "").replace("```", "").strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end == -1:
+        raise ValueError("Planner did not return a structured travel plan")
+    return TravelPlan.model_validate_json(text[start:end + 1])
+
+# Function to translate a structured plan in one call, e.g. for the on-demand English version
+def translate_travel_plan(plan, target_language, sutra_api_key):
+    sutra = get_sutra_model(sutra_api_key)
+    translation_prompt = f"""Translate every string value in the following JSON to {target_language}.
+Important:
+1. Keep all keys, numbers and the JSON structure exactly as they are
+2. Keep proper nouns (names, places, brands) and currencies in their original form
+3. Return ONLY the JSON
+
+{plan.model_dump_json()}"""
+    response = sutra.invoke([HumanMessage(content=translation_prompt)])
+    return parse_travel_plan(response.content)
+
+# Function to display a structured travel plan
+def render_travel_plan(plan):
+    st.subheader("🏨 Hotels & Restaurants")
+    st.markdown("\n".join(f"- {entry}" for entry in plan.hotels_and_restaurants))
+    
+    st.subheader("🗺️ Your Personalized Itinerary")
+    st.markdown(plan.summary)
+    for day in plan.days:
+        st.markdown(f"#### {day.day}. {day.title}")
+        for block in day.blocks:
+            block_cost = f" — 💰 {block.estimated_cost}" if block.estimated_cost else ""
+            st.markdown(f"**{block.period}**{block_cost}")
+            st.markdown("\n".join(f"- {activity}" for activity in block.activities))
+    
+    st.subheader("💰 Estimated Costs")
+    if plan.costs:
+        st.table([{"": cost.item, "💰": cost.amount} for cost in plan.costs])
+    st.markdown(f"**Σ {plan.total_estimated_cost}**")
+    
+    st.subheader("🔍 Destination Research")
+    st.markdown("\n".join(f"- {highlight}" for highlight in plan.research_highlights))
+
 # Function to display content with optional translation expander
 # This function is no longer needed since we're showing directly in preferred language
 # Removing this function as it's not needed anymore
@@ -280,53 +520,34 @@ if st.button("🚀 Generate Travel Plan"):
     
     # Create agents with Sutra model
     researcher = create_sutra_agent("Researcher", researcher_instructions)
-    planner = create_sutra_agent("Planner", planner_instructions) 
+    planner = create_sutra_agent("Planner", planner_instructions, response_model=TravelPlan if structured_output else None)
     hotel_restaurant_finder = create_sutra_agent("Hotel & Restaurant Finder", hotel_restaurant_instructions)
     
     if not researcher or not planner or not hotel_restaurant_finder:
         st.error("⚠️ Failed to initialize AI agents. Please check your API keys.")
         st.stop()
     
-    with st.spinner("✈️ Fetching best flight options..."):
-        flight_data = fetch_flights(source, destination, departure_date, return_date)
-        cheapest_flights = extract_cheapest_flights(flight_data)
-
-    # Hide intermediate processing and only show final results
-    with st.spinner("🔍 Processing your travel plan..."):
-        # Research attractions & activities
-        research_prompt = create_optimized_prompt(
-            action="Research top attractions and activities",
-            destination=destination,
-            preferences=f"Trip type: {travel_theme}. Activities: {activity_preferences}.",
-            constraints=f"Budget: {budget}. Duration: {num_days} days."
-        )
-        
-        # Get research output without streaming
-        research_response = researcher.run(research_prompt, stream=False)
-        research_output = research_response.content if hasattr(research_response, 'content') else str(research_response)
-        
-        # Hotels & restaurants
-        hotel_restaurant_prompt = create_optimized_prompt(
-            action="Find top hotels and restaurants",
-            destination=destination,
-            preferences=f"Trip type: {travel_theme}. Hotel rating: {hotel_rating}.",
-            constraints=f"Budget: {budget}. Activities nearby: {activity_preferences}."
-        )
-        
-        # Get hotel output without streaming
-        hotel_response = hotel_restaurant_finder.run(hotel_restaurant_prompt, stream=False)
-        hotel_output = hotel_response.content if hasattr(hotel_response, 'content') else str(hotel_response)
-        
-        # Simplified flight data for token efficiency
-        simplified_flights = []
-        for flight in cheapest_flights:
-            simplified_flights.append({
-                "airline": flight.get("airline", "Unknown"),
-                "price": flight.get("price", "N/A"),
-                "duration": flight.get("total_duration", "N/A")
-            })
-        
-        # Create itinerary
+    # Prompts for the independent research and hotel lookups
+    research_prompt = create_optimized_prompt(
+        action="Research top attractions and activities",
+        destination=destination,
+        preferences=f"Trip type: {travel_theme}. Activities: {activity_preferences}.",
+        constraints=f"Budget: {budget}. Duration: {num_days} days."
+    )
+    
+    hotel_restaurant_prompt = create_optimized_prompt(
+        action="Find top hotels and restaurants",
+        destination=destination,
+        preferences=f"Trip type: {travel_theme}. Hotel rating: {hotel_rating}.",
+        constraints=f"Budget: {budget}. Activities nearby: {activity_preferences}."
+    )
+    
+    def run_agent(agent, prompt):
+        # Get agent output without streaming
+        response = agent.run(prompt, stream=False)
+        return response.content if hasattr(response, 'content') else str(response)
+    
+    def planning_prompt_for(research, hotels, research_limit=500):
         planning_prompt = create_optimized_prompt(
             action=f"Create {num_days}-day itinerary",
             destination=destination,
@@ -335,18 +556,73 @@ if st.button("🚀 Generate Travel Plan"):
         )
         
         # Add research data but keep it brief
-        planning_prompt += f" Based on: {research_output[:500]}... {hotel_output[:500]}..."
-        
-        # Get itinerary output without streaming
-        itinerary_response = planner.run(planning_prompt, stream=False)
-        itinerary_output = itinerary_response.content if hasattr(itinerary_response, 'content') else str(itinerary_response)
-        
-        # Translate all content to preferred language if not English
-        if output_language != "English":
-            research_output = translate_text(research_output, output_language, SUTRA_API_KEY)
-            hotel_output = translate_text(hotel_output, output_language, SUTRA_API_KEY)
-            itinerary_output = translate_text(itinerary_output, output_language, SUTRA_API_KEY)
+        return planning_prompt + f" Based on: {research[:research_limit]}... {hotels[:research_limit]}..."
+    
+    def create_itinerary(research, hotels):
+        return run_agent(planner, planning_prompt_for(research, hotels))
+    
+    def create_structured_plan(research, hotels):
+        # One call writes the whole plan, including hotels and research, in the selected language
+        planning_prompt = planning_prompt_for(research, hotels, research_limit=1500)
+        planning_prompt += f" Write every text value in {output_language}."
+        response = planner.run(planning_prompt, stream=False)
+        return parse_travel_plan(response.content if hasattr(response, 'content') else response)
+    
+    def search_flights():
+        if flex_days:
+            return fetch_flights_date_range(source, destination, departure_date, return_date, flex_days)
+        return fetch_flights(source, destination, departure_date, return_date)
+    
+    # Flights, research and hotels are independent; the planner only waits for research and hotels.
+    translation_errors = []
+    plan_graph = TaskGraph(max_workers=4)
+    plan_graph.add("flights", search_flights)
+    plan_graph.add("research", lambda: run_agent(researcher, research_prompt))
+    plan_graph.add("hotels", lambda: run_agent(hotel_restaurant_finder, hotel_restaurant_prompt))
+    if structured_output:
+        plan_graph.add("plan", create_structured_plan, deps=["research", "hotels"])
+    else:
+        # Each section is translated as soon as it is ready, while the other agents are still running.
+        plan_graph.add("itinerary", create_itinerary, deps=["research", "hotels"])
+        plan_graph.add("research_translated", lambda research: translate_text(research, output_language, SUTRA_API_KEY, translation_errors), deps=["research"])
+        plan_graph.add("hotels_translated", lambda hotels: translate_text(hotels, output_language, SUTRA_API_KEY, translation_errors), deps=["hotels"])
+        plan_graph.add("itinerary_translated", lambda itinerary: translate_text(itinerary, output_language, SUTRA_API_KEY, translation_errors), deps=["itinerary"])
+    
+    # Hide intermediate processing and only show final results
+    with st.spinner("🔍 Processing your travel plan..."):
+        try:
+            plan_results = plan_graph.run()
+        except TaskFailed as e:
+            st.error(f"⚠️ Could not generate your travel plan: {str(e)}")
+            st.stop()
+    for message in translation_errors:
+        st.warning(message)
+    
+    # Keep the results in the session so on-demand actions (English version) survive reruns
+    st.session_state.travel_results = {
+        "language": output_language,
+        "source": source,
+        "destination": destination,
+        "departure_date": departure_date,
+        "return_date": return_date,
+        "flex_days": flex_days,
+        "flight_data": plan_results["flights"],
+        "plan": plan_results.get("plan"),
+        "english_plan": None,
+        "research": plan_results.get("research_translated"),
+        "hotels": plan_results.get("hotels_translated"),
+        "itinerary": plan_results.get("itinerary_translated"),
+        "timings": plan_graph.report(),
+        "total_time": plan_graph.total_time,
+        "task_time": sum(timing.duration for timing in plan_graph.timings.values())
+    }
 
+if "travel_results" in st.session_state:
+    results = st.session_state.travel_results
+    plan_language = results["language"]
+    flight_data = results["flight_data"]
+    cheapest_flights = extract_cheapest_flights(flight_data)
+    
     # Display Results - directly in preferred language, no expandable sections
     st.subheader("✈️ Cheapest Flight Options")
     if cheapest_flights:
@@ -369,11 +645,11 @@ if st.button("🚀 Generate Travel Plan"):
                 departure_token = flight.get("departure_token", "")
 
                 # Use translated labels based on selected language
-                if output_language != "English":
-                    departure_label = translate_text("Departure:", output_language, SUTRA_API_KEY)
-                    arrival_label = translate_text("Arrival:", output_language, SUTRA_API_KEY)
-                    duration_label = translate_text("Duration:", output_language, SUTRA_API_KEY)
-                    book_now = translate_text("Book Now", output_language, SUTRA_API_KEY)
+                if plan_language != "English":
+                    departure_label = translate_text("Departure:", plan_language, SUTRA_API_KEY)
+                    arrival_label = translate_text("Arrival:", plan_language, SUTRA_API_KEY)
+                    duration_label = translate_text("Duration:", plan_language, SUTRA_API_KEY)
+                    book_now = translate_text("Book Now", plan_language, SUTRA_API_KEY)
                 else:
                     departure_label = "Departure:"
                     arrival_label = "Arrival:"
@@ -383,29 +659,18 @@ if st.button("🚀 Generate Travel Plan"):
                 booking_link = "#"  # Default value
                 if departure_token:
                     try:
-                        params = {
-                            "engine": "google_flights",
-                            "departure_id": source,
-                            "arrival_id": destination,
-                            "outbound_date": str(departure_date),
-                            "return_date": str(return_date),
-                            "currency": "INR",
-                            "hl": "en",
-                            "departure_token": departure_token,
-                            "api_key": SERPAPI_KEY
-                        }
-                        search_with_token = GoogleSearch(params)
-                        results_with_booking = search_with_token.get_dict()
-                        
-                        # Check if we have valid booking data
-                        if 'best_flights' in results_with_booking and len(results_with_booking['best_flights']) > idx:
-                            booking_token = results_with_booking['best_flights'][idx].get('booking_token')
-                            if booking_token:
-                                booking_link = f"https://www.google.com/travel/flights?tfs={booking_token}"
+                        # With flexible dates each flight carries the dates it was found for
+                        booking_link = fetch_booking_link(
+                            results["source"], results["destination"],
+                            flight.get("outbound_date") or results["departure_date"],
+                            flight.get("return_date") or results["return_date"],
+                            departure_token, idx
+                        )
                     except Exception as e:
                         st.warning(f"Could not fetch booking link: {str(e)}")
                         booking_link = "#"
 
+
                 # Flight card layout with improved visibility for dark mode
                 st.markdown(
                     f"""
@@ -423,6 +688,7 @@ if st.button("🚀 Generate Travel Plan"):
                         <p style="color: #333;"><strong>{departure_label}</strong> {departure_time}</p>
                         <p style="color: #333;"><strong>{arrival_label}</strong> {arrival_time}</p>
                         <p style="color: #333;"><strong>{duration_label}</strong> {total_duration} min</p>
+                        {f'<p style="color: #333;">📅 {flight.get("outbound_date")} → {flight.get("return_date")}</p>' if results["flex_days"] and flight.get("outbound_date") else ''}
                         <h2 style="color: #008000;">💰 {price}</h2>
                         <a href="{booking_link}" target="_blank" style="
                             display: inline-block;
@@ -441,21 +707,48 @@ if st.button("🚀 Generate Travel Plan"):
                 )
     else:
         no_flights_message = "⚠️ No flight data available."
-        if output_language != "English":
-            no_flights_message = translate_text(no_flights_message, output_language, SUTRA_API_KEY)
+        if plan_language != "English":
+            no_flights_message = translate_text(no_flights_message, plan_language, SUTRA_API_KEY)
         st.warning(no_flights_message)
+    
+    if results["flex_days"]:
+        price_matrix_title = "📅 Cheapest Price by Date (rows: departure, columns: return)"
+        if plan_language != "English":
+            price_matrix_title = translate_text(price_matrix_title, plan_language, SUTRA_API_KEY)
+        st.subheader(price_matrix_title)
+        st.table(build_price_matrix(flight_data))
 
     # Display content directly in preferred language
-    st.subheader("🏨 Hotels & Restaurants")
-    st.markdown(hotel_output)
-    
-    st.subheader("🗺️ Your Personalized Itinerary")
-    st.markdown(itinerary_output)
-    
-    st.subheader("🔍 Destination Research")
-    st.markdown(research_output)
+    if results["plan"] is not None:
+        render_travel_plan(results["plan"])
+        
+        # The English version is only generated when asked for
+        if plan_language != "English":
+            if results["english_plan"] is None:
+                if st.button("🇬🇧 Show English version"):
+                    with st.spinner("Translating your plan to English..."):
+                        try:
+                            results["english_plan"] = translate_travel_plan(results["plan"], "English", SUTRA_API_KEY)
+                        except Exception as e:
+                            st.warning(f"Translation error: {str(e)}")
+            if results["english_plan"] is not None:
+                with st.expander("🇬🇧 English version", expanded=True):
+                    render_travel_plan(results["english_plan"])
+    else:
+        st.subheader("🏨 Hotels & Restaurants")
+        st.markdown(results["hotels"])
+        
+        st.subheader("🗺️ Your Personalized Itinerary")
+        st.markdown(results["itinerary"])
+        
+        st.subheader("🔍 Destination Research")
+        st.markdown(results["research"])
 
     success_message = "✅ Travel plan generated successfully!"
-    if output_language != "English":
-        success_message = translate_text(success_message, output_language, SUTRA_API_KEY)
-    st.success(success_message)
\ No newline at end of file
+    if plan_language != "English":
+        success_message = translate_text(success_message, plan_language, SUTRA_API_KEY)
+    st.success(success_message)
+    
+    with st.expander("⏱️ Generation timings"):
+        st.table(results["timings"])
+        st.caption(f"Finished in {results['total_time']:.1f}s (sequential would take about {results['task_time']:.1f}s)")
@@ -0,0 +1,106 @@
+import os
+import ast
+import sys
+import types
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+APPS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module-level calls worth keeping: the sutra_common bootstrap and base-URL redirection
+_KEPT_CALLS = {"sys.path.append", "use_serpapi_base_url"}
+
+
+class SessionState(dict):
+    """Attribute-style dict standing in for st.session_state outside a Streamlit run"""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self[name] = value
+
+
+class HeadlessStreamlit:
+    """
+    The real streamlit module with a persistent session_state
+
+    Without `streamlit run` every st.* element call is a no-op, but st.session_state is
+    recreated on each access, so functions that read settings from it need this wrapper.
+    """
+
+    def __init__(self, module: types.ModuleType, session_state: Dict[str, Any]):
+        self._module = module
+        self.session_state = SessionState(session_state)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._module, name)
+
+
+def _call_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Call):
+        node = node.func
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _uses_streamlit(node: ast.AST) -> bool:
+    return any(isinstance(n, ast.Name) and n.id == "st" for n in ast.walk(node))
+
+
+def _keep(node: ast.stmt) -> bool:
+    if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return True
+    if isinstance(node, ast.Try):
+        # Optional imports guarded by try/except ImportError
+        return all(isinstance(n, (ast.Import, ast.ImportFrom)) for n in node.body)
+    if isinstance(node, (ast.Assign, ast.AnnAssign)):
+        return node.value is not None and not _uses_streamlit(node.value)
+    if isinstance(node, ast.Expr):
+        return _call_name(node.value) in _KEPT_CALLS
+    return False
+
+
+def load_app(app: str, session_state: Optional[Dict[str, Any]] = None) -> types.ModuleType:
+    """
+    Import an app's functions and classes without running its page script
+
+    Only imports, definitions and constant assignments are executed; widgets, layout and
+    top-level control flow are skipped. Assignments that depend on skipped code are dropped.
+    """
+    path = os.path.join(APPS_DIR, app, "app.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    module = types.ModuleType(f"bench_{app.replace('-', '_')}")
+    module.__file__ = path
+    app_dir = os.path.dirname(path)
+    if app_dir not in sys.path:
+        # Apps import their helper modules (story_engine, quiz_store, ...) from their own folder
+        sys.path.insert(0, app_dir)
+
+    for node in tree.body:
+        if not _keep(node):
+            continue
+        code = compile(ast.Module(body=[node], type_ignores=[]), path, "exec")
+        if isinstance(node, (ast.Assign, ast.AnnAssign, ast.Expr)):
+            try:
+                exec(code, module.__dict__)
+            except Exception as e:
+                logger.debug(f"{app}: skipped line {node.lineno}: {str(e)}")
+        else:
+            exec(code, module.__dict__)
+
+    if isinstance(module.__dict__.get("st"), types.ModuleType):
+        module.st = HeadlessStreamlit(module.st, session_state or {})
+    return module
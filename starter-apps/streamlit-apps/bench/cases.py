@@ -0,0 +1,116 @@
+import io
+import asyncio
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Dict, List
+
+from .fixtures import Upload, jobs, long_text, make_pdf, news_items, products
+
+API_KEY = "bench-key"
+
+# Inputs that reach an API are salted with the iteration number, so the translation memory and
+# result caches never turn a later iteration into a cache hit
+
+
+@dataclass
+class BenchContext:
+    # Base URL of the mock server, for cases that fetch plain pages from it
+    mock_url: str
+    # Input size overrides: items, pages, chars or paragraphs depending on the case
+    size: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class Case:
+    name: str
+    app: str
+    description: str
+    # Builds the operation once from the loaded app module; the result is called per iteration
+    prepare: Callable[[ModuleType, BenchContext], Callable[[int], Any]]
+    session_state: Dict[str, Any] = field(default_factory=dict)
+
+
+def _translate_news(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    count = ctx.size.get("items", 10)
+    return lambda i: app.translate_news(news_items(count, salt=i), "Hindi", API_KEY)
+
+
+def _fetch_news(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    count = ctx.size.get("items", 10)
+    return lambda i: app.fetch_news(f"bench headlines {i}", count)
+
+
+def _translate_jobs(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    count = ctx.size.get("items", 10)
+    return lambda i: app.translate_jobs(jobs(count, salt=i), "Hindi", API_KEY)
+
+
+def _process_documents(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    pages = ctx.size.get("pages", 10)
+    return lambda i: app.process_documents([Upload(f"bench-{i}.pdf", make_pdf(pages, seed=i))])
+
+
+def _extract_text_from_pdf(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    pdf = make_pdf(ctx.size.get("pages", 50))
+    return lambda i: app.PDFProcessor.extract_text_from_pdf(io.BytesIO(pdf))
+
+
+def _chunk_text(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    text = long_text(ctx.size.get("chars", 500_000))
+    return lambda i: app.PDFProcessor.chunk_text(text)
+
+
+def _generate_mindmap(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    chars = ctx.size.get("chars", 30_000)
+    generator = app.MindmapGenerator(app.SutraClient(API_KEY))
+    return lambda i: asyncio.run(generator.generate_mindmap(long_text(chars, seed=i), "English", app.MindmapConfig()))
+
+
+def _scrape_website(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    paragraphs = ctx.size.get("paragraphs", 200)
+    return lambda i: app.scrape_website(f"{ctx.mock_url}/site/bench-{i}?paragraphs={paragraphs}", "Summarize the page")
+
+
+def _build_product_table(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    count = ctx.size.get("items", 5000)
+    items = [products(count, seed=i) for i in range(4)]
+    return lambda i: app.build_product_table(items[i % len(items)])
+
+
+def _filter_products_by_price(app: ModuleType, ctx: BenchContext) -> Callable[[int], Any]:
+    table = app.build_product_table(products(ctx.size.get("items", 5000)))
+    sorts = list(app.SORT_OPTIONS)
+    return lambda i: app.filter_products_by_price(
+        table, 10 * (i % 50), 5000 + 100 * (i % 10), min_rating=(i % 4) * 1.0, sort_by=sorts[i % len(sorts)]
+    )
+
+
+CASES: Dict[str, Case] = {case.name: case for case in [
+    Case("news.translate_news", "global-news-hub", "Translate 10 news cards to Hindi", _translate_news),
+    Case("news.fetch_news", "global-news-hub", "Serper news search plus one image lookup per result", _fetch_news,
+         session_state={"serper_api_key": API_KEY}),
+    Case("jobs.translate_jobs", "multilingual-job-hub", "Translate 10 job listings to Hindi", _translate_jobs),
+    Case("rag.process_documents", "Document_RAG_ChatBOT", "Load, split and embed a 10-page PDF into FAISS",
+         _process_documents),
+    Case("mindmap.extract_text_from_pdf", "mindmap-generator", "Extract text from a 50-page PDF",
+         _extract_text_from_pdf),
+    Case("mindmap.chunk_text", "mindmap-generator", "Split 500k characters into overlapping chunks", _chunk_text),
+    Case("mindmap.generate_mindmap", "mindmap-generator", "Chunked mindmap generation and merge for 30k characters",
+         _generate_mindmap),
+    Case("extractor.scrape_website", "multilingual-website-extractor", "Fetch and clean a 200-paragraph page",
+         _scrape_website),
+    Case("shopping.build_product_table", "multilingual-shopping-hub", "Normalize 5000 products into a table",
+         _build_product_table),
+    Case("shopping.filter_products_by_price", "multilingual-shopping-hub",
+         "Filter and sort a 5000-product table", _filter_products_by_price),
+]}
+
+
+def select(patterns: List[str]) -> List[Case]:
+    """Cases whose name equals or starts with one of the patterns (e.g. "news" or "mindmap.chunk_text")"""
+    if not patterns:
+        return list(CASES.values())
+    chosen = [c for c in CASES.values() if any(c.name == p or c.name.startswith(p.rstrip(".") + ".") for p in patterns)]
+    if not chosen:
+        raise ValueError(f"No benchmark matches {', '.join(patterns)}; choose from {', '.join(CASES)}")
+    return chosen
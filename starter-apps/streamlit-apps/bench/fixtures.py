@@ -0,0 +1,130 @@
+import io
+import random
+from typing import Any, Dict, List
+
+_WORDS = (
+    "government policy market growth science research health education climate energy city "
+    "rural farmers technology startup investment language culture festival transport water "
+    "budget election court report survey students hospital river monsoon harvest export"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def long_text(chars: int, seed: int = 0) -> str:
+    """Paragraphs of filler text, roughly chars long"""
+    rng = random.Random(seed)
+    paragraphs, size = [], 0
+    while size < chars:
+        paragraph = " ".join(sentence(rng) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:chars]
+
+
+def news_items(count: int, salt: int = 0) -> List[Dict[str, Any]]:
+    """Serper-style news results; salt makes the text unique so caches stay cold"""
+    rng = random.Random(salt)
+    return [
+        {
+            "title": f"{sentence(rng, 8)} #{salt}-{i}",
+            "snippet": sentence(rng, 30),
+            "source": rng.choice(["Daily Mock", "Local Times", "Wire Service"]),
+            "date": f"{rng.randint(1, 23)} hours ago",
+            "link": f"https://example.com/news/{salt}/{i}",
+            "imageUrl": f"https://example.com/img/{salt}/{i}.jpg",
+        }
+        for i in range(count)
+    ]
+
+
+def jobs(count: int, salt: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(salt)
+    return [
+        {
+            "title": f"{rng.choice(['Senior', 'Junior', 'Lead'])} {rng.choice(_WORDS).title()} Analyst #{salt}-{i}",
+            "company_name": rng.choice(["Acme", "Globex", "Initech", "Umbrella"]),
+            "location": rng.choice(["Bengaluru", "Pune", "Remote"]),
+            "via": "via Mock Jobs",
+            "description": " ".join(sentence(rng) for _ in range(6)),
+            "detected_extensions": {"posted_at": f"{rng.randint(1, 9)} days ago", "schedule_type": "Full-time"},
+        }
+        for i in range(count)
+    ]
+
+
+def lakh(amount: int) -> str:
+    """Indian digit grouping, e.g. 129999 as 1,29,999"""
+    head, tail = str(amount)[:-3], str(amount)[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return ",".join(([head] if head else []) + groups + [tail])
+
+
+def products(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    prices = [
+        "₹{:,}".format(rng.randint(100, 90000)),
+        "₹" + lakh(rng.randint(100000, 9000000)),
+        "Rs. {}.00".format(lakh(rng.randint(1000, 900000))),
+        "${:.2f}".format(rng.uniform(1, 900)),
+        "€{:.2f}".format(rng.uniform(1, 900)),
+        "",
+    ]
+    return [
+        {
+            "title": f"{rng.choice(_WORDS).title()} product {i}",
+            "source": rng.choice(["Shop One", "Market Two", "Store Three", "Bazaar"]),
+            "price": rng.choice(prices),
+            "rating": round(rng.uniform(1.0, 5.0), 1) if rng.random() > 0.1 else None,
+            "ratingCount": f"{rng.randint(0, 20000):,}",
+            "delivery": rng.choice(["Free delivery", ""]),
+        }
+        for i in range(count)
+    ]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int = 20, words_per_page: int = 400, seed: int = 0) -> bytes:
+    """A valid text PDF built by hand, so PDF benchmarks need no sample files"""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(pages)), pages)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        words = [rng.choice(_WORDS) for _ in range(words_per_page)]
+        lines = [" ".join(words[j:j + 12]) for j in range(0, len(words), 12)]
+        stream = "BT /F1 10 Tf 50 770 Td 14 TL\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in lines) + "ET"
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        ).encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+class Upload(io.BytesIO):
+    """In-memory file with the name/getbuffer() interface of a Streamlit UploadedFile"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
@@ -0,0 +1,106 @@
+import sys
+import json
+import math
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from .app_loader import load_app
+from .cases import BenchContext, Case
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    low, high = math.floor(position), math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def mock_stats(mock_url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{mock_url}/_mock/stats", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _per_op(before: Dict[str, int], after: Dict[str, int], ops: int) -> Dict[str, float]:
+    return {
+        key: round((after.get(key, 0) - before.get(key, 0)) / ops, 2)
+        for key in sorted(after)
+        if after.get(key, 0) != before.get(key, 0)
+    }
+
+
+def run_case(case: Case, ctx: BenchContext, iterations: int, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time one case against the mock server and return its metrics
+
+    Warmup iterations use their own salts, so measured iterations still miss every cache.
+    API calls and tokens come from the mock server's counters, divided by the iterations run.
+    """
+    app = load_app(case.app, case.session_state)
+    op = case.prepare(app, ctx)
+    for i in range(warmup):
+        op(iterations + i)
+    load_rss = peak_rss_mb()
+
+    before = mock_stats(ctx.mock_url)
+    durations = []
+    failures, last_error = 0, None
+    started = time.perf_counter()
+    for i in range(iterations):
+        op_started = time.perf_counter()
+        try:
+            op(i)
+        except Exception as e:
+            failures += 1
+            last_error = f"{type(e).__name__}: {str(e)}"
+        durations.append(time.perf_counter() - op_started)
+    elapsed = time.perf_counter() - started
+    after = mock_stats(ctx.mock_url)
+
+    ms = [d * 1000 for d in durations]
+    tokens = {
+        "prompt": round((after["prompt_tokens"] - before["prompt_tokens"]) / iterations, 1),
+        "completion": round((after["completion_tokens"] - before["completion_tokens"]) / iterations, 1),
+    }
+    result = {
+        "name": case.name,
+        "app": case.app,
+        "description": case.description,
+        "iterations": iterations,
+        "warmup": warmup,
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 2),
+            "p90": round(percentile(ms, 90), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "mean": round(sum(ms) / len(ms), 2),
+            "min": round(min(ms), 2),
+            "max": round(max(ms), 2),
+        },
+        "throughput_ops_s": round(iterations / elapsed, 2) if elapsed else None,
+        "api_calls_per_op": _per_op(before["requests"], after["requests"], iterations),
+        "api_errors_per_op": _per_op(before["errors"], after["errors"], iterations),
+        "tokens_per_op": dict(tokens, total=round(tokens["prompt"] + tokens["completion"], 1)),
+        "load_rss_mb": load_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "failures": failures,
+    }
+    if last_error:
+        result["last_error"] = last_error
+    return result
@@ -0,0 +1,392 @@
+import os
+import re
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from streamlit.testing.v1 import AppTest
+
+from .app_loader import APPS_DIR
+from .harness import mock_stats, peak_rss_mb, percentile
+from .run import bench_env, git_commit
+from .scenarios import SCENARIOS, Action, Scenario
+
+# A pool task that waited longer than this for a free worker counts as queued
+QUEUED_WAIT = 0.01
+SAMPLE_INTERVAL = 0.2
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size right now; falls back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def thread_group(name: str) -> str:
+    """"translate_3" -> "translate", "ThreadPoolExecutor-2_0" -> "ThreadPoolExecutor\""""
+    name = re.sub(r"\s*\(.*\)$", "", name)
+    return re.sub(r"[-_]\d+(_\d+)?$", "", name) or "unnamed"
+
+
+class PoolMonitor:
+    """
+    Queue wait and concurrency of every ThreadPoolExecutor in the process, by thread name prefix
+
+    install() wraps ThreadPoolExecutor.submit, so the apps' own pools (translation, prefetch,
+    task graph, mindmap chunks) are measured without changing their code. A pool is saturated
+    when its tasks spend time queued behind busy workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._original: Optional[Callable] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waits: Dict[str, List[float]] = defaultdict(list)
+            self._active: Dict[str, int] = defaultdict(int)
+            self._peak: Dict[str, int] = defaultdict(int)
+
+    def install(self) -> None:
+        if self._original is not None:
+            return
+        original = self._original = ThreadPoolExecutor.submit
+        monitor = self
+
+        def submit(executor, fn, /, *args, **kwargs):
+            pool = thread_group(executor._thread_name_prefix or "ThreadPoolExecutor")
+            queued = time.perf_counter()
+
+            def run(*run_args, **run_kwargs):
+                monitor._started(pool, time.perf_counter() - queued)
+                try:
+                    return fn(*run_args, **run_kwargs)
+                finally:
+                    monitor._finished(pool)
+
+            return original(executor, run, *args, **kwargs)
+
+        ThreadPoolExecutor.submit = submit
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            ThreadPoolExecutor.submit = self._original
+            self._original = None
+
+    def _started(self, pool: str, wait: float) -> None:
+        with self._lock:
+            self._waits[pool].append(wait)
+            self._active[pool] += 1
+            self._peak[pool] = max(self._peak[pool], self._active[pool])
+
+    def _finished(self, pool: str) -> None:
+        with self._lock:
+            self._active[pool] -= 1
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                pool: {
+                    "tasks": len(waits),
+                    "wait_p50_ms": round(percentile(waits, 50) * 1000, 1),
+                    "wait_p95_ms": round(percentile(waits, 95) * 1000, 1),
+                    "wait_max_ms": round(max(waits) * 1000, 1),
+                    "queued_share": round(sum(w > QUEUED_WAIT for w in waits) / len(waits), 3),
+                    "peak_active": self._peak[pool],
+                }
+                for pool, waits in sorted(self._waits.items())
+            }
+
+
+class Sampler:
+    """Background sampler of process RSS and live threads per name group"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.peak_rss = 0.0
+            self.peak_threads = 0
+            self.peak_groups: Dict[str, int] = defaultdict(int)
+
+    def sample(self) -> None:
+        rss = current_rss_mb() or 0.0
+        threads = threading.enumerate()
+        groups: Dict[str, int] = defaultdict(int)
+        for thread in threads:
+            groups[thread_group(thread.name)] += 1
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_threads = max(self.peak_threads, len(threads))
+            for group, count in groups.items():
+                self.peak_groups[group] = max(self.peak_groups[group], count)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="loadtest-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[Tuple[str, float, Optional[str]]] = []
+
+    def add(self, step: str, seconds: float, error: Optional[str]) -> None:
+        with self._lock:
+            self.records.append((step, seconds, error))
+
+
+def _widget(at: AppTest, action: Action):
+    widgets = getattr(at, action.widget)
+    if action.label is None:
+        return widgets[0]
+    for widget in widgets:
+        if widget.label == action.label:
+            return widget
+    raise LookupError(f"No {action.widget} labelled {action.label!r}")
+
+
+def _interact(at: AppTest, step: str, actions: List[Action], user: int, timeout: float, recorder: Recorder) -> None:
+    """Apply one step's widget changes, rerun the script and record how long the rerun took"""
+    started = time.perf_counter()
+    error = None
+    try:
+        for action in actions:
+            widget = _widget(at, action)
+            if action.widget == "button":
+                widget.click()
+            else:
+                value = action.value.format(user=user) if isinstance(action.value, str) else action.value
+                widget.set_value(value)
+        started = time.perf_counter()
+        at.run(timeout=timeout)
+        if at.exception:
+            error = at.exception[0].message
+    except Exception as e:
+        error = f"{type(e).__name__}: {str(e)}"
+    recorder.add(step, time.perf_counter() - started, error)
+
+
+def run_session(scenario: Scenario, user: int, args: argparse.Namespace, recorder: Recorder) -> None:
+    """One simulated browser session: open the page, then walk the scenario's steps"""
+    at = AppTest.from_file(os.path.join(APPS_DIR, scenario.app, "app.py"), default_timeout=args.timeout)
+    input_user = 0 if args.shared_inputs else user
+    _interact(at, "open", [], input_user, args.timeout, recorder)
+    for _ in range(args.rounds):
+        for step in scenario.steps:
+            if args.think:
+                time.sleep(random.uniform(0, 2 * args.think))
+            _interact(at, step.name, step.actions, input_user, args.timeout, recorder)
+
+
+def _latency(seconds: List[float]) -> Dict[str, float]:
+    ms = [s * 1000 for s in seconds]
+    return {
+        "p50": round(percentile(ms, 50), 1),
+        "p95": round(percentile(ms, 95), 1),
+        "p99": round(percentile(ms, 99), 1),
+        "max": round(max(ms), 1) if ms else 0.0,
+    }
+
+
+def run_level(scenario: Scenario, users: int, args: argparse.Namespace, monitor: PoolMonitor,
+              sampler: Sampler, mock_url: str, first_user: int) -> Dict[str, Any]:
+    """Run users concurrent sessions, started over args.ramp seconds, and summarize them"""
+    gc.collect()
+    start_rss = current_rss_mb() or 0.0
+    monitor.reset()
+    sampler.reset()
+    before = mock_stats(mock_url)
+    recorder = Recorder()
+
+    sessions = [
+        threading.Thread(target=run_session, args=(scenario, first_user + i, args, recorder), name=f"session-{i}")
+        for i in range(users)
+    ]
+    started = time.perf_counter()
+    for i, session in enumerate(sessions):
+        session.start()
+        if args.ramp and i < users - 1:
+            time.sleep(args.ramp / users)
+    for session in sessions:
+        session.join()
+    duration = time.perf_counter() - started
+    sampler.sample()
+    after = mock_stats(mock_url)
+
+    steps: Dict[str, List[float]] = defaultdict(list)
+    step_errors: Dict[str, int] = defaultdict(int)
+    errors = []
+    for step, seconds, error in recorder.records:
+        steps[step].append(seconds)
+        if error:
+            step_errors[step] += 1
+            errors.append(error)
+
+    return {
+        "users": users,
+        "duration_s": round(duration, 2),
+        "interactions": len(recorder.records),
+        "interactions_per_s": round(len(recorder.records) / duration, 2) if duration else None,
+        "errors": len(errors),
+        "sample_errors": sorted(set(errors))[:5],
+        "latency_ms": _latency([seconds for _, seconds, _ in recorder.records]),
+        "steps": {
+            step: dict(_latency(seconds), count=len(seconds), errors=step_errors[step])
+            for step, seconds in steps.items()
+        },
+        "pools": monitor.report(),
+        "threads": {"peak": sampler.peak_threads, "peak_by_group": dict(sorted(sampler.peak_groups.items()))},
+        "rss_mb": {"start": start_rss, "peak": sampler.peak_rss},
+        "mb_per_session": round(max(0.0, sampler.peak_rss - start_rss) / users, 2),
+        "api_calls": after["total_requests"] - before["total_requests"],
+        "api_errors": sum(after["errors"].values()) - sum(before["errors"].values()),
+    }
+
+
+def start_mock(args: argparse.Namespace) -> Tuple[subprocess.Popen, str, Dict[str, str]]:
+    """Run the mock server in its own process, so its threads and CPU stay out of the measurements"""
+    command = [
+        sys.executable, "-u", "-m", "sutra_common.mock_server", "--port", "0",
+        "--latency", args.latency, "--token-rate", str(args.token_rate), "--seed", str(args.seed),
+    ] + [f"--error-rate={rate}" for rate in args.error_rate]
+    process = subprocess.Popen(command, cwd=APPS_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    url, env = None, {}
+    for line in process.stdout:
+        if line.startswith("Mock server on "):
+            url = line.split()[3]
+        elif line.startswith("export "):
+            name, _, value = line[len("export "):].strip().partition("=")
+            env[name] = value
+        elif line.startswith("Stats:"):
+            break
+    if url is None:
+        process.kill()
+        raise RuntimeError("The mock server did not start")
+    return process, url, env
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    pools = level["pools"].values()
+    wait_p95 = max((p["wait_p95_ms"] for p in pools), default=0.0)
+    queued = max((p["queued_share"] for p in pools), default=0.0)
+    latency = level["latency_ms"]
+    print(
+        f"{level['users']:>6} {level['interactions_per_s'] or 0:>8.2f} {latency['p50']:>9.0f} {latency['p95']:>9.0f} "
+        f"{latency['max']:>9.0f} {level['errors']:>7} {level['threads']['peak']:>8} {wait_p95:>10.0f} {queued:>8.0%} "
+        f"{level['rss_mb']['peak']:>8.0f} {level['mb_per_session']:>10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive many simulated Streamlit sessions against the local mock server")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS), help="Scripted interaction to run")
+    parser.add_argument("--users", default="1,5,10,25", help="Comma-separated concurrency levels to step through")
+    parser.add_argument("--rounds", type=int, default=1, help="Times each session repeats the scenario")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean think time between interactions, in seconds")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which each level's sessions start")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds one script rerun may take")
+    parser.add_argument("--shared-inputs", action="store_true",
+                        help="Every session searches and asks the same thing (exercises caches and coalescing)")
+    parser.add_argument("--latency", default="lognormal:0.6,0.4", help="Mock time to first byte, as for the mock server")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="Mock streamed tokens per second")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[SERVICE=]RATE")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--slo-ms", type=float, help="p95 interaction latency target used to report capacity")
+    parser.add_argument("--out", help="Write results to this JSON file (default: bench/results/loadtest-<timestamp>.json)")
+    args = parser.parse_args()
+
+    scenario = SCENARIOS[args.scenario]
+    levels = [int(n) for n in args.users.split(",") if n.strip()]
+    process, mock_url, mock_env = start_mock(args)
+    monitor, sampler = PoolMonitor(), Sampler()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="sutra-loadtest-") as workdir:
+            os.environ.update(bench_env(mock_env, workdir))
+            monitor.install()
+            sampler.start()
+            print(f"{scenario.name}: {scenario.description} ({scenario.app}, mock on {mock_url})")
+            print(f"{'users':>6} {'int/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'errors':>7} "
+                  f"{'threads':>8} {'pool wait':>10} {'queued':>8} {'RSS MB':>8} {'MB/session':>10}")
+            first_user = 0
+            for users in levels:
+                level = run_level(scenario, users, args, monitor, sampler, mock_url, first_user)
+                # New session numbers per level keep later levels off earlier levels' cached answers
+                first_user += users
+                results.append(level)
+                print_level(level)
+    finally:
+        sampler.stop()
+        monitor.uninstall()
+        process.terminate()
+
+    for level in results:
+        print(f"\n{level['users']} users, per step (p50 / p95 ms):")
+        for step, stats in level["steps"].items():
+            errors = f", {stats['errors']} errors" if stats["errors"] else ""
+            print(f"  {step:<16} {stats['p50']:>9.0f} / {stats['p95']:<9.0f} ({stats['count']} runs{errors})")
+        for pool, stats in level["pools"].items():
+            print(f"  pool {pool:<20} {stats['tasks']} tasks, wait p95 {stats['wait_p95_ms']:.0f} ms, "
+                  f"{stats['queued_share']:.0%} queued, peak {stats['peak_active']} active")
+        for error in level["sample_errors"]:
+            print(f"  error: {error}")
+
+    capacity = None
+    if args.slo_ms is not None:
+        passing = [l["users"] for l in results if l["latency_ms"]["p95"] <= args.slo_ms and not l["errors"]]
+        capacity = max(passing) if passing else 0
+        print(f"\nHighest level within p95 <= {args.slo_ms:.0f} ms and no errors: {capacity} users")
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "scenario": scenario.name,
+        "app": scenario.app,
+        "settings": {
+            "rounds": args.rounds, "think": args.think, "ramp": args.ramp, "shared_inputs": args.shared_inputs,
+            "latency": args.latency, "token_rate": args.token_rate, "error_rate": args.error_rate, "seed": args.seed,
+        },
+        "slo_ms": args.slo_ms,
+        "capacity_users": capacity,
+        "levels": results,
+    }
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                   f"loadtest-{scenario.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {out}")
+
+
+if __name__ == "__main__":
+    main()
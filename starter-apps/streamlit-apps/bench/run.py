@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import platform
+import importlib
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .app_loader import APPS_DIR
+from .cases import CASES, BenchContext, select
+from .harness import run_case
+
+# Shared helpers live in ../sutra_common
+sys.path.append(APPS_DIR)
+from sutra_common.mock_server import Latency, MockConfig, MockServer
+
+logger = logging.getLogger(__name__)
+
+# (label, getter) of the metrics compared against a baseline; higher is worse for all of them
+METRICS = [
+    ("p50 ms", lambda r: r["latency_ms"]["p50"]),
+    ("p90 ms", lambda r: r["latency_ms"]["p90"]),
+    ("api calls/op", lambda r: sum(r["api_calls_per_op"].values())),
+    ("tokens/op", lambda r: r["tokens_per_op"]["total"]),
+    ("peak RSS MB", lambda r: r["peak_rss_mb"]),
+]
+# Latency changes smaller than this are noise however large they are in percent
+MIN_LATENCY_DELTA_MS = 1.0
+
+
+def bench_env(mock_env: Dict[str, str], workdir: str) -> Dict[str, str]:
+    """Environment that points every app at the mock server and keeps its caches in workdir"""
+    env = dict(os.environ)
+    env.update(mock_env)
+    env.update({
+        # langchain_openai reads its own variable before the OpenAI SDK falls back to OPENAI_BASE_URL
+        "OPENAI_API_BASE": mock_env["OPENAI_BASE_URL"],
+        "SUTRA_API_KEY": "bench-key",
+        "OPENAI_API_KEY": "bench-key",
+        # A fresh translation memory per run, so results never depend on earlier runs
+        "SUTRA_TM_PATH": os.path.join(workdir, "translation_memory.db"),
+        # The mock has no quota; pacing would only measure the limiter's sleep
+        "SUTRA_RATE_LIMITS": "sutra=100000/1000,serper=100000/1000,serpapi=100000/1000,assemblyai=100000/1000",
+        "STREAMLIT_LOGGER_LEVEL": "error",
+        "PYTHONPATH": os.pathsep.join(filter(None, [APPS_DIR, os.environ.get("PYTHONPATH")])),
+    })
+    return env
+
+
+def parse_sizes(values: List[str]) -> Dict[str, int]:
+    sizes = {}
+    for value in values:
+        key, _, number = value.partition("=")
+        sizes[key.strip()] = int(number)
+    return sizes
+
+
+def run_isolated(name: str, args: argparse.Namespace, mock: MockServer, env: Dict[str, str], workdir: str) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter, so imports and peak RSS belong to that case alone"""
+    out = os.path.join(workdir, f"{name}.json")
+    command = [
+        sys.executable, "-m", "bench.run", "--worker", name, "--worker-out", out, "--mock-url", mock.url,
+        "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+    ] + [f"--size={size}" for size in args.size]
+    completed = subprocess.run(command, cwd=APPS_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0 or not os.path.exists(out):
+        error = (completed.stderr or completed.stdout).strip().splitlines()[-1:] or ["no output"]
+        return {"name": name, "app": CASES[name].app, "error": error[0]}
+    with open(out, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> Tuple[List[Dict[str, Any]], bool]:
+    """Per-metric changes against a baseline file; a change above threshold (0.2 = 20%) is a regression"""
+    previous = {r["name"]: r for r in baseline.get("results", []) if "error" not in r}
+    rows, regressed = [], False
+    for result in results:
+        old_result = previous.get(result["name"])
+        if old_result is None or "error" in result:
+            continue
+        for label, metric in METRICS:
+            old, new = metric(old_result), metric(result)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (float("inf") if new else 0.0)
+            regression = change > threshold
+            if label.endswith("ms") and new - old < MIN_LATENCY_DELTA_MS:
+                regression = False
+            regressed |= regression
+            rows.append({
+                "name": result["name"], "metric": label, "baseline": old, "current": new,
+                "change": change, "regression": regression,
+            })
+    return rows, regressed
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'case':<36} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'ops/s':>8} {'calls/op':>9} {'tokens/op':>10} {'RSS MB':>8}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['name']:<36} ERROR {r['error']}")
+            continue
+        latency = r["latency_ms"]
+        print(
+            f"{r['name']:<36} {latency['p50']:>10.1f} {latency['p90']:>10.1f} {latency['p99']:>10.1f} "
+            f"{r['throughput_ops_s'] or 0:>8.2f} {sum(r['api_calls_per_op'].values()):>9.1f} "
+            f"{r['tokens_per_op']['total']:>10.0f} {r['peak_rss_mb'] or 0:>8.0f}"
+        )
+        if r["failures"]:
+            print(f"{'':<36} {r['failures']} failed iterations, last: {r.get('last_error')}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    print(f"\nCompared with baseline (regression threshold {threshold:.0%}):")
+    for row in rows:
+        change = "new" if row["change"] == float("inf") else f"{row['change']:+.1%}"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<36} {row['metric']:<13} {row['baseline']:>10.1f} -> {row['current']:>10.1f} {change:>8}{flag}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APPS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def worker(args: argparse.Namespace) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    ctx = BenchContext(args.mock_url, parse_sizes(args.size))
+    result = run_case(CASES[args.worker], ctx, args.iterations, args.warmup)
+    with open(args.worker_out, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the starter apps' hot paths against the local mock server")
+    parser.add_argument("--cases", nargs="*", default=[], help=f"Case names or prefixes (default: all of {', '.join(CASES)})")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--size", action="append", default=[], metavar="KEY=N",
+                        help="Input size override: items, pages, chars or paragraphs")
+    parser.add_argument("--latency", default="fixed:0.05", help="Mock time to first byte, as for the mock server")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Mock streamed tokens per second (0 = unthrottled)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run every case in this process (faster, but imports and peak RSS accumulate)")
+    parser.add_argument("--out", help="Write results to this JSON file (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when a metric regresses")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", help=argparse.SUPPRESS)
+    parser.add_argument("--mock-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+    if args.list:
+        for case in CASES.values():
+            print(f"{case.name:<36} {case.app:<32} {case.description}")
+        return
+
+    cases = select(args.cases)
+    config = MockConfig(latency={"*": Latency.parse(args.latency)}, token_rate=args.token_rate, seed=args.seed)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sutra-bench-") as workdir, MockServer(config=config) as mock:
+        env = bench_env(mock.env(), workdir)
+        if args.in_process:
+            os.environ.update(env)
+            # Base URLs are read at import time
+            import sutra_common.endpoints
+            importlib.reload(sutra_common.endpoints)
+        for case in cases:
+            print(f"Running {case.name} ({args.iterations} iterations)...", file=sys.stderr)
+            if args.in_process:
+                try:
+                    results.append(run_case(case, BenchContext(mock.url, parse_sizes(args.size)), args.iterations, args.warmup))
+                except Exception as e:
+                    results.append({"name": case.name, "app": case.app, "error": f"{type(e).__name__}: {str(e)}"})
+            else:
+                results.append(run_isolated(case.name, args, mock, env, workdir))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "isolated": not args.in_process,
+        "mock": {"latency": args.latency, "token_rate": args.token_rate, "seed": args.seed},
+        "results": results,
+    }
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                   datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_results(results)
+    print(f"\nSaved {out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            rows, regressed = compare(results, json.load(f), args.threshold)
+        print_comparison(rows, args.threshold)
+        if regressed and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
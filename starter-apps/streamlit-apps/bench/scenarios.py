@@ -0,0 +1,68 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Action:
+    # AppTest element list: text_input, selectbox, slider, number_input, multiselect, button or chat_input
+    widget: str
+    # Widget label; None picks the first widget of that type
+    label: Optional[str] = None
+    # New value; "{user}" is replaced with the session number (or 0 with --shared-inputs)
+    value: Any = None
+
+
+@dataclass
+class Step:
+    """One user interaction: set some widgets, then the script reruns once"""
+    name: str
+    actions: List[Action] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    app: str
+    description: str
+    steps: List[Step]
+
+
+_NEWS_KEYS = [
+    Action("text_input", "Enter your Sutra API Key:", "bench-key"),
+    Action("text_input", "Enter your Serper API Key:", "bench-key"),
+]
+_SHOPPING_KEYS = [
+    Action("text_input", "Enter your Serper API Key:", "bench-key"),
+    Action("text_input", "Enter your Sutra API Key:", "bench-key"),
+]
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in [
+    Scenario("news", "global-news-hub", "Search, switch to Hindi, page forward", [
+        Step("search", _NEWS_KEYS + [
+            Action("text_input", "Search for news:", "monsoon forecast {user}"),
+            Action("button", "Search"),
+        ]),
+        Step("translate", [Action("selectbox", "Select language:", "Hindi")]),
+        Step("next_page", [Action("button", "Next →")]),
+        Step("previous_page", [Action("button", "← Previous")]),
+    ]),
+    Scenario("shopping", "multilingual-shopping-hub", "Search, filter, sort, switch to Hindi", [
+        Step("search", _SHOPPING_KEYS + [
+            Action("text_input", "Search for products:", "running shoes {user}"),
+            Action("button", "Search"),
+        ]),
+        Step("filter", [Action("slider", "Minimum rating:", 3.0)]),
+        Step("sort", [Action("selectbox", "Sort by:", "Price: Low to High")]),
+        Step("translate", [Action("selectbox", "Select language:", "Hindi")]),
+    ]),
+    Scenario("chat", "sutra_multilingual_chat", "Three chat turns in Hindi", [
+        Step("language", [Action("selectbox", "Select language:", "Hindi")]),
+        Step("message_1", [Action("chat_input", None, "Hello, I am user {user}. What can you do?")]),
+        Step("message_2", [Action("chat_input", None, "Suggest three books about history.")]),
+        Step("message_3", [Action("chat_input", None, "Summarize that in one sentence.")]),
+    ]),
+    Scenario("scheme", "Government_Scheme_Explainer", "Two questions about the default scheme", [
+        Step("question_1", [Action("chat_input", None, "Who is eligible? (user {user})")]),
+        Step("question_2", [Action("chat_input", None, "How do I apply?")]),
+    ]),
+]}
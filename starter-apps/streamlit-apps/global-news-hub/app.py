@@ -1,10 +1,27 @@
 import streamlit as st
 import requests
 import json
+import os
+import sys
+import logging
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 from langchain.callbacks.base import BaseCallbackHandler
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL, serper_url
+from sutra_common.progressive_translation import translate_as_completed
+from sutra_common.query_translation import translate_query_cached
+from sutra_common.rate_limiter import BACKGROUND, INTERACTIVE, PREFETCH, get_rate_limiter
+from sutra_common.result_cache import ResultCache
+from sutra_common.single_flight import invoke_coalesced
+from sutra_common.telemetry import HTTP, enabled as telemetry_enabled, get_telemetry, llm_callbacks, traced
+from sutra_common.token_budget import NORMAL, get_token_ledger, session_budget
+from sutra_common.translation_memory import get_translation_memory
+
+logger = logging.getLogger(__name__)
+
 # Page configuration
 st.set_page_config(
     page_title="Global News Hub",
@@ -27,6 +44,14 @@ languages = [
     "Tagalog", "Swahili"
 ]
 
+# Bump when the news translation prompt changes so cached translations are not reused
+NEWS_PROMPT_VERSION = "news-v1"
+# Translations made with the compact economy prompt are kept apart from the full prompt's
+NEWS_COMPACT_PROMPT_VERSION = "news-compact-v1"
+QUERY_PROMPT_VERSION = "query-news-v1"
+# Once a session is past its token budget, only this many stories per page are translated
+EXHAUSTED_TRANSLATIONS = 3
+
 # Streaming callback handler for Sutra LLM
 class StreamHandler(BaseCallbackHandler):
     def __init__(self, container, initial_text=""):
@@ -43,9 +68,10 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model(api_key):
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.3,  # Lower temperature for more accurate translations
+        callbacks=llm_callbacks()
     )
 
 # Create a streaming version of the model with callback handler
@@ -53,39 +79,53 @@ def get_streaming_chat_model(api_key, callback_handler=None):
     # Create a new instance with streaming enabled
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.3,  # Lower temperature for more accurate translations
         streaming=True,
-        callbacks=[callback_handler] if callback_handler else None
+        callbacks=llm_callbacks(callback_handler)
     )
 
+# Shared search result cache - identical searches from every session share one Serper call
+@st.cache_resource
+def get_search_cache():
+    return ResultCache(ttl=300)
+
+# Every Serper request goes through the shared limiter; prefetching waits behind interactive searches
+def serper_post(url, headers, payload, priority=INTERACTIVE):
+    def post():
+        response = requests.request("POST", url, headers=headers, data=payload)
+        response.raise_for_status()
+        return response.json()
+    return get_rate_limiter().call("serper", post, priority)
+
 # Function to fetch high-quality image using Serper Images API
-def fetch_high_quality_image(query):
-    url = "https://google.serper.dev/images"
+@traced("news.image_lookup", kind=HTTP)
+def fetch_high_quality_image(query, api_key=None, priority=INTERACTIVE):
+    url = serper_url("images")
     payload = json.dumps({
         "q": query,
         "num": 1  # We only need one image
     })
     headers = {
-        'X-API-KEY': st.session_state.serper_api_key,
+        'X-API-KEY': api_key or st.session_state.serper_api_key,
         'Content-Type': 'application/json'
     }
     
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response.raise_for_status()
-        results = response.json()
+        results = serper_post(url, headers, payload, priority)
         if results.get("images") and len(results["images"]) > 0:
             return results["images"][0].get("imageUrl")
         return None
     except Exception as e:
-        st.warning(f"Error fetching high-quality image: {str(e)}")
+        # Also runs on the prefetch thread, where st.* calls have no page to write to
+        logger.warning(f"Error fetching high-quality image: {str(e)}")
         return None
 
-# Function to fetch news using Serper API
-def fetch_news(query, num_results=10, language=None, page=1):
-    url = "https://google.serper.dev/news"
+# Fetch one page of news from Serper without touching the UI (safe to run in the background)
+@traced("news.search", kind=HTTP)
+def load_news_page(query, num_results, language, page, api_key, priority=INTERACTIVE):
+    url = serper_url("news")
     payload = {
         "q": query,
         "num": num_results
@@ -99,169 +139,235 @@ def fetch_news(query, num_results=10, language=None, page=1):
         
     payload = json.dumps(payload)
     headers = {
-        'X-API-KEY': st.session_state.serper_api_key,
+        'X-API-KEY': api_key,
         'Content-Type': 'application/json'
     }
     
+    results = serper_post(url, headers, payload, priority)
+    news_items = results.get("news", [])
+    
+    # Enhance news items with high-quality images
+    enhanced_news_items = []
+    for item in news_items:
+        # Try to get a high-quality image based on the title
+        high_quality_image = fetch_high_quality_image(item.get('title', ''), api_key, priority)
+        if high_quality_image:
+            item['imageUrl'] = high_quality_image
+        enhanced_news_items.append(item)
+    
+    return enhanced_news_items
+
+def news_cache_key(query, num_results, language, page):
+    return ResultCache.make_key("news", query, {"num": num_results, "hl": language}, page)
+
+# Function to fetch news using Serper API
+@traced("news.fetch")
+def fetch_news(query, num_results=10, language=None, page=1):
+    api_key = st.session_state.serper_api_key
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response.raise_for_status()  # Raise exception for HTTP errors
-        results = response.json()
-        news_items = results.get("news", [])
-        
-        # Enhance news items with high-quality images
-        enhanced_news_items = []
-        for item in news_items:
-            # Try to get a high-quality image based on the title
-            high_quality_image = fetch_high_quality_image(item.get('title', ''))
-            if high_quality_image:
-                item['imageUrl'] = high_quality_image
-            enhanced_news_items.append(item)
-        
-        return enhanced_news_items
+        return get_search_cache().get_or_load(
+            news_cache_key(query, num_results, language, page),
+            lambda: load_news_page(query, num_results, language, page, api_key)
+        )
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching news: {str(e)}")
         return []
 
-# Function to translate news using Sutra LLM
-def translate_news(news_items, target_language, api_key):
-    try:
+# Load the next page (and its translations) in the background while the user reads this one
+def prefetch_news_page(query, num_results, language, page, target_language, sutra_api_key):
+    serper_api_key = st.session_state.serper_api_key
+    budget = session_budget(st.session_state)
+    
+    def translate_page(news_items):
+        # Translations land in the translation memory, so rendering the page later is instant.
+        # Prefetch translation is optional work, so it stops once the session budget is spent.
+        if target_language != "English" and sutra_api_key and budget.allows_optional():
+            for item in news_items:
+                try:
+                    translate_news_item(item, target_language, sutra_api_key, PREFETCH, budget)
+                except Exception:
+                    continue
+    
+    get_search_cache().prefetch(
+        news_cache_key(query, num_results, language, page),
+        lambda: load_news_page(query, num_results, language, page, serper_api_key, PREFETCH),
+        on_loaded=translate_page
+    )
+
+# Translate one news item, reusing the shared translation memory where possible
+@traced("news.translate_item")
+def translate_news_item(item, target_language, api_key, priority=BACKGROUND, budget=None):
+    # Prepare only the fields that need translation
+    fields_to_translate = {
+        "title": item.get('title', ''),
+        "snippet": item.get('snippet', ''),
+        "source": item.get('source', '')
+    }
+    
+    # Sessions near their token budget translate with a prompt about a fifth the size
+    compact = budget is not None and budget.level != NORMAL
+    prompt_version = NEWS_COMPACT_PROMPT_VERSION if compact else NEWS_PROMPT_VERSION
+    
+    translation_memory = get_translation_memory()
+    translated_fields = translation_memory.lookup_fields(fields_to_translate, target_language, NEWS_PROMPT_VERSION)
+    if compact and len(translated_fields) < len(fields_to_translate):
+        # Economy sessions reuse full-prompt translations first, then compact ones
+        translated_fields = {
+            **translation_memory.lookup_fields(fields_to_translate, target_language, NEWS_COMPACT_PROMPT_VERSION),
+            **translated_fields,
+        }
+    
+    if len(translated_fields) < len(fields_to_translate):
         # Get base model (non-streaming) for translation
         model = get_base_chat_model(api_key)
         
-        # Create a container for all news articles
-        news_container = st.container()
+        # Create a specific prompt for each news item
+        system_message = f"""
+        You are a professional translator specializing in news translation. Translate the following news content to {target_language}.
         
-        # Process each news item individually
-        translated_items = []
-        for i, item in enumerate(news_items):
-            # Store original image URL
-            original_image_url = item.get('imageUrl')
-            
-            # Create a specific prompt for each news item
-            system_message = f"""
-            You are a professional translator specializing in news translation. Translate the following news content to {target_language}.
-            
-            Translation Rules:
-            1. Translate ONLY these fields:
-               - title: Keep it concise and engaging
-               - snippet: Maintain the news context and tone
-               - source: Translate the source name if it has a common translation
-            
-            2. Translation Guidelines:
-               - Ensure natural and fluent language
-               - Maintain the original meaning and context
-               - Keep any proper nouns (names, places) in their original form
-               - Preserve any numbers, dates, and measurements
-               - Keep any technical terms accurate
-            
-            3. Return ONLY the translated fields in this exact format:
-            {{
-                "title": "translated title",
-                "snippet": "translated snippet",
-                "source": "translated source"
-            }}
-            
-            4. Important:
-               - Do not add any explanations
-               - Do not modify the JSON structure
-               - Do not translate any other fields
-               - Ensure the translation is culturally appropriate for {target_language} speakers
-            """
-            
-            # Prepare only the fields that need translation
-            fields_to_translate = {
-                "title": item.get('title', ''),
-                "snippet": item.get('snippet', ''),
-                "source": item.get('source', '')
-            }
-            
-            # Convert to JSON string
-            item_json = json.dumps(fields_to_translate, ensure_ascii=False)
-            
-            # Generate response
-            messages = [
-                HumanMessage(content=f"{system_message}\n\nFields to translate:\n{item_json}")
-            ]
-            
-            try:
-                # Show processing status
-                with st.spinner(f"Translating article {i+1} of {len(news_items)}..."):
-                    response = model.invoke(messages)
-                    result = response.content.strip()
-                    
-                    # Clean the response
-                    result = result.replace('```json', '').replace('```', '').strip()
-                    
-                    # Parse the translated fields
-                    translated_fields = json.loads(result)
-                    
-                    # Create new item with translated fields and original data
-                    translated_item = {
-                        **item,  # Keep all original fields
-                        "title": translated_fields.get('title', item.get('title', '')),
-                        "snippet": translated_fields.get('snippet', item.get('snippet', '')),
-                        "source": translated_fields.get('source', item.get('source', '')),
-                        "imageUrl": original_image_url  # Ensure original image is kept
-                    }
-                    
-                    translated_items.append(translated_item)
-                    
-                    # Display the translated article with improved layout
-                    with news_container:
-                        # Create a card-like container for each article
-                        with st.container():
-                            # Create two columns with adjusted ratio
-                            col1, col2 = st.columns([3, 2])
-                            
-                            # Left column for text content
-                            with col1:
-                                st.markdown(f"### {i+1}. {translated_item['title']}")
-                                st.markdown(f"**Source:** {translated_item['source']} | {translated_item.get('date', 'Unknown date')}")
-                                st.markdown(translated_item['snippet'])
-                                st.markdown(f"[Read more]({translated_item['link']})")
-                            
-                            # Right column for image with fixed height
-                            with col2:
-                                if original_image_url:  # Use original image URL
-                                    # Add custom CSS for image container
-                                    st.markdown("""
-                                        <style>
-                                        .image-container {
-                                            height: 200px;
-                                            overflow: hidden;
-                                            border-radius: 10px;
-                                            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                                        }
-                                        .image-container img {
-                                            width: 100%;
-                                            height: 100%;
-                                            object-fit: cover;
-                                        }
-                                        </style>
-                                        """, unsafe_allow_html=True)
-                                    
-                                    # Wrap image in styled container
-                                    st.markdown(f"""
-                                        <div class="image-container">
-                                            <img src="{original_image_url}" alt="News Image">
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                            
-                            st.divider()
-                            
-            except json.JSONDecodeError as e:
-                st.warning(f"Failed to parse translation of item {i+1}: {str(e)}. Using original.")
-                translated_items.append(item)
-            except Exception as e:
-                st.warning(f"Error translating item {i+1}: {str(e)}. Using original.")
-                translated_items.append(item)
+        Translation Rules:
+        1. Translate ONLY these fields:
+           - title: Keep it concise and engaging
+           - snippet: Maintain the news context and tone
+           - source: Translate the source name if it has a common translation
+        
+        2. Translation Guidelines:
+           - Ensure natural and fluent language
+           - Maintain the original meaning and context
+           - Keep any proper nouns (names, places) in their original form
+           - Preserve any numbers, dates, and measurements
+           - Keep any technical terms accurate
+        
+        3. Return ONLY the translated fields in this exact format:
+        {{
+            "title": "translated title",
+            "snippet": "translated snippet",
+            "source": "translated source"
+        }}
+        
+        4. Important:
+           - Do not add any explanations
+           - Do not modify the JSON structure
+           - Do not translate any other fields
+           - Ensure the translation is culturally appropriate for {target_language} speakers
+        """
+        if compact:
+            system_message = (
+                f"Translate the title, snippet and source values of this JSON object to {target_language}. "
+                "Keep names, numbers and dates as they are. Reply with only the JSON object, same keys."
+            )
+        
+        # Convert to JSON string
+        item_json = json.dumps(fields_to_translate, ensure_ascii=False)
+        
+        # Generate response
+        messages = [
+            HumanMessage(content=f"{system_message}\n\nFields to translate:\n{item_json}")
+        ]
         
-        return translated_items
+        # Sessions translating the same trending story at once share one call, and only
+        # the session that starts it waits for a limiter token
+        response = invoke_coalesced(
+            model, messages, limit=lambda fn: get_rate_limiter().call("sutra", fn, priority)
+        )
+        if budget is not None:
+            budget.record_call("news.translate", messages, response)
+        result = response.content.strip()
+        
+        # Clean the response
+        result = result.replace('```json', '').replace('```', '').strip()
+        
+        # Parse the translated fields
+        translated_fields = json.loads(result)
+        translation_memory.store_fields(fields_to_translate, translated_fields, target_language, prompt_version)
+    
+    # Create new item with translated fields and original data
+    return {
+        **item,  # Keep all original fields
+        "title": translated_fields.get('title', item.get('title', '')),
+        "snippet": translated_fields.get('snippet', item.get('snippet', '')),
+        "source": translated_fields.get('source', item.get('source', '')),
+        "imageUrl": item.get('imageUrl')  # Ensure original image is kept
+    }
+
+# Function to display one news card with improved layout
+def render_news_card(news, i):
+    # Create two columns with adjusted ratio
+    col1, col2 = st.columns([3, 2])
+    
+    # Left column for text content
+    with col1:
+        st.markdown(f"### {i+1}. {news.get('title', 'No Title')}")
+        st.markdown(f"**Source:** {news.get('source', 'Unknown')} | {news.get('date', 'Unknown date')}")
+        st.markdown(news.get('snippet', 'No description available.'))
+        st.markdown(f"[Read more]({news.get('link', '#')})")
+    
+    # Right column for image with fixed height
+    with col2:
+        if news.get('imageUrl'):
+            # Add custom CSS for image container
+            st.markdown("""
+                <style>
+                .image-container {
+                    height: 200px;
+                    overflow: hidden;
+                    border-radius: 10px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                }
+                .image-container img {
+                    width: 100%;
+                    height: 100%;
+                    object-fit: cover;
+                }
+                </style>
+                """, unsafe_allow_html=True)
             
-    except Exception as e:
-        st.error(f"Translation error: {str(e)}")
-        return news_items
+            # Wrap image in styled container
+            st.markdown(f"""
+                <div class="image-container">
+                    <img src="{news.get('imageUrl')}" alt="News Image">
+                </div>
+                """, unsafe_allow_html=True)
+    
+    st.divider()
+
+# Function to translate news using Sutra LLM
+@traced("news.translate")
+def translate_news(news_items, target_language, api_key):
+    # Show the original articles right away; each card is swapped in place once translated
+    status = st.empty()
+    placeholders = []
+    for i, item in enumerate(news_items):
+        placeholder = st.empty()
+        with placeholder.container():
+            render_news_card(item, i)
+        placeholders.append(placeholder)
+    
+    translated_items = list(news_items)
+    completed = 0
+    budget = session_budget(st.session_state)
+    if not budget.allows_optional():
+        # Past the token budget only the top stories are translated; the rest stay in the original
+        news_items = news_items[:EXHAUSTED_TRANSLATIONS]
+        st.info(f"Token budget reached for this session - translating the top {len(news_items)} stories only.")
+    status.caption(f"Translating {len(news_items)} articles to {target_language}...")
+    for i, translated_item, error in translate_as_completed(
+        news_items,
+        lambda item: translate_news_item(item, target_language, api_key, budget=budget)
+    ):
+        completed += 1
+        if isinstance(error, json.JSONDecodeError):
+            st.warning(f"Failed to parse translation of item {i+1}: {str(error)}. Using original.")
+        elif error is not None:
+            st.warning(f"Error translating item {i+1}: {str(error)}. Using original.")
+        else:
+            translated_items[i] = translated_item
+            with placeholders[i].container():
+                render_news_card(translated_item, i)
+        status.caption(f"Translated {completed} of {len(news_items)} articles to {target_language}")
+    
+    status.empty()
+    return translated_items
 
 # Function to format news as markdown
 def format_news_as_markdown(news_items):
@@ -277,6 +383,7 @@ def format_news_as_markdown(news_items):
     return markdown
 
 # Function to translate search query to English using Sutra LLM
+@traced("news.translate_query")
 def translate_query_to_english(query, api_key):
     try:
         # Get base model (non-streaming) for translation
@@ -294,13 +401,20 @@ def translate_query_to_english(query, api_key):
         
         Return ONLY the translated query without any explanations or additional text.
         """
+        budget = session_budget(st.session_state)
         
-        messages = [
-            HumanMessage(content=f"{system_message}\n\nQuery to translate:\n{query}")
-        ]
+        def translate_with_model(text):
+            messages = [
+                HumanMessage(content=f"{system_message}\n\nQuery to translate:\n{text}")
+            ]
+            response = invoke_coalesced(
+                model, messages, limit=lambda fn: get_rate_limiter().call("sutra", fn, INTERACTIVE)
+            )
+            budget.record_call("news.translate_query", messages, response)
+            return response.content.strip()
         
-        response = model.invoke(messages)
-        translated_query = response.content.strip()
+        # English queries and queries seen before skip the model round-trip
+        translated_query, _ = translate_query_cached(query, QUERY_PROMPT_VERSION, translate_with_model)
         
         return translated_query
         
@@ -317,6 +431,21 @@ if "news_data" not in st.session_state:
     st.session_state.news_data = []
 if "search_query" not in st.session_state:
     st.session_state.search_query = "latest news Updates on AI"
+if "news_request" not in st.session_state:
+    st.session_state.news_request = None
+if "news_page" not in st.session_state:
+    st.session_state.news_page = 1
+
+# Pagination callback - cached and prefetched pages load without a new Serper call
+def change_news_page(step):
+    request = st.session_state.news_request
+    page = max(1, st.session_state.news_page + step)
+    news_items = fetch_news(page=page, **request)
+    if news_items:
+        st.session_state.news_page = page
+        st.session_state.news_data = news_items
+    else:
+        st.warning("No more news found for this search.")
 
 # Sidebar for settings
 with st.sidebar:
@@ -361,6 +490,19 @@ with st.sidebar:
     st.divider()
     st.markdown(f"Currently viewing news in: **{selected_language}**")
     
+    # Token use of this session, and the largest consumers across all sessions
+    with st.expander("🪙 Token usage"):
+        budget = session_budget(st.session_state)
+        st.caption(budget.summary())
+        st.dataframe(budget.report(), use_container_width=True, hide_index=True)
+        st.caption("Top consumers, all sessions")
+        st.dataframe(get_token_ledger().top_consumers(5), use_container_width=True, hide_index=True)
+    
+    # Span timings for this process, when SUTRA_TELEMETRY is set
+    if telemetry_enabled():
+        with st.expander("📡 Telemetry"):
+            st.dataframe(get_telemetry().report(), use_container_width=True, hide_index=True)
+    
     # About section
     with st.expander("About Global News Hub"):
         st.markdown("""
@@ -396,21 +538,27 @@ if search_button or (not st.session_state.news_data and st.session_state.serper_
         if selected_language != "English" and st.session_state.sutra_api_key:
             with st.spinner("Translating search query to English..."):
                 english_query = translate_query_to_english(search_query, st.session_state.sutra_api_key)
-                st.info(f"Translated query: '{english_query}'")
+                if english_query != search_query:  # Only show if translation actually happened
+                    st.info(f"Translated query: '{english_query}'")
         else:
             english_query = search_query
         
+        # Remember the request so the pagination buttons can fetch further pages
+        news_request = {
+            "query": english_query,
+            "num_results": num_results,
+            "language": selected_language.lower() if selected_language != "English" else None
+        }
+        
         # Show loading message
         with st.spinner(f"Fetching news for '{english_query}'..."):
             # Fetch news data
-            news_items = fetch_news(
-                query=english_query,
-                num_results=num_results,
-                language=selected_language.lower() if selected_language != "English" else None
-            )
+            news_items = fetch_news(**news_request)
             
             if news_items:
                 st.session_state.news_data = news_items
+                st.session_state.news_request = news_request
+                st.session_state.news_page = 1
                 st.success(f"Found {len(news_items)} news articles!")
             else:
                 st.warning("No news found. Try a different search term.")
@@ -419,12 +567,11 @@ if search_button or (not st.session_state.news_data and st.session_state.serper_
 if st.session_state.news_data:
     # Check if translation is needed
     if selected_language != "English" and st.session_state.sutra_api_key:
-        with st.spinner(f"Translating news to {selected_language}..."):
-            translated_news = translate_news(
-                st.session_state.news_data, 
-                selected_language,
-                st.session_state.sutra_api_key
-            )
+        translated_news = translate_news(
+            st.session_state.news_data, 
+            selected_language,
+            st.session_state.sutra_api_key
+        )
     else:
         # Display English news (or show message if Sutra API key is missing)
         if selected_language != "English" and not st.session_state.sutra_api_key:
@@ -432,46 +579,29 @@ if st.session_state.news_data:
         
         # Format and display the original news with improved layout
         news_container = st.container()
-        for i, news in enumerate(st.session_state.news_data):
-            with news_container:
-                # Create two columns with adjusted ratio
-                col1, col2 = st.columns([3, 2])
-                
-                # Left column for text content
-                with col1:
-                    st.markdown(f"### {i+1}. {news.get('title', 'No Title')}")
-                    st.markdown(f"**Source:** {news.get('source', 'Unknown')} | {news.get('date', 'Unknown date')}")
-                    st.markdown(news.get('snippet', 'No description available.'))
-                    st.markdown(f"[Read more]({news.get('link', '#')})")
-                
-                # Right column for image with fixed height
-                with col2:
-                    if news.get('imageUrl'):
-                        # Add custom CSS for image container
-                        st.markdown("""
-                            <style>
-                            .image-container {
-                                height: 200px;
-                                overflow: hidden;
-                                border-radius: 10px;
-                                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                            }
-                            .image-container img {
-                                width: 100%;
-                                height: 100%;
-                                object-fit: cover;
-                            }
-                            </style>
-                            """, unsafe_allow_html=True)
-                        
-                        # Wrap image in styled container
-                        st.markdown(f"""
-                            <div class="image-container">
-                                <img src="{news.get('imageUrl')}" alt="News Image">
-                            </div>
-                            """, unsafe_allow_html=True)
-                
-                st.divider()
+        with news_container:
+            for i, news in enumerate(st.session_state.news_data):
+                render_news_card(news, i)
+    
+    if st.session_state.news_request:
+        # Warm the next page (and its translation) while the user reads this one
+        if st.session_state.serper_api_key:
+            prefetch_news_page(
+                page=st.session_state.news_page + 1,
+                target_language=selected_language,
+                sutra_api_key=st.session_state.sutra_api_key,
+                **st.session_state.news_request
+            )
+        
+        # Pagination controls
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button("← Previous", on_click=change_news_page, args=(-1,),
+                      disabled=st.session_state.news_page <= 1, use_container_width=True)
+        with page_col:
+            st.markdown(f"<p style='text-align: center;'>Page {st.session_state.news_page}</p>", unsafe_allow_html=True)
+        with next_col:
+            st.button("Next →", on_click=change_news_page, args=(1,), use_container_width=True)
 else:
     if not st.session_state.serper_api_key:
         st.info("Enter your Serper API key and search for news to get started.")
@@ -1,4 +1,5 @@
 import os
+import sys
 import streamlit as st
 from openai import OpenAI
 import PyPDF2
@@ -11,6 +12,12 @@ import logging
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.rate_limiter import get_rate_limiter
+from sutra_common.telemetry import CHUNKING, LLM, PDF, llm_span, start_span, traced
+
 load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -86,25 +93,33 @@ class SutraClient:
     
     def __init__(self, api_key: str):
         self.client = OpenAI(
-            base_url='https://api.two.ai/v2',
-            api_key=api_key
+            base_url=SUTRA_BASE_URL,
+            api_key=api_key,
+            # Retries go through the shared rate limiter instead
+            max_retries=0
         )
         self.api_key = api_key
     
     def generate_completion(self, messages: List[Dict], config: MindmapConfig) -> Optional[str]:
         """Generate completion with error handling and retry logic"""
         max_retries = 3
-        retry_delay = 2
         
         for attempt in range(max_retries):
             try:
-                response = self.client.chat.completions.create(
-                    model='sutra-v2',
-                    messages=messages,
-                    max_tokens=config.max_tokens,
-                    temperature=config.temperature,
-                    stream=False
-                )
+                with llm_span("sutra.chat", model='sutra-v2') as call_span:
+                    # The shared limiter paces requests and retries 429s after their Retry-After
+                    response = get_rate_limiter().call(
+                        "sutra",
+                        lambda: self.client.chat.completions.create(
+                            model='sutra-v2',
+                            messages=messages,
+                            max_tokens=config.max_tokens,
+                            temperature=config.temperature,
+                            stream=False
+                        )
+                    )
+                    if response.usage:
+                        call_span.usage(response.usage.prompt_tokens, response.usage.completion_tokens)
                 
                 if response.choices and response.choices[0].message.content:
                     return response.choices[0].message.content.strip()
@@ -112,23 +127,26 @@ class SutraClient:
                     logger.warning(f"Empty response received on attempt {attempt + 1}")
                     
             except Exception as e:
-                logger.error(f"API call failed on attempt {attempt + 1}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (attempt + 1))
-                else:
-                    raise e
+                logger.error(f"API call failed: {str(e)}")
+                raise e
         
         return None
     
     def generate_streaming_completion(self, messages: List[Dict], config: MindmapConfig):
         """Generate streaming completion"""
+        # Ended in the finally block, so a consumer that stops early still closes the span
+        call_span = start_span("sutra.chat_stream", LLM, **{"gen_ai.request.model": "sutra-v2"})
+        error = None
         try:
-            stream = self.client.chat.completions.create(
-                model='sutra-v2',
-                messages=messages,
-                max_tokens=config.max_tokens,
-                temperature=config.temperature,
-                stream=True
+            stream = get_rate_limiter().call(
+                "sutra",
+                lambda: self.client.chat.completions.create(
+                    model='sutra-v2',
+                    messages=messages,
+                    max_tokens=config.max_tokens,
+                    temperature=config.temperature,
+                    stream=True
+                )
             )
             
             for chunk in stream:
@@ -136,16 +154,21 @@ class SutraClient:
                     content = chunk.choices[0].delta.content
                     finish_reason = chunk.choices[0].finish_reason
                     if content and finish_reason is None:
+                        call_span.token()
                         yield content
                         
         except Exception as e:
+            error = e
             logger.error(f"Streaming API call failed: {str(e)}")
             raise e
+        finally:
+            call_span.end(error)
 
 class PDFProcessor:
     """Advanced PDF processing with chunking and error handling"""
     
     @staticmethod
+    @traced("mindmap.extract_pdf", kind=PDF)
     def extract_text_from_pdf(pdf_file, progress_callback=None) -> Optional[str]:
         """Extract text from PDF with progress tracking"""
         try:
@@ -179,6 +202,7 @@ class PDFProcessor:
             return None
     
     @staticmethod
+    @traced("mindmap.chunk_text", kind=CHUNKING)
     def chunk_text(text: str, chunk_size: int = 8000, overlap_size: int = 200) -> List[str]:
         """Split text into overlapping chunks"""
         if len(text) <= chunk_size:
@@ -1,10 +1,21 @@
 import streamlit as st
 import requests
 import json
+import os
+import sys
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 from langchain.callbacks.base import BaseCallbackHandler
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL, use_serpapi_base_url
+from sutra_common.progressive_translation import translate_as_completed
+from sutra_common.query_translation import translate_query_cached
+from sutra_common.rate_limiter import BACKGROUND, INTERACTIVE, get_rate_limiter
+from sutra_common.telemetry import llm_callbacks
+from sutra_common.translation_memory import get_translation_memory
+
 # Try importing SerpAPI, show error if not installed
 try:
     from serpapi import GoogleSearch
@@ -17,6 +28,7 @@ except ImportError:
     ```
     """)
     st.stop()
+use_serpapi_base_url()
 
 # Page configuration
 st.set_page_config(
@@ -40,6 +52,10 @@ languages = [
     "Tagalog", "Swahili"
 ]
 
+# Bump when the translation prompt changes so cached translations are not reused
+JOB_PROMPT_VERSION = "jobs-v1"
+QUERY_PROMPT_VERSION = "query-jobs-v1"
+
 # Streaming callback handler for Sutra LLM
 class StreamHandler(BaseCallbackHandler):
     def __init__(self, container, initial_text=""):
@@ -56,9 +72,10 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model(api_key):
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.3,  # Lower temperature for more accurate translations
+        callbacks=llm_callbacks()
     )
 
 # Function to fetch jobs using SerpAPI
@@ -79,8 +96,7 @@ def fetch_jobs(query, num_results=20, location="Worldwide", job_type=None):
         params["q"] = f"{query} {job_type}"
     
     try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = get_rate_limiter().call("serpapi", lambda: GoogleSearch(params).get_dict())
         jobs = results.get("jobs_results", [])
         
         # Limit the number of jobs
@@ -102,8 +118,10 @@ def fetch_jobs(query, num_results=20, location="Worldwide", job_type=None):
                 }
                 
                 try:
-                    image_search = GoogleSearch(image_params)
-                    image_results = image_search.get_dict()
+                    # Logo lookups run behind job searches from other sessions
+                    image_results = get_rate_limiter().call(
+                        "serpapi", lambda: GoogleSearch(image_params).get_dict(), BACKGROUND
+                    )
                     if image_results.get("images_results") and len(image_results["images_results"]) > 0:
                         # Get the highest quality image URL
                         image_url = image_results["images_results"][0].get("original")
@@ -119,121 +137,134 @@ def fetch_jobs(query, num_results=20, location="Worldwide", job_type=None):
         st.error(f"Error fetching jobs: {str(e)}")
         return []
 
-# Function to translate jobs using Sutra LLM
-def translate_jobs(jobs, target_language, api_key):
-    try:
+# Translate one job, reusing the shared translation memory where possible
+def translate_job_item(job, target_language, api_key):
+    # Prepare only the fields that need translation
+    fields_to_translate = {
+        "title": job.get('title', ''),
+        "company_name": job.get('company_name', ''),
+        "description": job.get('description', '')[:500], # Truncate description before sending for translation
+        "location": job.get('location', '')
+    }
+    
+    translation_memory = get_translation_memory()
+    translated_fields = translation_memory.lookup_fields(fields_to_translate, target_language, JOB_PROMPT_VERSION)
+    
+    if len(translated_fields) < len(fields_to_translate):
         # Get base model (non-streaming) for translation
         model = get_base_chat_model(api_key)
         
-        # Create a container for all jobs
-        jobs_container = st.container()
+        # Create a specific prompt for each job
+        system_message = f"""
+        You are a professional translator specializing in job listings translation. Translate the following job content to {target_language}.
         
-        # Process each job individually
-        translated_items = []
-        for i, job in enumerate(jobs):
-            # Create a specific prompt for each job
-            system_message = f"""
-            You are a professional translator specializing in job listings translation. Translate the following job content to {target_language}.
-            
-            Translation Rules:
-            1. Translate ONLY these fields:
-               - title: Keep it concise and job-focused
-               - company_name: Translate the company name if it has a common translation
-               - description: Maintain the job requirements and responsibilities context
-               - location: Translate location information
-            
-            2. Translation Guidelines:
-               - Ensure natural and fluent language
-               - Maintain the original meaning and context
-               - Keep any technical terms, skills, and requirements in their original form
-               - Preserve any numbers, dates, and measurements
-               - Keep any job-specific terminology accurate
-            
-            3. Return ONLY the translated fields in this exact format:
-            {{
-                "title": "translated title",
-                "company_name": "translated company name",
-                "description": "translated description",
-                "location": "translated location"
-            }}
-            
-            4. Important:
-               - Do not add any explanations
-               - Do not modify the JSON structure
-               - Do not translate any other fields
-               - Ensure the translation is culturally appropriate for {target_language} speakers
-            """
-            
-            # Prepare only the fields that need translation
-            fields_to_translate = {
-                "title": job.get('title', ''),
-                "company_name": job.get('company_name', ''),
-                "description": job.get('description', '')[:500], # Truncate description before sending for translation
-                "location": job.get('location', '')
-            }
-            
-            # Convert to JSON string
-            job_json = json.dumps(fields_to_translate, ensure_ascii=False)
-            
-            # Generate response
-            messages = [
-                HumanMessage(content=f"{system_message}\n\nFields to translate:\n{job_json}")
-            ]
-            
-            try:
-                # Show processing status
-                with st.spinner(f"Translating job {i+1} of {len(jobs)}..."):
-                    response = model.invoke(messages)
-                    result = response.content.strip()
-                    
-                    # Clean the response
-                    result = result.replace('```json', '').replace('```', '').strip()
-                    
-                    # Parse the translated fields
-                    translated_fields = json.loads(result)
-                    
-                    # Create new item with translated fields and original data
-                    translated_job = {
-                        **job,  # Keep all original fields
-                        "title": translated_fields.get('title', job.get('title', '')),
-                        "company_name": translated_fields.get('company_name', job.get('company_name', '')),
-                        "description": translated_fields.get('description', job.get('description', '')),
-                        "location": translated_fields.get('location', job.get('location', ''))
-                    }
-                    
-                    translated_items.append(translated_job)
-                    
-                    # Display the translated job with improved layout
-                    with jobs_container:
-                        st.markdown(f"""
-                            <div class="job-card">
-                                <div style="display: flex; gap: 20px;">
-                                    <div style="flex: 3;">
-                                        <h3 class="job-title">{i+1}. {translated_job['title']}</h3>
-                                        <p class="company-name">🏢 <strong>Company:</strong> {translated_job['company_name']}</p>
-                                        <p class="job-location">📍 <strong>Location:</strong> {translated_job['location']}</p>
-                                        <p class="job-type">⏰ <strong>Type:</strong> {translated_job.get('detected_extensions', {}).get('schedule_type', 'Not specified')}</p>
-                                        <p class="job-description">{translated_job['description'][:300]}...</p>
-                                        <p><a href="{translated_job.get('share_link', '#')}" class="job-link" target="_blank">🔗 View Job</a></p>
-                                    </div>
-                                    <div style="flex: 1;">
-                                        {f'<div class="image-container"><img src="{translated_job.get("thumbnail")}" alt="Company Logo"></div>' if translated_job.get('thumbnail') else ''}
-                                    </div>
-                                </div>
-                            </div>
-                        """, unsafe_allow_html=True)
-            except json.JSONDecodeError as e:
-                st.warning(f"Failed to parse translation of job {i+1}: {str(e)}. Using original.")
-                translated_items.append(job)
-            except Exception as e:
-                st.warning(f"Error translating job {i+1}: {str(e)}. Using original.")
-                translated_items.append(job)
+        Translation Rules:
+        1. Translate ONLY these fields:
+           - title: Keep it concise and job-focused
+           - company_name: Translate the company name if it has a common translation
+           - description: Maintain the job requirements and responsibilities context
+           - location: Translate location information
         
-        return translated_items
-            
-    except Exception as e:
-        st.error(f"Translation error: {str(e)}")
-        return jobs
+        2. Translation Guidelines:
+           - Ensure natural and fluent language
+           - Maintain the original meaning and context
+           - Keep any technical terms, skills, and requirements in their original form
+           - Preserve any numbers, dates, and measurements
+           - Keep any job-specific terminology accurate
+        
+        3. Return ONLY the translated fields in this exact format:
+        {{
+            "title": "translated title",
+            "company_name": "translated company name",
+            "description": "translated description",
+            "location": "translated location"
+        }}
+        
+        4. Important:
+           - Do not add any explanations
+           - Do not modify the JSON structure
+           - Do not translate any other fields
+           - Ensure the translation is culturally appropriate for {target_language} speakers
+        """
+        
+        # Convert to JSON string
+        job_json = json.dumps(fields_to_translate, ensure_ascii=False)
+        
+        # Generate response
+        messages = [
+            HumanMessage(content=f"{system_message}\n\nFields to translate:\n{job_json}")
+        ]
+        
+        response = get_rate_limiter().call("sutra", lambda: model.invoke(messages), BACKGROUND)
+        result = response.content.strip()
+        
+        # Clean the response
+        result = result.replace('```json', '').replace('```', '').strip()
+        
+        # Parse the translated fields
+        translated_fields = json.loads(result)
+        translation_memory.store_fields(fields_to_translate, translated_fields, target_language, JOB_PROMPT_VERSION)
+    
+    # Create new item with translated fields and original data
+    return {
+        **job,  # Keep all original fields
+        "title": translated_fields.get('title', job.get('title', '')),
+        "company_name": translated_fields.get('company_name', job.get('company_name', '')),
+        "description": translated_fields.get('description', job.get('description', '')),
+        "location": translated_fields.get('location', job.get('location', ''))
+    }
+
+# Function to display one job card with improved layout
+def render_job_card(job, i):
+    st.markdown(f"""
+        <div class="job-card">
+            <div style="display: flex; gap: 20px;">
+                <div style="flex: 3;">
+                    <h3 class="job-title">{i+1}. {job.get('title', 'No Title')}</h3>
+                    <p class="company-name">🏢 <strong>Company:</strong> {job.get('company_name', 'Unknown')}</p>
+                    <p class="job-location">📍 <strong>Location:</strong> {job.get('location', 'Location not specified')}</p>
+                    <p class="job-type">⏰ <strong>Type:</strong> {job.get('detected_extensions', {}).get('schedule_type', 'Not specified')}</p>
+                    <p class="job-description">{job.get('description', 'No description available.')[:300]}...</p>
+                    <p><a href="{job.get('share_link', '#')}" class="job-link" target="_blank">🔗 View Job</a></p>
+                </div>
+                <div style="flex: 1;">
+                    {f'<div class="image-container"><img src="{job.get("thumbnail")}" alt="Company Logo"></div>' if job.get('thumbnail') else ''}
+                </div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+# Function to translate jobs using Sutra LLM
+def translate_jobs(jobs, target_language, api_key):
+    # Show the original jobs right away; each card is swapped in place once translated
+    status = st.empty()
+    placeholders = []
+    for i, job in enumerate(jobs):
+        placeholder = st.empty()
+        with placeholder.container():
+            render_job_card(job, i)
+        placeholders.append(placeholder)
+    
+    translated_items = list(jobs)
+    completed = 0
+    status.caption(f"Translating {len(jobs)} jobs to {target_language}...")
+    for i, translated_job, error in translate_as_completed(
+        jobs,
+        lambda job: translate_job_item(job, target_language, api_key)
+    ):
+        completed += 1
+        if isinstance(error, json.JSONDecodeError):
+            st.warning(f"Failed to parse translation of job {i+1}: {str(error)}. Using original.")
+        elif error is not None:
+            st.warning(f"Error translating job {i+1}: {str(error)}. Using original.")
+        else:
+            translated_items[i] = translated_job
+            with placeholders[i].container():
+                render_job_card(translated_job, i)
+        status.caption(f"Translated {completed} of {len(jobs)} jobs to {target_language}")
+    
+    status.empty()
+    return translated_items
 
 # Function to translate search query to English using Sutra LLM
 def translate_query_to_english(query, api_key):
@@ -256,16 +287,20 @@ def translate_query_to_english(query, api_key):
         Return ONLY the translated query without any explanations or additional text.
         """
         
-        messages = [
-            HumanMessage(content=f"{system_message}\n\nQuery to translate:\n{query}")
-        ]
+        def translate_with_model(text):
+            messages = [
+                HumanMessage(content=f"{system_message}\n\nQuery to translate:\n{text}")
+            ]
+            response = get_rate_limiter().call("sutra", lambda: model.invoke(messages), INTERACTIVE)
+            return response.content.strip()
         
-        response = model.invoke(messages)
-        translated_query = response.content.strip()
+        # English queries and queries seen before skip the model round-trip
+        translated_query, source = translate_query_cached(query, QUERY_PROMPT_VERSION, translate_with_model)
         
         # Log the translation for debugging
-        st.write(f"Debug - Original query: {query}")
-        st.write(f"Debug - Translated query: {translated_query}")
+        if source == "model":
+            st.write(f"Debug - Original query: {query}")
+            st.write(f"Debug - Translated query: {translated_query}")
         
         return translated_query
         
@@ -381,12 +416,11 @@ if search_button or (not st.session_state.jobs_data and st.session_state.serp_ap
 if st.session_state.jobs_data:
     # Check if translation is needed
     if selected_language != "English" and st.session_state.sutra_api_key:
-        with st.spinner(f"Translating jobs to {selected_language}..."):
-            translated_jobs = translate_jobs(
-                st.session_state.jobs_data, 
-                selected_language,
-                st.session_state.sutra_api_key
-            )
+        translated_jobs = translate_jobs(
+            st.session_state.jobs_data, 
+            selected_language,
+            st.session_state.sutra_api_key
+        )
     else:
         # Display English jobs (or show message if Sutra API key is missing)
         if selected_language != "English" and not st.session_state.sutra_api_key:
@@ -394,24 +428,9 @@ if st.session_state.jobs_data:
         
         # Format and display the original jobs with improved layout
         jobs_container = st.container()
-        for i, job in enumerate(st.session_state.jobs_data):
-            st.markdown(f"""
-                <div class="job-card">
-                    <div style="display: flex; gap: 20px;">
-                        <div style="flex: 3;">
-                            <h3 class="job-title">{i+1}. {job.get('title', 'No Title')}</h3>
-                            <p class="company-name">🏢 <strong>Company:</strong> {job.get('company_name', 'Unknown')}</p>
-                            <p class="job-location">📍 <strong>Location:</strong> {job.get('location', 'Location not specified')}</p>
-                            <p class="job-type">⏰ <strong>Type:</strong> {job.get('detected_extensions', {}).get('schedule_type', 'Not specified')}</p>
-                            <p class="job-description">{job.get('description', 'No description available.')[:300]}...</p>
-                            <p><a href="{job.get('share_link', '#')}" class="job-link" target="_blank">🔗 View Job</a></p>
-                        </div>
-                        <div style="flex: 1;">
-                            {f'<div class="image-container"><img src="{job.get("thumbnail")}" alt="Company Logo"></div>' if job.get('thumbnail') else ''}
-                        </div>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
+        with jobs_container:
+            for i, job in enumerate(st.session_state.jobs_data):
+                render_job_card(job, i)
 else:
     if not st.session_state.serp_api_key:
         st.info("Enter your SerpAPI key and search for jobs to get started.")
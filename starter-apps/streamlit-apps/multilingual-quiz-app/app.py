@@ -2,11 +2,15 @@ import streamlit as st
 from educhain import Educhain, LLMConfig
 from educhain.engines import qna_engine
 from langchain_openai import ChatOpenAI
-import os
-import json
 from datetime import datetime
 import pandas as pd
 import random
+from quiz_store import new_quiz_id, open_quiz_store
+from question_bank import PoolKey, open_question_bank
+from quiz_translation import translate_quiz_languages
+# quiz_translation has already put ../sutra_common on sys.path
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.telemetry import llm_callbacks
 
 
 # Set page configuration at the very top of the script
@@ -46,8 +50,10 @@ if 'user_score' not in st.session_state:
     st.session_state.user_score = 0
 if 'quiz_completed' not in st.session_state:
     st.session_state.quiz_completed = False
-if 'saved_quizzes' not in st.session_state:
-    st.session_state.saved_quizzes = []
+if 'saved_page' not in st.session_state:
+    st.session_state.saved_page = 0
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 if 'page' not in st.session_state:
     st.session_state.page = "create"  # Options: "create", "take", "history"
 
@@ -77,31 +83,54 @@ with st.sidebar:
     st.write("❤️ Built with [Streamlit](https://streamlit.io)")
 
 # --- Initialize Educhain with Sutra Model ---
+@st.cache_resource
+def get_sutra_model(api_key, temperature=0.9):
+    return ChatOpenAI(
+        api_key=api_key,
+        base_url=SUTRA_BASE_URL,
+        model="sutra-v2",
+        temperature=temperature,
+        callbacks=llm_callbacks()
+    )
+
 @st.cache_resource
 def initialize_educhain(api_key):
     if not api_key:
         return None  # Return None if API key is missing
 
-    sutra_model = ChatOpenAI(
-        api_key=api_key,
-        base_url="https://api.two.ai/v2",
-        model="sutra-v2",
-        temperature=0.9
-    )
-    llm_config = LLMConfig(custom_model=sutra_model)
+    llm_config = LLMConfig(custom_model=get_sutra_model(api_key))
     return Educhain(llm_config)
 
-# --- Utility Function to Convert Questions to Quiz Format ---
-def convert_to_quiz_format(questions_obj, topic, language, difficulty):
-    quiz = {
-        "title": f"{topic} Quiz ({difficulty})",
-        "language": language,
-        "difficulty": difficulty,
-        "topic": topic,
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "questions": []
-    }
-    
+# --- Quiz Storage (SQLite by default, see quiz_store.py) ---
+@st.cache_resource
+def get_quiz_store():
+    return open_quiz_store()
+
+# Rows per page on the saved quizzes and history pages
+PAGE_SIZE = 20
+
+def change_saved_page(step):
+    st.session_state.saved_page = max(0, st.session_state.saved_page + step)
+
+def change_history_page(step):
+    st.session_state.history_page = max(0, st.session_state.history_page + step)
+
+def show_pagination(page_key, total, on_change):
+    page = st.session_state[page_key]
+    pages = max(1, -(-total // PAGE_SIZE))
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        st.button("← Previous", key=f"{page_key}_prev", on_click=on_change, args=(-1,),
+                  disabled=page <= 0, use_container_width=True)
+    with page_col:
+        st.markdown(f"<p style='text-align: center;'>Page {page + 1} of {pages}</p>", unsafe_allow_html=True)
+    with next_col:
+        st.button("Next →", key=f"{page_key}_next", on_click=on_change, args=(1,),
+                  disabled=page >= pages - 1, use_container_width=True)
+
+# --- Utility Functions to Convert Questions to Quiz Format ---
+def convert_questions(questions_obj):
+    converted = []
     if hasattr(questions_obj, "questions"):
         for q in questions_obj.questions:
             question_data = {
@@ -119,39 +148,97 @@ def convert_to_quiz_format(questions_obj, topic, language, difficulty):
             if hasattr(q, 'explanation') and q.explanation:
                 question_data["explanation"] = q.explanation
                 
-            quiz["questions"].append(question_data)
-    
-    return quiz
+            converted.append(question_data)
+    return converted
+
+def build_quiz(questions, topic, language, difficulty):
+    return {
+        "title": f"{topic} Quiz ({difficulty})",
+        "language": language,
+        "difficulty": difficulty,
+        "topic": topic,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "questions": questions
+    }
+
+# --- Question Generation ---
+def generate_question_list(qna_engine, topic, num, question_type, language, difficulty, custom_instructions=""):
+    # Add language instruction to custom instructions
+    language_custom_instructions = f"Generate all questions, options, answers and explanations in {language} language. Make questions {difficulty.lower()} difficulty. {custom_instructions}"
+    questions = qna_engine.generate_questions(
+        topic=topic,
+        num=num,
+        question_type=question_type,
+        custom_instructions=language_custom_instructions,
+        difficulty=difficulty.lower(),
+        language=language
+    )
+    return convert_questions(questions) if questions else []
+
+# --- Question Bank (pre-generated pools per topic, language, difficulty and type) ---
+@st.cache_resource
+def get_question_bank():
+    return open_question_bank()
+
+def bank_generator(qna_engine, topic):
+    # Runs on the bank's worker threads, so it must not touch the Streamlit UI
+    def generate(key, num):
+        return generate_question_list(qna_engine, topic, num, key.question_type, key.language, key.difficulty)
+    return generate
 
 # --- Save Quiz Function ---
 def save_quiz(quiz):
     # Create a unique ID for the quiz
-    quiz_id = f"{len(st.session_state.saved_quizzes) + 1}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    quiz_id = new_quiz_id()
     quiz["id"] = quiz_id
     
-    # Add to saved quizzes
-    st.session_state.saved_quizzes.append(quiz)
-    
-    # Also save to disk (optional)
+    # One transaction that writes only this quiz and its questions
     try:
-        # Check if file exists and load existing data
-        if os.path.exists("saved_quizzes.json"):
-            with open("saved_quizzes.json", "r") as f:
-                existing_quizzes = json.load(f)
-        else:
-            existing_quizzes = []
-            
-        # Append new quiz
-        existing_quizzes.append(quiz)
-        
-        # Save updated list
-        with open("saved_quizzes.json", "w") as f:
-            json.dump(existing_quizzes, f)
+        get_quiz_store().save_quiz(quiz)
     except Exception as e:
-        st.warning(f"Could not save quiz to disk: {str(e)}")
+        st.warning(f"Could not save quiz: {str(e)}")
     
     return quiz_id
 
+# --- Save Multi-language Quiz Function ---
+def save_quiz_group(quizzes):
+    # All language versions are written in one transaction and linked by a group id
+    for quiz in quizzes:
+        quiz["id"] = new_quiz_id()
+    try:
+        return get_quiz_store().save_quiz_group(quizzes)
+    except Exception as e:
+        st.warning(f"Could not save quiz: {str(e)}")
+
+# --- Translate Quiz Into Extra Languages ---
+def translate_quiz_versions(quiz, target_languages):
+    status = st.empty()
+    status.caption(f"🌐 Translating into {len(target_languages)} languages...")
+    translated = {}
+    for language, version, error in translate_quiz_languages(
+        quiz, target_languages, get_sutra_model(api_key, temperature=0.2)
+    ):
+        if error is not None:
+            st.warning(f"Could not create the {language} version: {str(error)}")
+        else:
+            translated[language] = version
+        status.caption(f"🌐 Translated {len(translated)} of {len(target_languages)} languages...")
+    status.empty()
+    # Keep the order the languages were picked in
+    return [translated[language] for language in target_languages if language in translated]
+
+# --- Quiz Preview ---
+def show_quiz_preview(quiz):
+    for i, q in enumerate(quiz["questions"]):
+        st.subheader(f"Question {i+1}: {q['question']}")
+        st.write("Options:")
+        for j, opt in enumerate(q["options"]):
+            st.write(f"   {chr(65 + j)}. {opt}")
+        st.write(f"**Correct Answer:** {q['answer']}")
+        if "explanation" in q and q["explanation"]:
+            st.write(f"**Explanation:** {q['explanation']}")
+        st.markdown("---")
+
 # --- Start Quiz Function ---
 def start_quiz(quiz):
     st.session_state.current_quiz = quiz
@@ -200,6 +287,7 @@ def submit_answer(answer_index):
 # --- Save Quiz Result Function ---
 def save_quiz_result():
     result = {
+        "quiz_id": st.session_state.current_quiz.get("id"),
         "quiz_title": st.session_state.current_quiz["title"],
         "language": st.session_state.current_quiz["language"],
         "topic": st.session_state.current_quiz["topic"],
@@ -209,30 +297,11 @@ def save_quiz_result():
         "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
     
-    # Initialize history if not exists
-    if 'quiz_history' not in st.session_state:
-        st.session_state.quiz_history = []
-    
-    # Add to history
-    st.session_state.quiz_history.append(result)
-    
-    # Also save to disk (optional)
+    # Append one row; cost does not depend on how much history exists
     try:
-        # Check if file exists and load existing data
-        if os.path.exists("quiz_history.json"):
-            with open("quiz_history.json", "r") as f:
-                existing_history = json.load(f)
-        else:
-            existing_history = []
-            
-        # Append new result
-        existing_history.append(result)
-        
-        # Save updated list
-        with open("quiz_history.json", "w") as f:
-            json.dump(existing_history, f)
+        get_quiz_store().save_result(result)
     except Exception as e:
-        st.warning(f"Could not save quiz history to disk: {str(e)}")
+        st.warning(f"Could not save quiz history: {str(e)}")
 
 # --- Create Quiz Page ---
 def show_create_quiz_page():
@@ -271,64 +340,71 @@ def show_create_quiz_page():
         height=100
     )
     
-    # Add language instruction to custom instructions
-    language_custom_instructions = f"Generate all questions, options, answers and explanations in {selected_language} language. Make questions {selected_difficulty.lower()} difficulty. {custom_instructions}"
+    # Extra languages are translated from the same questions, so every version shares one answer key
+    extra_languages = st.multiselect(
+        "Also create this quiz in:",
+        [language for language in languages if language != selected_language],
+        help="The questions are generated once and translated into each language in parallel"
+    )
     
     # Generate quiz button
     if st.button("Generate Quiz"):
-        with st.spinner(f"Generating {num_questions} {selected_question_type.lower()} questions in {selected_language}..."):
-            try:
-                # Use the appropriate method based on question type
-                if selected_question_type == "Multiple Choice":
-                    questions = qna_engine.generate_questions(
-                        topic=topic,
-                        num=num_questions,
-                        question_type="Multiple Choice",
-                        custom_instructions=language_custom_instructions,
-                        difficulty=selected_difficulty.lower(),
-                        language=selected_language
-                    )
-                else:  # True/False
-                    questions = qna_engine.generate_questions(
-                        topic=topic,
-                        num=num_questions,
-                        question_type="True/False",
-                        custom_instructions=language_custom_instructions,
-                        difficulty=selected_difficulty.lower(),
-                        language=selected_language
+        bank = get_question_bank()
+        key = PoolKey.of(topic, selected_language, selected_difficulty, selected_question_type)
+        # Custom instructions change the questions, so those quizzes bypass the shared pool
+        use_bank = not custom_instructions.strip()
+        try:
+            questions = bank.sample(key, num_questions) if use_bank else None
+            from_bank = questions is not None
+            if not from_bank:
+                with st.spinner(f"Generating {num_questions} {selected_question_type.lower()} questions in {selected_language}..."):
+                    questions = generate_question_list(
+                        qna_engine, topic, num_questions, selected_question_type,
+                        selected_language, selected_difficulty, custom_instructions
                     )
-                
-                if not questions or not hasattr(questions, "questions"):
+                if not questions:
                     st.error("Failed to generate questions. Please try again with different parameters.")
                     return
-                
-                # Convert to quiz format and save
-                quiz = convert_to_quiz_format(questions, topic, selected_language, selected_difficulty)
+                if use_bank:
+                    bank.add(key, questions)
+            
+            # Refill this pool in the background so the next quiz is a database read
+            if use_bank:
+                bank.top_up_async(key, bank_generator(qna_engine, topic))
+            
+            # Convert to quiz format and save
+            quiz = build_quiz(questions, topic, selected_language, selected_difficulty)
+            if extra_languages:
+                versions = [quiz] + translate_quiz_versions(quiz, extra_languages)
+                save_quiz_group(versions)
+                quiz_id = quiz["id"]
+            else:
+                versions = [quiz]
                 quiz_id = save_quiz(quiz)
-                
+            
+            if from_bank:
+                st.success(f"Quiz created instantly from the question bank! Quiz ID: {quiz_id}")
+            else:
                 st.success(f"Quiz generated successfully! Quiz ID: {quiz_id}")
                 
-                # Preview quiz
-                with st.expander("Preview Quiz"):
-                    for i, q in enumerate(quiz["questions"]):
-                        st.subheader(f"Question {i+1}: {q['question']}")
-                        st.write("Options:")
-                        for j, opt in enumerate(q["options"]):
-                            st.write(f"   {chr(65 + j)}. {opt}")
-                        st.write(f"**Correct Answer:** {q['answer']}")
-                        if "explanation" in q and q["explanation"]:
-                            st.write(f"**Explanation:** {q['explanation']}")
-                        st.markdown("---")
+            # Preview quiz
+            with st.expander("Preview Quiz"):
+                if len(versions) == 1:
+                    show_quiz_preview(quiz)
+                else:
+                    for tab, version in zip(st.tabs([version["language"] for version in versions]), versions):
+                        with tab:
+                            show_quiz_preview(version)
+            
+            # Button to start quiz
+            if st.button("Start This Quiz"):
+                start_quiz(quiz)
+                st.session_state.page = "take"
+                st.rerun()
                 
-                # Button to start quiz
-                if st.button("Start This Quiz"):
-                    start_quiz(quiz)
-                    st.session_state.page = "take"
-                    st.rerun()
-                    
-            except Exception as e:
-                st.error(f"Error generating questions: {str(e)}")
-                st.error("Please try again with different parameters or check your API key.")
+        except Exception as e:
+            st.error(f"Error generating questions: {str(e)}")
+            st.error("Please try again with different parameters or check your API key.")
 
 # --- Saved Quizzes Page ---
 def show_saved_quizzes_page():
@@ -337,36 +413,53 @@ def show_saved_quizzes_page():
         unsafe_allow_html=True
     )
     
-    if not st.session_state.saved_quizzes:
+    store = get_quiz_store()
+    total_quizzes = store.count_quizzes()
+    if not total_quizzes:
         st.info("No saved quizzes yet. Create one first!")
         return
     
+    # Only the current page of quizzes is read from the store
+    st.session_state.saved_page = min(st.session_state.saved_page, (total_quizzes - 1) // PAGE_SIZE)
+    quizzes = store.list_quizzes(limit=PAGE_SIZE, offset=st.session_state.saved_page * PAGE_SIZE)
+    
     # Create a dataframe for better display
     quiz_data = []
-    for quiz in st.session_state.saved_quizzes:
+    for quiz in quizzes:
         quiz_data.append({
-            "ID": quiz.get("id", "Unknown"),
-            "Title": quiz.get("title", "Untitled"),
-            "Topic": quiz.get("topic", "Unknown"),
-            "Language": quiz.get("language", "Unknown"),
-            "Difficulty": quiz.get("difficulty", "Unknown"),
-            "Questions": len(quiz.get("questions", [])),
-            "Created": quiz.get("created_at", "Unknown")
+            "ID": quiz["id"],
+            "Title": quiz["title"],
+            "Topic": quiz["topic"],
+            "Language": quiz["language"],
+            "Difficulty": quiz["difficulty"],
+            "Questions": quiz["question_count"],
+            "Created": quiz["created_at"],
+            "Group": quiz["group_id"] or ""
         })
     
     df = pd.DataFrame(quiz_data)
     st.dataframe(df, use_container_width=True)
+    show_pagination("saved_page", total_quizzes, change_saved_page)
     
     # Select quiz to take
+    titles = {quiz["id"]: f"{quiz['title']} · {quiz['language']}" for quiz in quizzes}
+    groups = {quiz["id"]: quiz["group_id"] for quiz in quizzes}
     selected_quiz_id = st.selectbox(
         "Select a quiz to take:", 
-        options=[quiz.get("id", "Unknown") for quiz in st.session_state.saved_quizzes],
-        format_func=lambda x: next((q["title"] for q in st.session_state.saved_quizzes if q.get("id") == x), x)
+        options=list(titles),
+        format_func=lambda x: titles.get(x, x)
     )
     
+    # Language versions translated from the same questions share an answer key
+    if groups.get(selected_quiz_id):
+        versions = store.list_quiz_group(groups[selected_quiz_id])
+        st.caption("Same questions also available in: " + ", ".join(
+            version["language"] for version in versions if version["id"] != selected_quiz_id
+        ))
+    
     # Start selected quiz
     if st.button("Start Selected Quiz"):
-        selected_quiz = next((q for q in st.session_state.saved_quizzes if q.get("id") == selected_quiz_id), None)
+        selected_quiz = store.get_quiz(selected_quiz_id)
         if selected_quiz:
             start_quiz(selected_quiz)
             st.session_state.page = "take"
@@ -374,7 +467,7 @@ def show_saved_quizzes_page():
     
     # Option to delete a quiz
     if st.button("Delete Selected Quiz"):
-        st.session_state.saved_quizzes = [q for q in st.session_state.saved_quizzes if q.get("id") != selected_quiz_id]
+        store.delete_quiz(selected_quiz_id)
         st.success("Quiz deleted successfully!")
         st.rerun()
 
@@ -506,25 +599,16 @@ def show_history_page():
         unsafe_allow_html=True
     )
     
-    # Initialize quiz_history if not exists
-    if 'quiz_history' not in st.session_state:
-        st.session_state.quiz_history = []
-        
-        # Try to load from disk
-        try:
-            if os.path.exists("quiz_history.json"):
-                with open("quiz_history.json", "r") as f:
-                    st.session_state.quiz_history = json.load(f)
-        except Exception:
-            pass
-    
-    if not st.session_state.quiz_history:
+    store = get_quiz_store()
+    total_results = store.count_results()
+    if not total_results:
         st.info("No quiz history yet. Take a quiz first!")
         return
     
-    # Create a dataframe for better display
+    # Newest first; only the current page is read from the store
+    st.session_state.history_page = min(st.session_state.history_page, (total_results - 1) // PAGE_SIZE)
     history_data = []
-    for result in st.session_state.quiz_history:
+    for result in store.list_results(limit=PAGE_SIZE, offset=st.session_state.history_page * PAGE_SIZE):
         percentage = (result["score"] / result["total"]) * 100
         history_data.append({
             "Date": result["date"],
@@ -535,61 +619,56 @@ def show_history_page():
             "Score": f"{result['score']}/{result['total']} ({percentage:.1f}%)"
         })
     
-    # Sort by date, newest first
-    history_data.sort(key=lambda x: x["Date"], reverse=True)
-    
     df = pd.DataFrame(history_data)
     st.dataframe(df, use_container_width=True)
+    show_pagination("history_page", total_results, change_history_page)
     
     # Some analytics
-    if len(history_data) > 1:
+    if total_results > 1:
         st.subheader("Your Progress")
         
-        # Calculate average score by topic
-        topic_data = {}
-        for result in st.session_state.quiz_history:
-            topic = result["topic"]
-            if topic not in topic_data:
-                topic_data[topic] = {"total": 0, "correct": 0, "count": 0}
-            topic_data[topic]["correct"] += result["score"]
-            topic_data[topic]["total"] += result["total"]
-            topic_data[topic]["count"] += 1
+        # Charts read the aggregate tables, so their cost does not grow with history
+        overall = store.summarize(by=())
+        if not overall.empty:
+            attempts_col, average_col = st.columns(2)
+            attempts_col.metric("Quizzes Taken", int(overall["attempts"].iloc[0]))
+            average_col.metric("Average Score", f"{overall['percentage'].iloc[0]:.1f}%")
+        
+        by_topic = store.summarize(by=("topic",))
+        if not by_topic.empty:
+            st.markdown("**Average score by topic**")
+            st.bar_chart(by_topic.set_index("topic")["percentage"])
         
-        # Create chart data
-        chart_data = []
-        for topic, data in topic_data.items():
-            percentage = (data["correct"] / data["total"]) * 100
-            chart_data.append({
-                "Topic": topic,
-                "Percentage": percentage,
-                "Quizzes Taken": data["count"]
-            })
+        by_day = store.summarize(by=("day",))
+        if len(by_day) > 1:
+            st.markdown("**Average score by day**")
+            st.line_chart(by_day.set_index("day")["percentage"])
         
-        # Display chart
-        if chart_data:
-            chart_df = pd.DataFrame(chart_data)
-            st.bar_chart(chart_df.set_index("Topic")["Percentage"])
+        with st.expander("Breakdown by language and difficulty"):
+            breakdown = store.summarize(by=("language", "difficulty"))
+            breakdown["percentage"] = breakdown["percentage"].round(1)
+            st.dataframe(
+                breakdown.rename(columns={
+                    "language": "Language",
+                    "difficulty": "Difficulty",
+                    "attempts": "Quizzes Taken",
+                    "correct": "Correct",
+                    "questions": "Questions",
+                    "percentage": "Percentage"
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
         
         # Clear history button
         if st.button("Clear History"):
-            st.session_state.quiz_history = []
-            # Also delete from disk
-            if os.path.exists("quiz_history.json"):
-                os.remove("quiz_history.json")
+            store.clear_results()
+            st.session_state.history_page = 0
             st.success("History cleared!")
             st.rerun()
 
 # --- Main App Logic ---
 def main():
-    # Load saved quizzes from disk on startup
-    if 'saved_quizzes' not in st.session_state or not st.session_state.saved_quizzes:
-        try:
-            if os.path.exists("saved_quizzes.json"):
-                with open("saved_quizzes.json", "r") as f:
-                    st.session_state.saved_quizzes = json.load(f)
-        except Exception:
-            pass
-    
     # Display the appropriate page
     if st.session_state.page == "create":
         show_create_quiz_page()
@@ -0,0 +1,195 @@
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import astuple, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.near_duplicates import fingerprint, is_near_duplicate, token_set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "question_bank.db"
+
+# Pools smaller than MIN_POOL are topped up in the background to TARGET_POOL
+MIN_POOL = 20
+TARGET_POOL = 40
+# Questions requested per background generation call
+TOP_UP_BATCH = 10
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    """One question pool: questions are only sampled within the same key"""
+    topic: str
+    language: str
+    difficulty: str
+    question_type: str
+
+    @classmethod
+    def of(cls, topic: str, language: str, difficulty: str, question_type: str) -> "PoolKey":
+        return cls(" ".join(topic.casefold().split()), language, difficulty, question_type)
+
+
+# generate(key, num) returns question dicts in the quiz format (question, answer, type, options, explanation)
+Generator = Callable[[PoolKey, int], List[Dict[str, Any]]]
+
+
+class QuestionBank:
+    """
+    Pools of generated questions indexed by (topic, language, difficulty, type)
+
+    New quizzes are sampled from a pool, least-served questions first. Near-identical
+    questions are dropped on insert, and top_up_async() refills a low pool on a worker thread.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, workers: int = 2):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._inflight: Dict[PoolKey, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="question-bank")
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bank_questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                language TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                question_type TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                question TEXT NOT NULL,
+                served_count INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                UNIQUE (topic, language, difficulty, question_type, fingerprint)
+            );
+            CREATE INDEX IF NOT EXISTS idx_bank_pool
+                ON bank_questions (topic, language, difficulty, question_type, served_count);
+            """
+        )
+        self._conn.commit()
+
+    def pool_size(self, key: PoolKey) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM bank_questions "
+                "WHERE topic = ? AND language = ? AND difficulty = ? AND question_type = ?",
+                astuple(key)
+            ).fetchone()[0]
+
+    def add(self, key: PoolKey, questions: List[Dict[str, Any]]) -> int:
+        """Insert questions that are not near-duplicates of the pool; returns how many were added"""
+        with self._lock, self._conn:
+            existing = [
+                set(row[0].split())
+                for row in self._conn.execute(
+                    "SELECT fingerprint FROM bank_questions "
+                    "WHERE topic = ? AND language = ? AND difficulty = ? AND question_type = ?",
+                    astuple(key)
+                )
+            ]
+            added = 0
+            for question in questions:
+                text = question.get("question", "")
+                tokens = token_set(text)
+                if not tokens or any(is_near_duplicate(tokens, other) for other in existing):
+                    continue
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO bank_questions "
+                    "(topic, language, difficulty, question_type, fingerprint, question, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*astuple(key), fingerprint(text), json.dumps(question, ensure_ascii=False), time.time())
+                )
+                existing.append(tokens)
+                added += 1
+        return added
+
+    def sample(self, key: PoolKey, num: int) -> Optional[List[Dict[str, Any]]]:
+        """num questions from the pool, least served first; None if the pool is too small"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, question, served_count FROM bank_questions "
+                "WHERE topic = ? AND language = ? AND difficulty = ? AND question_type = ?",
+                astuple(key)
+            ).fetchall()
+            if len(rows) < num:
+                return None
+            # Shuffle, then stable-sort by served count so ties are broken randomly
+            random.shuffle(rows)
+            rows.sort(key=lambda row: row[2])
+            chosen = rows[:num]
+            self._conn.executemany(
+                "UPDATE bank_questions SET served_count = served_count + 1 WHERE id = ?",
+                [(row[0],) for row in chosen]
+            )
+        return [json.loads(row[1]) for row in chosen]
+
+    def top_up_async(
+        self,
+        key: PoolKey,
+        generate: Generator,
+        target: int = TARGET_POOL,
+        min_pool: int = MIN_POOL
+    ) -> Optional[Future]:
+        """Refill the pool on a worker thread when it is below min_pool; one refill per pool at a time"""
+        if self.pool_size(key) >= min_pool:
+            return None
+        with self._lock:
+            if key in self._inflight:
+                return None
+            future = self._executor.submit(self._top_up, key, generate, target)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finish_top_up(key, f))
+        return future
+
+    def _top_up(self, key: PoolKey, generate: Generator, target: int) -> int:
+        added = 0
+        # Stop after a few batches that add nothing new, so a narrow topic cannot loop forever
+        stale_batches = 0
+        while self.pool_size(key) < target and stale_batches < 3:
+            batch_added = self.add(key, generate(key, TOP_UP_BATCH))
+            added += batch_added
+            stale_batches = 0 if batch_added else stale_batches + 1
+        return added
+
+    def _finish_top_up(self, key: PoolKey, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Question bank top-up for {key} failed: {str(error)}")
+        else:
+            logger.info(f"Question bank top-up for {key} added {future.result()} questions")
+
+    def is_topping_up(self, key: PoolKey) -> bool:
+        with self._lock:
+            return key in self._inflight
+
+    def pools(self) -> List[Tuple[PoolKey, int]]:
+        """Every pool with its size, largest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topic, language, difficulty, question_type, COUNT(*) AS size FROM bank_questions "
+                "GROUP BY topic, language, difficulty, question_type ORDER BY size DESC"
+            ).fetchall()
+        return [(PoolKey(*row[:4]), row[4]) for row in rows]
+
+
+def open_question_bank(db_path: Optional[str] = None) -> QuestionBank:
+    """Question bank at QUESTION_BANK_PATH, falling back to an in-memory store"""
+    db_path = db_path or os.getenv("QUESTION_BANK_PATH", DEFAULT_DB_PATH)
+    try:
+        return QuestionBank(db_path)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open question bank at {db_path}: {str(e)}. Using in-memory store.")
+        return QuestionBank(":memory:")
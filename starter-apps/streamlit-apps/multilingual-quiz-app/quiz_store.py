@@ -0,0 +1,393 @@
+import os
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "quizzes.db"
+
+# Dimensions the history aggregates are kept by; summarize() can group by any subset
+AGGREGATE_DIMENSIONS = ("topic", "language", "difficulty", "day")
+
+# Files written by earlier versions of the app; imported once into a new store
+LEGACY_QUIZZES_PATH = "saved_quizzes.json"
+LEGACY_HISTORY_PATH = "quiz_history.json"
+
+
+class QuizStore(ABC):
+    """Storage backend for saved quizzes and quiz results"""
+
+    @abstractmethod
+    def save_quiz(self, quiz: Dict[str, Any]) -> str:
+        """Store a quiz with its questions and return its id"""
+
+    @abstractmethod
+    def get_quiz(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        """The full quiz including questions, or None"""
+
+    @abstractmethod
+    def list_quizzes(self, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Quiz summaries (no questions), newest first"""
+
+    @abstractmethod
+    def count_quizzes(self) -> int:
+        ...
+
+    @abstractmethod
+    def delete_quiz(self, quiz_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def save_quiz_group(self, quizzes: List[Dict[str, Any]]) -> str:
+        """Store language versions of one quiz together, linked by a shared group_id"""
+
+    @abstractmethod
+    def list_quiz_group(self, group_id: str) -> List[Dict[str, Any]]:
+        """Summaries of every language version in a group"""
+
+    @abstractmethod
+    def save_result(self, result: Dict[str, Any]) -> int:
+        """Append one quiz attempt and return its id"""
+
+    @abstractmethod
+    def list_results(self, limit: Optional[int] = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Quiz attempts, newest first; limit=None returns all of them"""
+
+    @abstractmethod
+    def count_results(self) -> int:
+        ...
+
+    @abstractmethod
+    def clear_results(self) -> None:
+        ...
+
+    @abstractmethod
+    def summarize(self, by: Sequence[str] = ("topic",)) -> pd.DataFrame:
+        """
+        Attempts, correct answers, questions and percentage grouped by AGGREGATE_DIMENSIONS
+
+        Read from aggregates maintained on every save, so the cost does not grow with history.
+        """
+
+
+def new_quiz_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class SQLiteQuizStore(QuizStore):
+    """
+    SQLite backend with indexed tables for quizzes, questions and results
+
+    Every write is one transaction touching only the new rows, so saving stays constant time
+    as history grows and concurrent sessions cannot corrupt each other's writes.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS quizzes (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                language TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                question_count INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                group_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_quizzes_created ON quizzes (created_at);
+            CREATE TABLE IF NOT EXISTS questions (
+                quiz_id TEXT NOT NULL REFERENCES quizzes (id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                options TEXT NOT NULL,
+                explanation TEXT,
+                PRIMARY KEY (quiz_id, position)
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                quiz_id TEXT,
+                quiz_title TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                language TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_date ON results (date);
+            CREATE TABLE IF NOT EXISTS result_aggregates (
+                topic TEXT NOT NULL,
+                language TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                day TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                correct INTEGER NOT NULL,
+                questions INTEGER NOT NULL,
+                PRIMARY KEY (topic, language, difficulty, day)
+            );
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        # Stores created before quiz groups existed lack the column
+        quiz_columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(quizzes)")]
+        if "group_id" not in quiz_columns:
+            self._conn.execute("ALTER TABLE quizzes ADD COLUMN group_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_quizzes_group ON quizzes (group_id)")
+        self._conn.commit()
+        self._backfill_aggregates()
+
+    def _backfill_aggregates(self) -> None:
+        # Stores created before the aggregates existed have results but no aggregate rows
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM store_meta WHERE key = 'aggregates_built'").fetchone():
+                return
+            self._conn.execute("DELETE FROM result_aggregates")
+            self._conn.execute(
+                "INSERT INTO result_aggregates (topic, language, difficulty, day, attempts, correct, questions) "
+                "SELECT topic, language, difficulty, substr(date, 1, 10), COUNT(*), SUM(score), SUM(total) "
+                "FROM results GROUP BY topic, language, difficulty, substr(date, 1, 10)"
+            )
+            self._conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('aggregates_built', ?)", (datetime.now().isoformat(),)
+            )
+
+    def _insert_quiz(self, quiz: Dict[str, Any]) -> str:
+        quiz_id = quiz.get("id") or new_quiz_id()
+        questions = quiz.get("questions", [])
+        self._conn.execute(
+            "INSERT OR REPLACE INTO quizzes "
+            "(id, title, topic, language, difficulty, question_count, created_at, group_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                quiz_id,
+                quiz.get("title", "Untitled"),
+                quiz.get("topic", "Unknown"),
+                quiz.get("language", "Unknown"),
+                quiz.get("difficulty", "Unknown"),
+                len(questions),
+                quiz.get("created_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                quiz.get("group_id")
+            )
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO questions (quiz_id, position, type, question, answer, options, explanation) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    quiz_id,
+                    position,
+                    q.get("type", "multiple_choice"),
+                    q["question"],
+                    str(q["answer"]),
+                    json.dumps(q.get("options", []), ensure_ascii=False),
+                    q.get("explanation")
+                )
+                for position, q in enumerate(questions)
+            ]
+        )
+        return quiz_id
+
+    def save_quiz(self, quiz: Dict[str, Any]) -> str:
+        with self._lock, self._conn:
+            quiz_id = self._insert_quiz(quiz)
+        quiz["id"] = quiz_id
+        return quiz_id
+
+    def get_quiz(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM quizzes WHERE id = ?", (quiz_id,)).fetchone()
+            if row is None:
+                return None
+            question_rows = self._conn.execute(
+                "SELECT type, question, answer, options, explanation FROM questions "
+                "WHERE quiz_id = ? ORDER BY position",
+                (quiz_id,)
+            ).fetchall()
+
+        quiz = dict(row)
+        quiz["questions"] = []
+        for q in question_rows:
+            question = {"question": q["question"], "answer": q["answer"], "type": q["type"], "options": json.loads(q["options"])}
+            if q["explanation"]:
+                question["explanation"] = q["explanation"]
+            quiz["questions"].append(question)
+        return quiz
+
+    def list_quizzes(self, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM quizzes ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_quizzes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quizzes").fetchone()[0]
+
+    def delete_quiz(self, quiz_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM quizzes WHERE id = ?", (quiz_id,))
+
+    def save_quiz_group(self, quizzes: List[Dict[str, Any]]) -> str:
+        group_id = next((quiz["group_id"] for quiz in quizzes if quiz.get("group_id")), None) or new_quiz_id()
+        with self._lock, self._conn:
+            for quiz in quizzes:
+                quiz["group_id"] = group_id
+                quiz["id"] = self._insert_quiz(quiz)
+        return group_id
+
+    def list_quiz_group(self, group_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM quizzes WHERE group_id = ? ORDER BY created_at, rowid", (group_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _insert_result(self, result: Dict[str, Any]) -> int:
+        topic = result.get("topic", "Unknown")
+        language = result.get("language", "Unknown")
+        difficulty = result.get("difficulty", "Unknown")
+        date = result.get("date") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self._conn.execute(
+            "INSERT INTO results (quiz_id, quiz_title, topic, language, difficulty, score, total, date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                result.get("quiz_id"),
+                result.get("quiz_title", "Untitled"),
+                topic,
+                language,
+                difficulty,
+                result["score"],
+                result["total"],
+                date
+            )
+        )
+        # Same transaction as the result row, so aggregates never drift from the history
+        self._conn.execute(
+            "INSERT INTO result_aggregates (topic, language, difficulty, day, attempts, correct, questions) "
+            "VALUES (?, ?, ?, ?, 1, ?, ?) "
+            "ON CONFLICT (topic, language, difficulty, day) DO UPDATE SET "
+            "attempts = attempts + 1, correct = correct + excluded.correct, questions = questions + excluded.questions",
+            (topic, language, difficulty, date[:10], result["score"], result["total"])
+        )
+        return cursor.lastrowid
+
+    def save_result(self, result: Dict[str, Any]) -> int:
+        with self._lock, self._conn:
+            return self._insert_result(result)
+
+    def list_results(self, limit: Optional[int] = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM results ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_results(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear_results(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM result_aggregates")
+
+    def summarize(self, by: Sequence[str] = ("topic",)) -> pd.DataFrame:
+        unknown = [column for column in by if column not in AGGREGATE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Cannot summarize by {', '.join(unknown)}; use {', '.join(AGGREGATE_DIMENSIONS)}")
+        columns = ", ".join(by)
+        query = "SELECT " + (f"{columns}, " if by else "") + (
+            "SUM(attempts) AS attempts, SUM(correct) AS correct, SUM(questions) AS questions FROM result_aggregates"
+        )
+        if by:
+            query += f" GROUP BY {columns} ORDER BY {columns}"
+        with self._lock:
+            summary = pd.read_sql_query(query, self._conn)
+        summary = summary[summary["attempts"].fillna(0) > 0].reset_index(drop=True)
+        summary["percentage"] = summary["correct"] / summary["questions"].where(summary["questions"] > 0) * 100
+        return summary
+
+    def import_legacy_json(
+        self,
+        quizzes_path: str = LEGACY_QUIZZES_PATH,
+        history_path: str = LEGACY_HISTORY_PATH
+    ) -> int:
+        """One-time import of the JSON files older versions wrote; returns records imported"""
+        imported = 0
+        for name, path, insert in (
+            ("quizzes", quizzes_path, self._insert_quiz),
+            ("history", history_path, self._insert_result),
+        ):
+            if not os.path.exists(path):
+                continue
+            with self._lock:
+                done = self._conn.execute(
+                    "SELECT 1 FROM store_meta WHERE key = ?", (f"legacy_{name}_imported",)
+                ).fetchone()
+            if done:
+                continue
+            try:
+                with open(path, "r") as f:
+                    records = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read legacy {name} file {path}: {str(e)}")
+                continue
+            with self._lock, self._conn:
+                for record in records:
+                    try:
+                        insert(record)
+                        imported += 1
+                    except (KeyError, TypeError, sqlite3.Error) as e:
+                        logger.warning(f"Skipping legacy {name} record: {str(e)}")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+                    (f"legacy_{name}_imported", datetime.now().isoformat())
+                )
+        return imported
+
+
+# Backends by name; register another one to keep quizzes somewhere else
+BACKENDS: Dict[str, Callable[[str], QuizStore]] = {"sqlite": SQLiteQuizStore}
+
+
+def register_backend(name: str, factory: Callable[[str], QuizStore]) -> None:
+    BACKENDS[name] = factory
+
+
+def open_quiz_store(backend: Optional[str] = None, location: Optional[str] = None) -> QuizStore:
+    """Open the configured store (QUIZ_STORE_BACKEND / QUIZ_STORE_PATH) and import legacy JSON files"""
+    backend = backend or os.getenv("QUIZ_STORE_BACKEND", "sqlite")
+    location = location or os.getenv("QUIZ_STORE_PATH", DEFAULT_DB_PATH)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown quiz store backend '{backend}'. Available: {', '.join(BACKENDS)}")
+    store = BACKENDS[backend](location)
+    if isinstance(store, SQLiteQuizStore):
+        imported = store.import_legacy_json()
+        if imported:
+            logger.info(f"Imported {imported} records from legacy JSON files")
+    return store
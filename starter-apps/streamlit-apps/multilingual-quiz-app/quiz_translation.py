@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import copy
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.progressive_translation import translate_as_completed
+
+LETTER_ANSWERS = ["A", "B", "C", "D", "E", "F"]
+
+
+class QuizTranslationError(ValueError):
+    """The translated quiz does not line up with the canonical one"""
+
+
+def answer_index(question: Dict[str, Any]) -> Optional[int]:
+    """Index of the correct option, whether the answer is stored as a letter or as option text"""
+    answer = str(question.get("answer", "")).strip()
+    options = [str(option).strip() for option in question.get("options", [])]
+    if answer in LETTER_ANSWERS[:len(options)]:
+        return LETTER_ANSWERS.index(answer)
+    if answer in options:
+        return options.index(answer)
+    return None
+
+
+def _translation_payload(quiz: Dict[str, Any]) -> List[Dict[str, Any]]:
+    payload = []
+    for q in quiz["questions"]:
+        item = {"question": q["question"]}
+        # True/False options are rendered as fixed buttons and stay as they are
+        if q.get("type") == "multiple_choice":
+            item["options"] = q.get("options", [])
+        if q.get("explanation"):
+            item["explanation"] = q["explanation"]
+        payload.append(item)
+    return payload
+
+
+def _parse_json(content: str) -> Any:
+    content = content.strip().replace("```json", "").replace("```", "").strip()
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end == -1:
+        raise QuizTranslationError("Translation response contained no JSON object")
+    try:
+        return json.loads(content[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise QuizTranslationError(f"Translation response is not valid JSON: {str(e)}") from e
+
+
+def translate_quiz(quiz: Dict[str, Any], target_language: str, llm: Any) -> Dict[str, Any]:
+    """
+    Translate a canonical quiz into target_language in one request
+
+    Question order, option order and therefore the answer key stay identical; the answer is
+    re-pointed at the translated option with the same index.
+    """
+    payload = _translation_payload(quiz)
+    prompt = (
+        f"Translate this quiz from {quiz['language']} into {target_language}.\n"
+        "Return ONLY a JSON object of the form {\"questions\": [...]} with exactly the same number of "
+        "questions in the same order. Each question must have the same keys as the input, and \"options\" "
+        "must have exactly the same number of options in the same order. Do not reorder, merge, add or "
+        "drop options. Keep numbers, names and formulas unchanged.\n\n"
+        f"{json.dumps({'questions': payload}, ensure_ascii=False)}"
+    )
+    translated = _parse_json(llm.invoke(prompt).content).get("questions")
+    if not isinstance(translated, list) or len(translated) != len(payload):
+        raise QuizTranslationError(f"{target_language}: expected {len(payload)} questions")
+
+    result = copy.deepcopy(quiz)
+    result["language"] = target_language
+    result["source_language"] = quiz["language"]
+    result.pop("id", None)
+    for i, (question, source, item) in enumerate(zip(result["questions"], quiz["questions"], translated)):
+        if not isinstance(item, dict) or not item.get("question"):
+            raise QuizTranslationError(f"{target_language}: question {i + 1} is missing")
+        question["question"] = item["question"]
+        if source.get("explanation"):
+            question["explanation"] = item.get("explanation") or source["explanation"]
+
+        if source.get("type") == "multiple_choice":
+            options = item.get("options")
+            if not isinstance(options, list) or len(options) != len(source.get("options", [])):
+                raise QuizTranslationError(f"{target_language}: options of question {i + 1} do not line up")
+            question["options"] = [str(option) for option in options]
+            index = answer_index(source)
+            # Letter answers already point at a position; text answers follow their option
+            if index is not None and str(source["answer"]).strip() not in LETTER_ANSWERS:
+                question["answer"] = question["options"][index]
+    return result
+
+
+def translate_quiz_languages(
+    quiz: Dict[str, Any],
+    languages: List[str],
+    llm: Any,
+    max_workers: int = 6
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """Translate quiz into every language concurrently, yielding (language, quiz, error) as each finishes"""
+    for i, translated, error in translate_as_completed(
+        languages, lambda language: translate_quiz(quiz, language, llm), max_workers=max_workers
+    ):
+        yield languages[i], None if error else translated, error
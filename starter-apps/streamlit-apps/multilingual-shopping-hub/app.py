@@ -1,10 +1,26 @@
 import streamlit as st
 import requests
 import json
+import os
+import pandas as pd
+import sys
+import logging
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 from langchain.callbacks.base import BaseCallbackHandler
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL, serper_url
+from sutra_common.progressive_translation import translate_as_completed
+from sutra_common.query_translation import translate_query_cached
+from sutra_common.rate_limiter import BACKGROUND, INTERACTIVE, PREFETCH, get_rate_limiter
+from sutra_common.result_cache import ResultCache
+from sutra_common.telemetry import llm_callbacks
+from sutra_common.translation_memory import get_translation_memory
+
+logger = logging.getLogger(__name__)
+
 # Page configuration
 st.set_page_config(
     page_title="Multilingual Shopping Hub",
@@ -27,6 +43,10 @@ languages = [
     "Tagalog", "Swahili"
 ]
 
+# Bump when the translation prompt changes so cached translations are not reused
+PRODUCT_PROMPT_VERSION = "products-v1"
+QUERY_PROMPT_VERSION = "query-products-v1"
+
 def get_stars(rating):
     full_stars = int(rating)
     half_star = rating % 1 >= 0.5
@@ -55,37 +75,50 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model(api_key):
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.3,  # Lower temperature for more accurate translations
+        callbacks=llm_callbacks()
     )
 
+# Shared search result cache - identical searches from every session share one Serper call
+@st.cache_resource
+def get_search_cache():
+    return ResultCache(ttl=300)
+
+# Every Serper request goes through the shared limiter; prefetching waits behind interactive searches
+def serper_post(url, headers, payload, priority=INTERACTIVE):
+    def post():
+        response = requests.request("POST", url, headers=headers, data=payload)
+        response.raise_for_status()
+        return response.json()
+    return get_rate_limiter().call("serper", post, priority)
+
 # Function to fetch high-quality image using Serper Images API
-def fetch_high_quality_image(query):
-    url = "https://google.serper.dev/images"
+def fetch_high_quality_image(query, api_key=None, priority=INTERACTIVE):
+    url = serper_url("images")
     payload = json.dumps({
         "q": query,
         "num": 1  # We only need one image
     })
     headers = {
-        'X-API-KEY': st.session_state.serper_api_key,
+        'X-API-KEY': api_key or st.session_state.serper_api_key,
         'Content-Type': 'application/json'
     }
     
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response.raise_for_status()
-        results = response.json()
+        results = serper_post(url, headers, payload, priority)
         if results.get("images") and len(results["images"]) > 0:
             return results["images"][0].get("imageUrl")
         return None
     except Exception as e:
-        st.warning(f"Error fetching high-quality image: {str(e)}")
+        # Also runs on the prefetch thread, where st.* calls have no page to write to
+        logger.warning(f"Error fetching high-quality image: {str(e)}")
         return None
 
-# Function to fetch products using Serper API
-def fetch_products(query, num_results=20, page=1):
-    url = "https://google.serper.dev/shopping"
+# Fetch one page of products from Serper without touching the UI (safe to run in the background)
+def load_products_page(query, num_results, page, api_key, priority=INTERACTIVE):
+    url = serper_url("shopping")
     payload = {
         "q": query,
         "num": num_results,  # Use the user's preferred number of results
@@ -94,148 +127,186 @@ def fetch_products(query, num_results=20, page=1):
     
     payload = json.dumps(payload)
     headers = {
-        'X-API-KEY': st.session_state.serper_api_key,
+        'X-API-KEY': api_key,
         'Content-Type': 'application/json'
     }
     
+    results = serper_post(url, headers, payload, priority)
+    products = results.get("shopping", [])
+    
+    # Enhance products with high-quality images
+    enhanced_products = []
+    for item in products:
+        # Try to get a high-quality image based on the title
+        high_quality_image = fetch_high_quality_image(item.get('title', ''), api_key, priority)
+        if high_quality_image:
+            item['imageUrl'] = high_quality_image
+        enhanced_products.append(item)
+    
+    return enhanced_products
+
+def products_cache_key(query, num_results, page):
+    return ResultCache.make_key("shopping", query, {"num": num_results}, page)
+
+# Function to fetch products using Serper API
+def fetch_products(query, num_results=20, page=1):
+    api_key = st.session_state.serper_api_key
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        response.raise_for_status()
-        results = response.json()
-        products = results.get("shopping", [])
-        
-        # Enhance products with high-quality images
-        enhanced_products = []
-        for item in products:
-            # Try to get a high-quality image based on the title
-            high_quality_image = fetch_high_quality_image(item.get('title', ''))
-            if high_quality_image:
-                item['imageUrl'] = high_quality_image
-            enhanced_products.append(item)
-        
-        return enhanced_products
+        return get_search_cache().get_or_load(
+            products_cache_key(query, num_results, page),
+            lambda: load_products_page(query, num_results, page, api_key)
+        )
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching products: {str(e)}")
         return []
 
-# Function to translate products using Sutra LLM
-def translate_products(products, target_language, api_key):
-    try:
+# Load the next page (and its translations) in the background while the user browses this one
+def prefetch_products_page(query, num_results, page, target_language, sutra_api_key):
+    serper_api_key = st.session_state.serper_api_key
+    
+    def translate_page(products):
+        # Translations land in the translation memory, so rendering the page later is instant
+        if target_language != "English" and sutra_api_key:
+            for item in products:
+                try:
+                    translate_product_item(item, target_language, sutra_api_key, PREFETCH)
+                except Exception:
+                    continue
+    
+    get_search_cache().prefetch(
+        products_cache_key(query, num_results, page),
+        lambda: load_products_page(query, num_results, page, serper_api_key, PREFETCH),
+        on_loaded=translate_page
+    )
+
+# Translate one product, reusing the shared translation memory where possible
+def translate_product_item(item, target_language, api_key, priority=BACKGROUND):
+    # Prepare only the fields that need translation
+    fields_to_translate = {
+        "title": item.get('title', ''),
+        "source": item.get('source', ''),
+        "delivery": item.get('delivery', '')
+    }
+    
+    translation_memory = get_translation_memory()
+    translated_fields = translation_memory.lookup_fields(fields_to_translate, target_language, PRODUCT_PROMPT_VERSION)
+    
+    if len(translated_fields) < len(fields_to_translate):
         # Get base model (non-streaming) for translation
         model = get_base_chat_model(api_key)
         
-        # Create a container for all products
-        products_container = st.container()
+        # Create a specific prompt for each product
+        system_message = f"""
+        You are a professional translator specializing in product translation. Translate the following product content to {target_language}.
         
-        # Process each product individually
-        translated_items = []
-        for i, item in enumerate(products):
-            # Store original image URL
-            original_image_url = item.get('imageUrl')
-            
-            # Create a specific prompt for each product
-            system_message = f"""
-            You are a professional translator specializing in product translation. Translate the following product content to {target_language}.
-            
-            Translation Rules:
-            1. Translate ONLY these fields:
-               - title: Keep it concise and product-focused
-               - source: Translate the store name if it has a common translation
-               - delivery: Translate shipping information
-            
-            2. Translation Guidelines:
-               - Ensure natural and fluent language
-               - Maintain the original meaning and context
-               - Keep any brand names, sizes, and product codes in their original form
-               - Preserve any numbers, prices, and measurements
-               - Keep any technical terms accurate
-            
-            3. Return ONLY the translated fields in this exact format:
-            {{
-                "title": "translated title",
-                "source": "translated source",
-                "delivery": "translated delivery"
-            }}
-            
-            4. Important:
-               - Do not add any explanations
-               - Do not modify the JSON structure
-               - Do not translate any other fields
-               - Ensure the translation is culturally appropriate for {target_language} speakers
-            """
-            
-            # Prepare only the fields that need translation
-            fields_to_translate = {
-                "title": item.get('title', ''),
-                "source": item.get('source', ''),
-                "delivery": item.get('delivery', '')
-            }
-            
-            # Convert to JSON string
-            item_json = json.dumps(fields_to_translate, ensure_ascii=False)
-            
-            # Generate response
-            messages = [
-                HumanMessage(content=f"{system_message}\n\nFields to translate:\n{item_json}")
-            ]
-            
-            try:
-                # Show processing status
-                with st.spinner(f"Translating product {i+1} of {len(products)}..."):
-                    response = model.invoke(messages)
-                    result = response.content.strip()
-                    
-                    # Clean the response
-                    result = result.replace('```json', '').replace('```', '').strip()
-                    
-                    # Parse the translated fields
-                    translated_fields = json.loads(result)
-                    
-                    # Create new item with translated fields and original data
-                    translated_item = {
-                        **item,  # Keep all original fields
-                        "title": translated_fields.get('title', item.get('title', '')),
-                        "source": translated_fields.get('source', item.get('source', '')),
-                        "delivery": translated_fields.get('delivery', item.get('delivery', '')),
-                        "imageUrl": original_image_url  # Ensure original image is kept
-                    }
-                    
-                    translated_items.append(translated_item)
-                    
-                    # Display the translated product with improved layout
-                    with products_container:
-                        rating_stars = get_stars(float(translated_item.get('rating', 0))) if translated_item.get('rating') else ""
-                        st.markdown(f"""
-                            <div class="product-card">
-                                <div style="display: flex; gap: 20px;">
-                                    <div style="flex: 3;">
-                                        <h3 class="product-title">{i+1}. {translated_item['title']}</h3>
-                                        <p class="product-info">🏪 <strong>Store:</strong> {translated_item['source']}</p>
-                                        <p class="product-price">💰 <strong>Price:</strong> {translated_item['price']}</p>
-                                        <p class="product-delivery">🚚 <strong>Delivery:</strong> {translated_item['delivery']}</p>
-                                        {f'<p class="product-rating"><span class="stars">{rating_stars}</span> <strong>Rating:</strong> {translated_item["rating"]} ({translated_item.get("ratingCount", 0)} reviews)</p>' if translated_item.get('rating') else ''}
-                                        <p><a href="{translated_item['link']}" class="product-link" target="_blank">🛒 View Product</a></p>
-                                    </div>
-                                    <div style="flex: 2;">
-                                        <div class="image-container">
-                                            <img src="{translated_item['imageUrl']}" alt="Product Image">
-                                        </div>
-                                    </div>
-                                </div>
-                            </div>
-                        """, unsafe_allow_html=True)
-            except json.JSONDecodeError as e:
-                st.warning(f"Failed to parse translation of item {i+1}: {str(e)}. Using original.")
-                translated_items.append(item)
-            except Exception as e:
-                st.warning(f"Error translating item {i+1}: {str(e)}. Using original.")
-                translated_items.append(item)
+        Translation Rules:
+        1. Translate ONLY these fields:
+           - title: Keep it concise and product-focused
+           - source: Translate the store name if it has a common translation
+           - delivery: Translate shipping information
         
-        return translated_items
-            
-    except Exception as e:
-        st.error(f"Translation error: {str(e)}")
-        return products
+        2. Translation Guidelines:
+           - Ensure natural and fluent language
+           - Maintain the original meaning and context
+           - Keep any brand names, sizes, and product codes in their original form
+           - Preserve any numbers, prices, and measurements
+           - Keep any technical terms accurate
+        
+        3. Return ONLY the translated fields in this exact format:
+        {{
+            "title": "translated title",
+            "source": "translated source",
+            "delivery": "translated delivery"
+        }}
+        
+        4. Important:
+           - Do not add any explanations
+           - Do not modify the JSON structure
+           - Do not translate any other fields
+           - Ensure the translation is culturally appropriate for {target_language} speakers
+        """
+        
+        # Convert to JSON string
+        item_json = json.dumps(fields_to_translate, ensure_ascii=False)
+        
+        # Generate response
+        messages = [
+            HumanMessage(content=f"{system_message}\n\nFields to translate:\n{item_json}")
+        ]
+        
+        response = get_rate_limiter().call("sutra", lambda: model.invoke(messages), priority)
+        result = response.content.strip()
+        
+        # Clean the response
+        result = result.replace('```json', '').replace('```', '').strip()
+        
+        # Parse the translated fields
+        translated_fields = json.loads(result)
+        translation_memory.store_fields(fields_to_translate, translated_fields, target_language, PRODUCT_PROMPT_VERSION)
+    
+    # Create new item with translated fields and original data
+    return {
+        **item,  # Keep all original fields
+        "title": translated_fields.get('title', item.get('title', '')),
+        "source": translated_fields.get('source', item.get('source', '')),
+        "delivery": translated_fields.get('delivery', item.get('delivery', '')),
+        "imageUrl": item.get('imageUrl')  # Ensure original image is kept
+    }
+
+# Function to display one product card with improved layout
+def render_product_card(product, i):
+    rating_stars = get_stars(float(product.get('rating', 0))) if product.get('rating') else ""
+    st.markdown(f"""
+        <div class="product-card">
+            <div style="display: flex; gap: 20px;">
+                <div style="flex: 3;">
+                    <h3 class="product-title">{i+1}. {product.get('title', 'No Title')}</h3>
+                    <p class="product-info">🏪 <strong>Store:</strong> {product.get('source', 'Unknown')}</p>
+                    <p class="product-price">💰 <strong>Price:</strong> {product.get('price', 'Price not available')}</p>
+                    <p class="product-delivery">🚚 <strong>Delivery:</strong> {product.get('delivery', 'Delivery info not available')}</p>
+                    {f'<p class="product-rating"><span class="stars">{rating_stars}</span> <strong>Rating:</strong> {product["rating"]} ({product.get("ratingCount", 0)} reviews)</p>' if product.get('rating') else ''}
+                    <p><a href="{product.get('link', '#')}" class="product-link" target="_blank">🛒 View Product</a></p>
+                </div>
+                <div style="flex: 2;">
+                    <div class="image-container">
+                        <img src="{product.get('imageUrl')}" alt="Product Image">
+                    </div>
+                </div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+# Function to translate products using Sutra LLM
+def translate_products(products, target_language, api_key):
+    # Show the original products right away; each card is swapped in place once translated
+    status = st.empty()
+    placeholders = []
+    for i, item in enumerate(products):
+        placeholder = st.empty()
+        with placeholder.container():
+            render_product_card(item, i)
+        placeholders.append(placeholder)
+    
+    translated_items = list(products)
+    completed = 0
+    status.caption(f"Translating {len(products)} products to {target_language}...")
+    for i, translated_item, error in translate_as_completed(
+        products,
+        lambda item: translate_product_item(item, target_language, api_key)
+    ):
+        completed += 1
+        if isinstance(error, json.JSONDecodeError):
+            st.warning(f"Failed to parse translation of item {i+1}: {str(error)}. Using original.")
+        elif error is not None:
+            st.warning(f"Error translating item {i+1}: {str(error)}. Using original.")
+        else:
+            translated_items[i] = translated_item
+            with placeholders[i].container():
+                render_product_card(translated_item, i)
+        status.caption(f"Translated {completed} of {len(products)} products to {target_language}")
+    
+    status.empty()
+    return translated_items
 
 # Function to translate search query to English using Sutra LLM
 def translate_query_to_english(query, api_key):
@@ -258,16 +329,20 @@ def translate_query_to_english(query, api_key):
         Return ONLY the translated query without any explanations or additional text.
         """
         
-        messages = [
-            HumanMessage(content=f"{system_message}\n\nQuery to translate:\n{query}")
-        ]
+        def translate_with_model(text):
+            messages = [
+                HumanMessage(content=f"{system_message}\n\nQuery to translate:\n{text}")
+            ]
+            response = get_rate_limiter().call("sutra", lambda: model.invoke(messages), INTERACTIVE)
+            return response.content.strip()
         
-        response = model.invoke(messages)
-        translated_query = response.content.strip()
+        # English queries and queries seen before skip the model round-trip
+        translated_query, source = translate_query_cached(query, QUERY_PROMPT_VERSION, translate_with_model)
         
         # Log the translation for debugging
-        st.write(f"Debug - Original query: {query}")
-        st.write(f"Debug - Translated query: {translated_query}")
+        if source == "model":
+            st.write(f"Debug - Original query: {query}")
+            st.write(f"Debug - Translated query: {translated_query}")
         
         return translated_query
         
@@ -276,6 +351,66 @@ def translate_query_to_english(query, api_key):
         st.warning("Using original query as fallback.")
         return query
 
+# First amount in a price string: "$1,299.99", "€1.299,99", "₹1,29,999", "$25.00 - $30.00".
+# Indian lakh grouping (two-digit groups before the last three digits) is tried first
+PRICE_PATTERN = r"(\d{1,3}(?:,\d{2})+,\d{3}|\d{1,3}(?:[,.\u00a0 ]\d{3})+|\d+)(?:[.,](\d{1,2})(?!\d))?"
+CURRENCY_PATTERN = r"([^\d\s.,]+)"
+# Spellings of the same currency, so "Rs. 999" and "₹999" are filtered together
+CURRENCY_ALIASES = {"Rs": "₹", "INR": "₹", "US$": "$", "USD": "$", "EUR": "€", "GBP": "£"}
+ALL_CURRENCIES = "All currencies"
+
+SORT_OPTIONS = {
+    "Relevance": None,
+    "Price: Low to High": ("price_value", True),
+    "Price: High to Low": ("price_value", False),
+    "Rating": ("rating_value", False),
+    "Most Reviewed": ("rating_count", False),
+}
+
+# Normalize fetched products into a table once, so filtering and sorting are vectorized
+def build_product_table(products):
+    table = pd.DataFrame({
+        "item": pd.Series(products, dtype=object),
+        "price": pd.Series([item.get('price') or '' for item in products], dtype=str),
+        "source": pd.Series([item.get('source') or 'Unknown' for item in products], dtype=str),
+        "rating": pd.Series([item.get('rating') for item in products], dtype=object),
+        "ratingCount": pd.Series([item.get('ratingCount') for item in products], dtype=object),
+    })
+    
+    # Split the amount into whole and fractional parts; separators in the whole part are dropped
+    amount = table["price"].str.extract(PRICE_PATTERN)
+    whole = pd.to_numeric(amount[0].str.replace(r"\D", "", regex=True), errors="coerce")
+    fraction = pd.to_numeric(amount[1], errors="coerce").fillna(0)
+    scale = 10.0 ** amount[1].str.len().fillna(0)
+    table["price_value"] = whole + fraction / scale
+    currency = table["price"].str.extract(CURRENCY_PATTERN)[0].fillna("")
+    table["currency"] = currency.replace(CURRENCY_ALIASES)
+    
+    table["rating_value"] = pd.to_numeric(table["rating"], errors="coerce")
+    table["rating_count"] = pd.to_numeric(
+        table["ratingCount"].astype(str).str.replace(",", "", regex=False),
+        errors="coerce"
+    ).fillna(0)
+    return table.drop(columns=["rating", "ratingCount"])
+
+# Function to filter products by price, currency, rating and store, then sort
+def filter_products_by_price(table, min_price, max_price, min_rating=0.0, sources=None, sort_by="Relevance", currency=None):
+    mask = table["price_value"].between(min_price, max_price)
+    if currency:
+        # Amounts in different currencies are not comparable, so the range applies to one of them
+        mask &= table["currency"] == currency
+    if min_rating > 0:
+        mask &= table["rating_value"] >= min_rating
+    if sources:
+        mask &= table["source"].isin(sources)
+    
+    filtered = table.loc[mask]
+    sort = SORT_OPTIONS.get(sort_by)
+    if sort:
+        column, ascending = sort
+        filtered = filtered.sort_values(column, ascending=ascending, kind="stable", na_position="last")
+    return filtered["item"].tolist()
+
 # Initialize session state variables
 if "serper_api_key" not in st.session_state:
     st.session_state.serper_api_key = ""
@@ -291,6 +426,24 @@ if "min_price" not in st.session_state:
     st.session_state.min_price = 0
 if "max_price" not in st.session_state:
     st.session_state.max_price = 1000
+if "products_request" not in st.session_state:
+    st.session_state.products_request = None
+if "products_page" not in st.session_state:
+    st.session_state.products_page = 1
+if "products_table" not in st.session_state:
+    st.session_state.products_table = build_product_table(st.session_state.products_data)
+
+# Pagination callback - cached and prefetched pages load without a new Serper call
+def change_products_page(step):
+    request = st.session_state.products_request
+    page = max(1, st.session_state.products_page + step)
+    products = fetch_products(page=page, **request)
+    if products:
+        st.session_state.products_page = page
+        st.session_state.products_data = products
+        st.session_state.products_table = build_product_table(products)
+    else:
+        st.warning("No more products found for this search.")
 
 # Sidebar for settings
 with st.sidebar:
@@ -330,33 +483,54 @@ with st.sidebar:
     
     # Price range selector
     st.markdown("### Price Range")
+    currencies = st.session_state.products_table["currency"]
+    # Most common currency first, so the range starts out in the unit most listings use
+    currency_options = [c for c in currencies.value_counts().index if c] + [ALL_CURRENCIES]
+    selected_currency = st.selectbox("Currency:",
+                                     currency_options,
+                                     help="Prices are only compared within one currency")
+    currency_label = "" if selected_currency == ALL_CURRENCIES else selected_currency
     col1, col2 = st.columns(2)
     with col1:
-        min_price = st.number_input("Min Price ($)", 
+        min_price = st.number_input(f"Min Price {currency_label}".strip(), 
                                   min_value=0, 
-                                  max_value=10000, 
+                                  max_value=10000000, 
                                   value=st.session_state.min_price,
                                   step=10,
-                                  help="Minimum price in dollars")
+                                  help="Minimum price in the selected currency")
     with col2:
-        max_price = st.number_input("Max Price ($)", 
+        max_price = st.number_input(f"Max Price {currency_label}".strip(), 
                                   min_value=0, 
-                                  max_value=10000, 
+                                  max_value=10000000, 
                                   value=st.session_state.max_price,
                                   step=10,
-                                  help="Maximum price in dollars")
+                                  help="Maximum price in the selected currency")
     
     # Update session state with price range
     st.session_state.min_price = min_price
     st.session_state.max_price = max_price
     
+    # Rating, store and sort controls
+    st.markdown("### Refine Results")
+    min_rating = st.slider("Minimum rating:", 
+                           min_value=0.0, 
+                           max_value=5.0, 
+                           value=0.0, 
+                           step=0.5,
+                           help="Hide products rated below this")
+    store_options = sorted(st.session_state.products_table["source"].unique())
+    selected_sources = st.multiselect("Stores:", 
+                                      store_options,
+                                      help="Leave empty to show all stores")
+    sort_by = st.selectbox("Sort by:", list(SORT_OPTIONS.keys()))
+    
     # Language selector
     st.markdown("### Language Settings")
     selected_language = st.selectbox("Select language:", languages)
     
     st.divider()
     st.markdown(f"Currently viewing products in: **{selected_language}**")
-    st.markdown(f"Price range: **${min_price} - ${max_price}**")
+    st.markdown(f"Price range: **{currency_label}{min_price} - {currency_label}{max_price}**")
     
     # About section
     with st.expander("About Multilingual Shopping Hub"):
@@ -398,56 +572,49 @@ if search_button or (not st.session_state.products_data and st.session_state.ser
         else:
             english_query = search_query
         
+        # Remember the request so the pagination buttons can fetch further pages
+        products_request = {
+            "query": english_query,
+            "num_results": st.session_state.num_results  # Use the stored user preference
+        }
+        
         # Show loading message
         with st.spinner(f"Fetching products for '{english_query}'..."):
             # Fetch products data
-            products = fetch_products(
-                query=english_query,
-                num_results=st.session_state.num_results  # Use the stored user preference
-            )
+            products = fetch_products(**products_request)
             
             if products:
                 st.session_state.products_data = products
+                st.session_state.products_table = build_product_table(products)
+                st.session_state.products_request = products_request
+                st.session_state.products_page = 1
                 st.success(f"Found {len(products)} products!")
             else:
                 st.warning("No products found. Try a different search term.")
 
-# Function to filter products by price
-def filter_products_by_price(products, min_price, max_price):
-    filtered_products = []
-    for product in products:
-        try:
-            # Extract price from the price string (e.g., "$100.00" -> 100.00)
-            price_str = product.get('price', '')
-            if price_str:
-                # Remove currency symbol and any text, keep only numbers
-                price = float(''.join(filter(lambda x: x.isdigit() or x == '.', price_str)))
-                if min_price <= price <= max_price:
-                    filtered_products.append(product)
-        except (ValueError, TypeError):
-            continue
-    return filtered_products
-
 # Display products content
 if st.session_state.products_data:
     # Filter products by price
     filtered_products = filter_products_by_price(
-        st.session_state.products_data,
+        st.session_state.products_table,
         st.session_state.min_price,
-        st.session_state.max_price
+        st.session_state.max_price,
+        min_rating=min_rating,
+        sources=selected_sources,
+        sort_by=sort_by,
+        currency=currency_label or None
     )
     
     if not filtered_products:
-        st.warning(f"No products found in the price range ${st.session_state.min_price} - ${st.session_state.max_price}")
+        st.warning(f"No products found in the price range {currency_label}{st.session_state.min_price} - {currency_label}{st.session_state.max_price} matching your filters")
     else:
         # Check if translation is needed
         if selected_language != "English" and st.session_state.sutra_api_key:
-            with st.spinner(f"Translating products to {selected_language}..."):
-                translated_products = translate_products(
-                    filtered_products, 
-                    selected_language,
-                    st.session_state.sutra_api_key
-                )
+            translated_products = translate_products(
+                filtered_products, 
+                selected_language,
+                st.session_state.sutra_api_key
+            )
         else:
             # Display English products (or show message if Sutra API key is missing)
             if selected_language != "English" and not st.session_state.sutra_api_key:
@@ -455,27 +622,29 @@ if st.session_state.products_data:
             
             # Format and display the original products with improved layout
             products_container = st.container()
-            for i, product in enumerate(filtered_products):
-                rating_stars = get_stars(float(product.get('rating', 0))) if product.get('rating') else ""
-                st.markdown(f"""
-                    <div class="product-card">
-                        <div style="display: flex; gap: 20px;">
-                            <div style="flex: 3;">
-                                <h3 class="product-title">{i+1}. {product.get('title', 'No Title')}</h3>
-                                <p class="product-info">🏪 <strong>Store:</strong> {product.get('source', 'Unknown')}</p>
-                                <p class="product-price">💰 <strong>Price:</strong> {product.get('price', 'Price not available')}</p>
-                                <p class="product-delivery">🚚 <strong>Delivery:</strong> {product.get('delivery', 'Delivery info not available')}</p>
-                                {f'<p class="product-rating"><span class="stars">{rating_stars}</span> <strong>Rating:</strong> {product["rating"]} ({product.get("ratingCount", 0)} reviews)</p>' if product.get('rating') else ''}
-                                <p><a href="{product.get('link', '#')}" class="product-link" target="_blank">🛒 View Product</a></p>
-                            </div>
-                            <div style="flex: 2;">
-                                <div class="image-container">
-                                    <img src="{product.get('imageUrl')}" alt="Product Image">
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
+            with products_container:
+                for i, product in enumerate(filtered_products):
+                    render_product_card(product, i)
+    
+    if st.session_state.products_request:
+        # Warm the next page (and its translation) while the user browses this one
+        if st.session_state.serper_api_key:
+            prefetch_products_page(
+                page=st.session_state.products_page + 1,
+                target_language=selected_language,
+                sutra_api_key=st.session_state.sutra_api_key,
+                **st.session_state.products_request
+            )
+        
+        # Pagination controls
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button("← Previous", on_click=change_products_page, args=(-1,),
+                      disabled=st.session_state.products_page <= 1, use_container_width=True)
+        with page_col:
+            st.markdown(f"<p style='text-align: center;'>Page {st.session_state.products_page}</p>", unsafe_allow_html=True)
+        with next_col:
+            st.button("Next →", on_click=change_products_page, args=(1,), use_container_width=True)
 else:
     if not st.session_state.serper_api_key:
         st.info("Enter your Serper API key and search for products to get started.")
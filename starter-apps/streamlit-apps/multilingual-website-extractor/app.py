@@ -14,7 +14,18 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 from langchain.callbacks.base import BaseCallbackHandler
 from langdetect import detect
+import sys
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.telemetry import HTTP, llm_callbacks, traced
+from sutra_common.token_budget import session_budget, trim_text
+from sutra_common.translation_memory import (
+    FUZZY_MIN_SIMILARITY, SEGMENT_PROMPT_VERSION, build_segment_prompt, get_translation_memory, parse_json_list
+)
+
+@traced("extractor.scrape", kind=HTTP)
 def scrape_website(url: str, prompt: str) -> str:
     """Scrape website content using BeautifulSoup."""
     try:
@@ -93,6 +104,9 @@ class StreamHandler(BaseCallbackHandler):
 load_dotenv()
 sutra_api_key = os.getenv("SUTRA_API_KEY")
 
+# Page text sent with each question; less once the session nears its token budget
+PAGE_CONTEXT_TOKENS = 16000
+
 @st.cache_resource
 def get_chat_model():
     if not st.session_state.get("sutra_api_key"):
@@ -100,15 +114,35 @@ def get_chat_model():
     
     return ChatOpenAI(
         api_key=st.session_state.sutra_api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
+        callbacks=llm_callbacks()
     )
 
 def translate_text(text: str, target_lang: str = "en") -> str:
     """Translate text to target language using Sutra model."""
     try:
         chat = get_chat_model()
+        config = {"callbacks": [session_budget(st.session_state).callback("extractor.translate")]}
+        
+        # Only lines missing from the shared translation memory are sent to the model.
+        # Entries are keyed by language name so other apps can reuse them.
+        language_name = next((name for name, code in language_codes.items() if code == target_lang), target_lang)
+        
+        def translate_batch(segments):
+            response = chat.invoke([HumanMessage(content=build_segment_prompt(segments, language_name))], config=config)
+            return parse_json_list(response.content)
+        
+        try:
+            # Scraped pages repeat navigation and footer lines with small edits; near matches reuse them
+            return get_translation_memory().translate_segments(
+                text, language_name, SEGMENT_PROMPT_VERSION, translate_batch, min_similarity=FUZZY_MIN_SIMILARITY
+            )
+        except ValueError:
+            # The model did not return one translation per line - fall back to a single call
+            pass
+        
         # Make the translation prompt more specific and strict
         prompt = f"""Translate the following text to {target_lang}. 
         Important: 
@@ -121,7 +155,7 @@ def translate_text(text: str, target_lang: str = "en") -> str:
         7. If the text is already in {target_lang}, return it as is
         
         Text to translate: {text}"""
-        response = chat.invoke([HumanMessage(content=prompt)])
+        response = chat.invoke([HumanMessage(content=prompt)], config=config)
         return response.content.strip()
     except ValueError as ve:
         st.error(str(ve))
@@ -219,6 +253,12 @@ with st.sidebar:
     # Add a divider
     st.markdown("---")
     
+    # Token use of this session
+    with st.expander("🪙 Token usage"):
+        budget = session_budget(st.session_state)
+        st.caption(budget.summary())
+        st.dataframe(budget.report(), use_container_width=True, hide_index=True)
+    
     # Add expandable tips section
     with st.expander("💡 Click here for helpful tips"):
         st.markdown("""
@@ -276,6 +316,10 @@ if prompt := st.chat_input("Ask about the website in any language..."):
                             # Scrape website content
                             content = scrape_website(url, translated_prompt)
                             
+                            # Long pages are cut down to the passages closest to the question
+                            budget = session_budget(st.session_state)
+                            content = trim_text(content, budget.context_tokens(PAGE_CONTEXT_TOKENS), query=translated_prompt)
+                            
                             # Use the chat model to analyze the content based on the prompt
                             chat = get_chat_model()
                             analysis_prompt = f"""Based on the following website content, answer this question: {translated_prompt}
@@ -285,7 +329,10 @@ if prompt := st.chat_input("Ask about the website in any language..."):
                             
                             Please provide a clear and concise answer."""
                             
-                            response = chat.invoke([HumanMessage(content=analysis_prompt)])
+                            response = chat.invoke(
+                                [HumanMessage(content=analysis_prompt)],
+                                config={"callbacks": [budget.callback("extractor.analyze")]}
+                            )
                             all_data.append(response.content)
                             
                         except Exception as e:
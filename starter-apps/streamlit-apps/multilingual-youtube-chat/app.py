@@ -1,4 +1,5 @@
 import os
+import sys
 import streamlit as st
 import yt_dlp
 import requests
@@ -8,6 +9,13 @@ from langchain.callbacks.base import BaseCallbackHandler
 from dotenv import load_dotenv
 import time
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL, assemblyai_url
+from sutra_common.rate_limiter import BACKGROUND, get_rate_limiter
+from sutra_common.telemetry import llm_callbacks
+from sutra_common.token_budget import session_budget, trim_text
+
 # Load environment variables
 load_dotenv()
 
@@ -42,10 +50,13 @@ ydl_opts = {
 }
 
 # AssemblyAI endpoints
-transcript_endpoint = "https://api.assemblyai.com/v2/transcript"
-upload_endpoint = 'https://api.assemblyai.com/v2/upload'
+transcript_endpoint = assemblyai_url("v2/transcript")
+upload_endpoint = assemblyai_url("v2/upload")
 CHUNK_SIZE = 5242880
 
+# Transcript tokens sent with each question; less once the session nears its token budget
+TRANSCRIPT_CONTEXT_TOKENS = 24000
+
 # Streaming callback handler
 class StreamHandler(BaseCallbackHandler):
     def __init__(self, container, initial_text=""):
@@ -62,20 +73,21 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model(api_key):
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
+        callbacks=llm_callbacks()
     )
 
 # Create a streaming version of the model with callback handler
 def get_streaming_chat_model(api_key, callback_handler=None):
     return ChatOpenAI(
         api_key=api_key,
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
         streaming=True,
-        callbacks=[callback_handler] if callback_handler else None
+        callbacks=llm_callbacks(callback_handler)
     )
 
 # Function to transcribe YouTube video
@@ -110,6 +122,8 @@ def transcribe_from_link(link):
         
         # Upload to AssemblyAI
         try:
+            # The upload body is a one-shot generator, so it is paced but not retried
+            get_rate_limiter().acquire("assemblyai")
             upload_response = requests.post(
                 upload_endpoint,
                 headers={'authorization': os.getenv('ASSEMBLYAI_API_KEY')},
@@ -127,15 +141,19 @@ def transcribe_from_link(link):
                 'audio_url': audio_url,
             }
             
-            transcript_response = requests.post(
-                transcript_endpoint,
-                json=transcript_request,
-                headers={
-                    'authorization': os.getenv('ASSEMBLYAI_API_KEY'),
-                    'content-type': 'application/json'
-                }
-            )
-            transcript_response.raise_for_status()
+            def start_transcript():
+                response = requests.post(
+                    transcript_endpoint,
+                    json=transcript_request,
+                    headers={
+                        'authorization': os.getenv('ASSEMBLYAI_API_KEY'),
+                        'content-type': 'application/json'
+                    }
+                )
+                response.raise_for_status()
+                return response
+            
+            transcript_response = get_rate_limiter().call("assemblyai", start_transcript)
             transcript_id = transcript_response.json()['id']
             polling_endpoint = transcript_endpoint + "/" + transcript_id
             
@@ -188,8 +206,13 @@ with st.sidebar:
                     # Poll for transcription completion
                     while True:
                         try:
-                            polling_response = requests.get(polling_endpoint, headers={'authorization': assembly_api_key})
-                            polling_response.raise_for_status()
+                            def poll():
+                                response = requests.get(polling_endpoint, headers={'authorization': assembly_api_key})
+                                response.raise_for_status()
+                                return response
+                            
+                            # Status polls yield to new uploads and transcription requests
+                            polling_response = get_rate_limiter().call("assemblyai", poll, BACKGROUND)
                             status = polling_response.json()['status']
                             
                             # Update status display
@@ -227,6 +250,12 @@ with st.sidebar:
     
     st.divider()
     st.markdown(f"**Current Language:** {selected_language}")
+    
+    # Token use of this session
+    with st.expander("🪙 Token usage"):
+        budget = session_budget(st.session_state)
+        st.caption(budget.summary())
+        st.dataframe(budget.report(), use_container_width=True, hide_index=True)
 
 # Main content
 st.markdown(
@@ -295,13 +324,19 @@ if st.session_state.transcript:
                 # Get streaming model with handler
                 chat = get_streaming_chat_model(sutra_api_key, stream_handler)
                 
+                # Long transcripts are cut down to the passages closest to the question
+                budget = session_budget(st.session_state)
+                transcript = trim_text(
+                    st.session_state.transcript, budget.context_tokens(TRANSCRIPT_CONTEXT_TOKENS), query=user_input
+                )
+                
                 # Create system message with context
                 system_message = f"""You are a helpful assistant that answers questions about YouTube videos. Please respond in {selected_language}.
                 
                 IMPORTANT: Use ONLY the information from the video transcript below to answer questions. If the transcript doesn't contain the information needed to answer a question, say so instead of making assumptions.
                 
                 Video Transcript:
-                {st.session_state.transcript}
+                {transcript}
                 
                 Instructions:
                 1. Base your answers strictly on the video content
@@ -316,7 +351,7 @@ if st.session_state.transcript:
                     HumanMessage(content=user_input)
                 ]
                 
-                response = chat.invoke(messages)
+                response = chat.invoke(messages, config={"callbacks": [budget.callback("youtube.chat")]})
                 answer = response.content
                 
                 # Add assistant response to chat history
@@ -0,0 +1,41 @@
+import os
+
+try:
+    from dotenv import load_dotenv
+    # Apps load their .env after importing this module, so read it here too
+    load_dotenv()
+except ImportError:
+    pass
+
+# Upstream base URLs. Each can be overridden from the environment, e.g. to point every app at
+# the local mock server (python -m sutra_common.mock_server prints the matching exports).
+DEFAULT_SUTRA_BASE_URL = "https://api.two.ai/v2"
+DEFAULT_SERPER_BASE_URL = "https://google.serper.dev"
+DEFAULT_ASSEMBLYAI_BASE_URL = "https://api.assemblyai.com"
+DEFAULT_SERPAPI_BASE_URL = "https://serpapi.com"
+
+SUTRA_BASE_URL = os.getenv("SUTRA_BASE_URL", DEFAULT_SUTRA_BASE_URL).rstrip("/")
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL", DEFAULT_SERPER_BASE_URL).rstrip("/")
+ASSEMBLYAI_BASE_URL = os.getenv("ASSEMBLYAI_BASE_URL", DEFAULT_ASSEMBLYAI_BASE_URL).rstrip("/")
+SERPAPI_BASE_URL = os.getenv("SERPAPI_BASE_URL", DEFAULT_SERPAPI_BASE_URL).rstrip("/")
+
+
+def serper_url(endpoint: str) -> str:
+    """Full URL of a Serper endpoint such as "news" or "images\""""
+    return f"{SERPER_BASE_URL}/{endpoint.lstrip('/')}"
+
+
+def assemblyai_url(path: str) -> str:
+    """Full URL of an AssemblyAI path such as "v2/upload\""""
+    return f"{ASSEMBLYAI_BASE_URL}/{path.lstrip('/')}"
+
+
+def use_serpapi_base_url() -> None:
+    """Send serpapi.GoogleSearch requests to SERPAPI_BASE_URL when it is overridden"""
+    if SERPAPI_BASE_URL == DEFAULT_SERPAPI_BASE_URL:
+        return
+    try:
+        from serpapi import GoogleSearch
+    except ImportError:
+        return
+    GoogleSearch.BACKEND = SERPAPI_BASE_URL
@@ -0,0 +1,119 @@
+import re
+from collections import Counter
+from typing import Dict
+
+# Unicode blocks for the scripts used by the languages the apps support
+SCRIPT_RANGES = [
+    (0x0041, 0x024F, "Latin"),
+    (0x0370, 0x03FF, "Greek"),
+    (0x0400, 0x04FF, "Cyrillic"),
+    (0x0590, 0x05FF, "Hebrew"),
+    (0x0600, 0x06FF, "Arabic"),
+    (0x0900, 0x097F, "Devanagari"),
+    (0x0980, 0x09FF, "Bengali"),
+    (0x0A00, 0x0A7F, "Gurmukhi"),
+    (0x0A80, 0x0AFF, "Gujarati"),
+    (0x0B00, 0x0B7F, "Odia"),
+    (0x0B80, 0x0BFF, "Tamil"),
+    (0x0C00, 0x0C7F, "Telugu"),
+    (0x0C80, 0x0CFF, "Kannada"),
+    (0x0D00, 0x0D7F, "Malayalam"),
+    (0x0E00, 0x0E7F, "Thai"),
+    (0x1100, 0x11FF, "Hangul"),
+    (0x1E00, 0x1EFF, "Latin"),
+    (0x3040, 0x30FF, "Kana"),
+    (0x4E00, 0x9FFF, "Han"),
+    (0xAC00, 0xD7AF, "Hangul"),
+]
+
+# Common function words and search terms for English and the Latin-script languages we support
+STOPWORDS: Dict[str, set] = {
+    "English": set("""
+        a about after all an and any are as at be best buy by can cheap day developer do engineer for
+        free from get guide has have how i in is it job jobs latest men near new news of on online or
+        price remote review reviews sale shoes the this tips to today top update updates vs what when
+        where which who why will with women world writing year
+    """.split()),
+    "Spanish": set("""
+        al como con de del el en empleo es la las los mejor mejores noticias para por precio que se
+        sobre trabajo un una y zapatos
+    """.split()),
+    "French": set("""
+        au aux avec ce chaussures dans de des du emploi en est et la le les meilleur nouvelles actualités
+        offre pas pour prix que qui sur un une
+    """.split()),
+    "German": set("""
+        auf aus das dem den der des die ein eine für im ist mit nachrichten neue neueste preis schuhe
+        stellen und von zu
+    """.split()),
+    "Portuguese": set("""
+        ao com da das de do dos em emprego é melhor na no notícias o os para por preço que sapatos um
+        uma vagas
+    """.split()),
+    "Italian": set("""
+        che con del della di è gli il in la le lavoro migliore notizie per prezzo scarpe un una
+    """.split()),
+    "Dutch": set("""
+        de een en het in is met nieuws op prijs schoenen van vacatures voor
+    """.split()),
+    "Indonesian": set("""
+        berita dan dari di harga ini itu ke lowongan murah pekerjaan sepatu terbaru untuk yang
+    """.split()),
+    "Turkish": set("""
+        bir bu için haber haberler iş ile ve fiyat ayakkabı en son
+    """.split()),
+    "Swahili": set("""
+        habari kazi kwa na ya za wa katika bei viatu
+    """.split()),
+    # Hindi typed in Latin letters, common in Indian search queries
+    "Romanized Hindi": set("""
+        aaj acha achha aur bhi chahiye daam hai hain kahan kaise kal kam ke keemat khabar ki kitna
+        kitne ko kya liye mein mujhe naukri naya nayi purana sabse samachar sasta saste sasti
+        taaza wala wale wali
+    """.split()),
+}
+
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def script_of(char: str) -> str:
+    """Name of the script a single character belongs to"""
+    code = ord(char)
+    for start, end, name in SCRIPT_RANGES:
+        if start <= code <= end:
+            return name
+    return "Other"
+
+
+def detect_script(text: str) -> str:
+    """Dominant script of the letters in text, or 'Unknown' when there are none"""
+    counts = Counter(script_of(char) for char in text if char.isalpha())
+    if not counts:
+        return "Unknown"
+    return counts.most_common(1)[0][0]
+
+
+def language_scores(text: str) -> Dict[str, int]:
+    """Stopword hits per Latin-script language"""
+    words = [word.casefold() for word in _WORD.findall(text)]
+    return {language: sum(word in vocabulary for word in words) for language, vocabulary in STOPWORDS.items()}
+
+
+def is_probably_english(text: str) -> bool:
+    """
+    Fast local check used to skip translating queries that are already English
+
+    Latin-script text needs positive evidence: more English stopword hits than any other
+    language. Text with none, such as romanized Hindi ("sasta mobile phone"), is treated as
+    unknown and left for the model, since a needless translation only costs one cached call.
+    """
+    script = detect_script(text)
+    if script == "Unknown":
+        return True
+    if script != "Latin":
+        return False
+
+    scores = language_scores(text)
+    english = scores.pop("English")
+    other = max(scores.values()) if scores else 0
+    return english > other
@@ -0,0 +1,669 @@
+"""
+Local stand-in for the Sutra, Serper, SerpAPI and AssemblyAI APIs, for offline benchmarking.
+It also answers OpenAI embeddings requests and serves synthetic web pages under /site/.
+
+    python -m sutra_common.mock_server --port 8765 --latency lognormal:0.4,0.5 --token-rate 40
+
+prints the environment variables that point every app at it. Responses are synthetic unless a
+fixture file recorded with --record-to (which proxies to the real APIs once) is loaded with
+--fixtures. Latency, token rate and injected errors are configurable per service.
+"""
+import json
+import time
+import base64
+import struct
+import random
+import hashlib
+import logging
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .endpoints import (
+    DEFAULT_ASSEMBLYAI_BASE_URL,
+    DEFAULT_SERPAPI_BASE_URL,
+    DEFAULT_SERPER_BASE_URL,
+    DEFAULT_SUTRA_BASE_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Path prefix of each service on the mock server, and the real base URL used when recording
+SERVICES = {
+    "sutra": ("/v2", DEFAULT_SUTRA_BASE_URL),
+    "serper": ("/serper", DEFAULT_SERPER_BASE_URL),
+    "assemblyai": ("/assemblyai", DEFAULT_ASSEMBLYAI_BASE_URL),
+    "serpapi": ("/serpapi", DEFAULT_SERPAPI_BASE_URL),
+    "openai": ("/openai/v1", "https://api.openai.com/v1"),
+}
+ENV_VARS = {
+    "sutra": "SUTRA_BASE_URL",
+    "serper": "SERPER_BASE_URL",
+    "assemblyai": "ASSEMBLYAI_BASE_URL",
+    "serpapi": "SERPAPI_BASE_URL",
+    # Read by the OpenAI SDK itself, so embedding clients need no code change
+    "openai": "OPENAI_BASE_URL",
+}
+EMBEDDING_DIM = 256
+
+# Request fields that do not change the answer and are left out of fixture keys
+_VOLATILE_FIELDS = {"stream", "stream_options", "n", "user", "api_key", "source", "output"}
+
+_WORDS = (
+    "sutra model answer local mock response token stream language multilingual data result "
+    "summary detail context example topic market science health travel culture policy update"
+).split()
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Delay distribution: fixed:S, uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA (seconds)"""
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, args = spec.partition(":")
+        values = [float(v) for v in args.split(",") if v.strip()] if args else []
+        if kind not in ("fixed", "uniform", "normal", "lognormal") or not values:
+            raise ValueError(f"Bad latency spec {spec!r}")
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.a, self.b))
+        if self.kind == "lognormal":
+            return self.a * rng.lognormvariate(0.0, self.b) if self.a > 0 else 0.0
+        return self.a
+
+
+@dataclass
+class MockConfig:
+    latency: Dict[str, Latency] = field(default_factory=dict)
+    # Streamed completion tokens per second
+    token_rate: float = 50.0
+    # Completion length when the prompt does not say otherwise
+    completion_tokens: int = 120
+    error_rate: Dict[str, float] = field(default_factory=dict)
+    error_status: int = 429
+    retry_after: float = 1.0
+    # Seconds before a mock AssemblyAI transcript completes
+    transcript_seconds: float = 3.0
+    fixtures_path: Optional[str] = None
+    record_to: Optional[str] = None
+    seed: Optional[int] = None
+
+    def latency_for(self, service: str) -> Latency:
+        return self.latency.get(service) or self.latency.get("*") or Latency()
+
+    def error_rate_for(self, service: str) -> float:
+        return self.error_rate.get(service, self.error_rate.get("*", 0.0))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for synthetic usage fields"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def fixture_key(service: str, method: str, path: str, body: Any) -> str:
+    """Stable key of a request, ignoring fields such as stream and API keys"""
+    if isinstance(body, dict):
+        body = {k: v for k, v in body.items() if k not in _VOLATILE_FIELDS}
+    payload = json.dumps([service, method, path, body], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Recorded responses keyed by fixture_key, stored as one JSON list"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for entry in json.load(f):
+                        self._entries[entry["key"]] = entry
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def add(self, key: str, service: str, method: str, path: str, status: int, response: Any) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "key": key, "service": service, "method": method, "path": path,
+                "status": status, "response": response,
+            }
+            if self.path:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(list(self._entries.values()), f, ensure_ascii=False, indent=1)
+
+    def merge(self, other: "FixtureStore") -> None:
+        with other._lock:
+            entries = list(other._entries.values())
+        for entry in entries:
+            self.add(entry["key"], entry["service"], entry["method"], entry["path"], entry["status"], entry["response"])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class MockStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[str, int] = {}
+            self.errors: Dict[str, int] = {}
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def record(self, endpoint: str, error: bool = False, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            if error:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "total_requests": sum(self.requests.values()),
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def _echo_json(prompt: str) -> Optional[str]:
+    """The last JSON object or array in the prompt, so translate-this-JSON prompts get parseable output"""
+    for opener, closer in (("{", "}"), ("[", "]")):
+        end = prompt.rfind(closer)
+        start = prompt.rfind(opener, 0, end)
+        while start != -1 and end != -1:
+            try:
+                return json.dumps(json.loads(prompt[start:end + 1]), ensure_ascii=False)
+            except ValueError:
+                start = prompt.rfind(opener, 0, start)
+    return None
+
+
+def synthetic_completion(messages: List[Dict[str, Any]], max_tokens: Optional[int], config: MockConfig, rng: random.Random) -> str:
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    echoed = _echo_json(prompt)
+    if echoed is not None:
+        return echoed
+    n = min(config.completion_tokens, max_tokens or config.completion_tokens)
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _seeded(query: str) -> random.Random:
+    return random.Random(int(hashlib.md5(query.encode("utf-8")).hexdigest()[:8], 16))
+
+
+def serper_results(endpoint: str, body: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    query = str(body.get("q", ""))
+    num = int(body.get("num", 10) or 10)
+    page = int(body.get("page", 1) or 1)
+    rng = _seeded(f"{endpoint}|{query}|{page}")
+    items = []
+    for i in range(num):
+        n = (page - 1) * num + i + 1
+        image = f"{base_url}/static/{endpoint}/{n}.jpg"
+        if endpoint == "images":
+            items.append({"title": f"{query} image {n}", "imageUrl": image, "link": image})
+        elif endpoint == "shopping":
+            items.append({
+                "title": f"{query} product {n}",
+                "source": rng.choice(["Shop One", "Market Two", "Store Three"]),
+                "link": f"https://example.com/product/{n}",
+                "price": f"${rng.uniform(5, 500):.2f}",
+                "rating": round(rng.uniform(2.5, 5.0), 1),
+                "ratingCount": rng.randint(1, 5000),
+                "delivery": rng.choice(["Free delivery", "Delivery by tomorrow", ""]),
+                "imageUrl": image,
+            })
+        else:
+            items.append({
+                "title": f"{query} headline {n}",
+                "link": f"https://example.com/news/{n}",
+                "snippet": " ".join(rng.choice(_WORDS) for _ in range(30)),
+                "date": f"{rng.randint(1, 23)} hours ago",
+                "source": rng.choice(["Daily Mock", "Local Times", "Wire Service"]),
+                "imageUrl": image,
+            })
+    key = {"news": "news", "images": "images", "shopping": "shopping"}.get(endpoint, "organic")
+    return {"searchParameters": {"q": query, "num": num, "page": page, "type": endpoint}, key: items}
+
+
+def serpapi_results(params: Dict[str, str], base_url: str) -> Dict[str, Any]:
+    engine = params.get("engine", "google")
+    query = params.get("q", "")
+    rng = _seeded(f"{engine}|{query}")
+    if engine == "google_jobs":
+        return {"jobs_results": [
+            {
+                "title": f"{query} role {n}",
+                "company_name": rng.choice(["Acme", "Globex", "Initech", "Umbrella"]),
+                "location": params.get("location", "Remote"),
+                "via": "via Mock Jobs",
+                "description": " ".join(rng.choice(_WORDS) for _ in range(40)),
+                "detected_extensions": {"posted_at": f"{n} days ago", "schedule_type": "Full-time"},
+                "job_id": f"job-{n}",
+            }
+            for n in range(1, 11)
+        ]}
+    if engine == "google_images":
+        return {"images_results": [{"original": f"{base_url}/static/images/{query}-{n}.jpg"} for n in range(1, 4)]}
+    if engine == "google_flights":
+        return {"best_flights": [
+            {"price": rng.randint(80, 900), "total_duration": rng.randint(60, 900),
+             "flights": [{"airline": "Mock Air", "departure_airport": {"id": params.get("departure_id", "")},
+                          "arrival_airport": {"id": params.get("arrival_id", "")}}]}
+            for _ in range(3)
+        ]}
+    return {"organic_results": [{"title": f"{query} result {n}", "link": f"https://example.com/{n}"} for n in range(1, 6)]}
+
+
+def embedding(item: Any) -> List[float]:
+    """Deterministic unit vector for a text or token list"""
+    rng = _seeded(json.dumps(item, ensure_ascii=False))
+    vector = [rng.gauss(0.0, 1.0) for _ in range(EMBEDDING_DIM)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+def site_page(slug: str, paragraphs: int) -> str:
+    """Article-like HTML page with navigation, scripts and styles for scrapers to strip"""
+    rng = _seeded(slug)
+    body = "\n".join(
+        f"<p>{' '.join(rng.choice(_WORDS) for _ in range(60)).capitalize()}.</p>" for _ in range(paragraphs)
+    )
+    return (
+        f"<html><head><title>{slug}</title><style>body {{ font-family: sans-serif; }}</style>"
+        f"<script>var tracking = {{id: '{slug}'}};</script></head><body>"
+        "<nav><a href='/'>Home</a> <a href='/about'>About</a></nav>"
+        f"<article><h1>{slug.replace('-', ' ').title()}</h1>\n{body}</article>"
+        "<footer>Mock site</footer></body></html>"
+    )
+
+
+class MockServer:
+    """
+    Threaded HTTP server speaking enough of each upstream API for the starter apps
+
+    Use it as a context manager in benchmarks; env() returns the base URL overrides for apps.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[MockConfig] = None):
+        self.config = config or MockConfig()
+        self.fixtures = FixtureStore(self.config.record_to or self.config.fixtures_path)
+        if self.config.record_to and self.config.fixtures_path not in (None, self.config.record_to):
+            self.fixtures.merge(FixtureStore(self.config.fixtures_path))
+        self.stats = MockStats()
+        self.rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._transcripts: Dict[str, float] = {}
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        return {ENV_VARS[service]: self.url + prefix for service, (prefix, _) in SERVICES.items()}
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def random(self) -> random.Random:
+        # A per-request generator drawn under a lock keeps runs with --seed reproducible enough
+        with self._rng_lock:
+            return random.Random(self.rng.random())
+
+
+def _make_handler(server: MockServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+        # --- plumbing ---
+
+        def _body(self) -> bytes:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                return self.rfile.read(length)
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                data = b""
+                while True:
+                    size = int(self.rfile.readline().strip() or b"0", 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return data
+                    data += self.rfile.read(size)
+                    self.rfile.readline()
+            return b""
+
+        def _json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self) -> Tuple[Optional[str], str]:
+            path = urllib.parse.urlsplit(self.path).path
+            for service, (prefix, _) in SERVICES.items():
+                if path == prefix or path.startswith(prefix + "/"):
+                    return service, path[len(prefix):] or "/"
+            return None, path
+
+        def _delay_or_fail(self, service: str, endpoint: str, rng: random.Random) -> bool:
+            """Sleep the sampled latency; True when an injected error was sent instead"""
+            time.sleep(server.config.latency_for(service).sample(rng))
+            if rng.random() < server.config.error_rate_for(service):
+                server.stats.record(endpoint, error=True)
+                status = server.config.error_status
+                headers = {"Retry-After": f"{server.config.retry_after:g}"} if status == 429 else {}
+                self._json(status, {"error": {"message": f"Injected {status}", "type": "mock_error"}}, headers)
+                return True
+            return False
+
+        def _upstream(self, service: str, method: str, path: str, body: Optional[bytes]) -> Tuple[int, Any]:
+            """Forward to the real API (used only while recording)"""
+            url = SERVICES[service][1] + path
+            query = urllib.parse.urlsplit(self.path).query
+            if query:
+                url += "?" + query
+            headers = {
+                name: value for name, value in self.headers.items()
+                if name.lower() in ("authorization", "x-api-key", "content-type")
+            }
+            request = urllib.request.Request(url, data=body, headers=headers, method=method)
+            try:
+                with urllib.request.urlopen(request, timeout=120) as response:
+                    return response.status, json.loads(response.read() or b"null")
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read() or b"null")
+
+        def _fixture(self, service: str, method: str, path: str, key_body: Any, raw: Optional[bytes]) -> Optional[Tuple[int, Any]]:
+            key = fixture_key(service, method, path, key_body)
+            entry = server.fixtures.get(key)
+            if entry is not None:
+                return entry["status"], entry["response"]
+            if server.config.record_to:
+                status, payload = self._upstream(service, method, path, raw)
+                if status < 400:
+                    server.fixtures.add(key, service, method, path, status, payload)
+                return status, payload
+            return None
+
+        # --- verbs ---
+
+        def do_GET(self):
+            service, path = self._route()
+            rng = server.random()
+            if self.path.startswith("/_mock/stats"):
+                return self._json(200, server.stats.snapshot())
+            if service == "assemblyai" and path.startswith("/v2/transcript/"):
+                return self._transcript_status(path.rsplit("/", 1)[-1], rng)
+            if service == "serpapi" and path.startswith("/search"):
+                params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+                if self._delay_or_fail(service, "serpapi/search", rng):
+                    return
+                recorded = self._fixture(service, "GET", "/search", params, None)
+                server.stats.record("serpapi/search")
+                if recorded is not None:
+                    return self._json(*recorded)
+                return self._json(200, serpapi_results(params, server.url))
+            if path.startswith("/site/"):
+                params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+                server.stats.record("site")
+                data = site_page(path[len("/site/"):] or "index", int(params.get("paragraphs", 40))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                return self.wfile.write(data)
+            if path.startswith("/static/"):
+                # Placeholder images for imageUrl fields
+                data = b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+                self.send_response(200)
+                self.send_header("Content-Type", "image/gif")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                return self.wfile.write(data)
+            self._json(404, {"error": f"No mock for GET {self.path}"})
+
+        def do_POST(self):
+            service, path = self._route()
+            raw = self._body()
+            rng = server.random()
+            if self.path.startswith("/_mock/reset"):
+                server.stats.reset()
+                return self._json(200, {"ok": True})
+            if service == "assemblyai" and path == "/v2/upload":
+                if self._delay_or_fail(service, "assemblyai/upload", rng):
+                    return
+                server.stats.record("assemblyai/upload")
+                upload_id = hashlib.sha256(raw).hexdigest()[:16]
+                return self._json(200, {"upload_url": f"{server.url}/assemblyai/files/{upload_id}"})
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                return self._json(400, {"error": "Request body is not JSON"})
+            if service == "openai" and path == "/embeddings":
+                return self._embeddings(body, rng)
+            if service == "sutra" and path == "/chat/completions":
+                return self._chat(body, raw, rng)
+            if service == "serper":
+                endpoint = path.strip("/") or "search"
+                if self._delay_or_fail(service, f"serper/{endpoint}", rng):
+                    return
+                recorded = self._fixture(service, "POST", path, body, raw)
+                server.stats.record(f"serper/{endpoint}")
+                if recorded is not None:
+                    return self._json(*recorded)
+                return self._json(200, serper_results(endpoint, body, server.url))
+            if service == "assemblyai" and path == "/v2/transcript":
+                if self._delay_or_fail(service, "assemblyai/transcript", rng):
+                    return
+                server.stats.record("assemblyai/transcript")
+                transcript_id = hashlib.sha256(f"{body.get('audio_url')}|{time.time()}".encode()).hexdigest()[:16]
+                server._transcripts[transcript_id] = time.monotonic() + server.config.transcript_seconds
+                return self._json(200, {"id": transcript_id, "status": "queued", "audio_url": body.get("audio_url")})
+            self._json(404, {"error": f"No mock for POST {self.path}"})
+
+        def _transcript_status(self, transcript_id: str, rng: random.Random) -> None:
+            if self._delay_or_fail("assemblyai", "assemblyai/poll", rng):
+                return
+            server.stats.record("assemblyai/poll")
+            ready_at = server._transcripts.get(transcript_id)
+            if ready_at is None:
+                return self._json(404, {"error": "Transcript not found"})
+            if time.monotonic() < ready_at:
+                return self._json(200, {"id": transcript_id, "status": "processing"})
+            text = " ".join(_seeded(transcript_id).choice(_WORDS) for _ in range(400))
+            self._json(200, {"id": transcript_id, "status": "completed", "text": text.capitalize() + "."})
+
+        def _embeddings(self, body: Dict[str, Any], rng: random.Random) -> None:
+            if self._delay_or_fail("openai", "openai/embeddings", rng):
+                return
+            inputs = body.get("input", [])
+            # A single string or a single token list is one input
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            prompt_tokens = sum(len(item) if isinstance(item, list) else estimate_tokens(item) for item in inputs)
+            server.stats.record("openai/embeddings", prompt_tokens=prompt_tokens)
+            data = []
+            for i, item in enumerate(inputs):
+                vector = embedding(item)
+                if body.get("encoding_format") == "base64":
+                    vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+                data.append({"object": "embedding", "index": i, "embedding": vector})
+            self._json(200, {
+                "object": "list", "data": data, "model": body.get("model", "text-embedding-ada-002"),
+                "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+            })
+
+        def _chat(self, body: Dict[str, Any], raw: bytes, rng: random.Random) -> None:
+            if self._delay_or_fail("sutra", "sutra/chat", rng):
+                return
+            messages = body.get("messages", [])
+            prompt_tokens = estimate_tokens("".join(str(m.get("content", "")) for m in messages))
+            recorded = self._fixture("sutra", "POST", "/chat/completions", body, json.dumps({**body, "stream": False}).encode())
+            if recorded is not None and recorded[0] >= 400:
+                server.stats.record("sutra/chat", error=True)
+                return self._json(*recorded)
+            if recorded is not None:
+                content = recorded[1]["choices"][0]["message"]["content"] or ""
+            else:
+                content = synthetic_completion(messages, body.get("max_tokens"), server.config, rng)
+            completion_tokens = estimate_tokens(content)
+            server.stats.record("sutra/chat", prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+            completion_id = f"chatcmpl-mock-{rng.getrandbits(48):x}"
+            model = body.get("model", "sutra-v2")
+            if not body.get("stream"):
+                return self._json(200, {
+                    "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+            self._stream(completion_id, model, content, usage, bool((body.get("stream_options") or {}).get("include_usage")))
+
+        def _stream(self, completion_id: str, model: str, content: str, usage: Dict[str, int], include_usage: bool) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def event(delta: Dict[str, Any], finish_reason: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> None:
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                }
+                chunk.update(extra or {})
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            # Four-character pieces approximate tokens; the rate paces them in real time
+            pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+            interval = 1.0 / server.config.token_rate if server.config.token_rate > 0 else 0.0
+            event({"role": "assistant", "content": ""})
+            started = time.monotonic()
+            for n, piece in enumerate(pieces):
+                pause = started + n * interval - time.monotonic()
+                if pause > 0:
+                    time.sleep(pause)
+                event({"content": piece})
+            event({}, "stop")
+            if include_usage:
+                event(None, extra={"usage": usage})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def _per_service(values: List[str], parse) -> Dict[str, Any]:
+    """Parse "SPEC" (all services) or "service=SPEC" options"""
+    parsed = {}
+    for value in values:
+        service, sep, spec = value.partition("=")
+        if not sep:
+            service, spec = "*", value
+        parsed[service] = parse(spec)
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Sutra, Serper, SerpAPI and AssemblyAI APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", action="append", default=[], metavar="[SERVICE=]SPEC",
+                        help="Time to first byte, e.g. fixed:0.2, uniform:0.1,0.5 or sutra=lognormal:0.6,0.4")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Streamed tokens per second (0 = unthrottled)")
+    parser.add_argument("--completion-tokens", type=int, default=120, help="Length of synthetic completions")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[SERVICE=]RATE",
+                        help="Fraction of requests answered with --error-status, e.g. 0.05 or serper=0.2")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--transcript-seconds", type=float, default=3.0, help="Time until a mock transcript completes")
+    parser.add_argument("--fixtures", help="JSON fixture file to replay")
+    parser.add_argument("--record-to", help="Proxy unknown requests to the real APIs and save them to this fixture file")
+    parser.add_argument("--seed", type=int, help="Seed for latency, errors and synthetic text")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = MockConfig(
+        latency=_per_service(args.latency, Latency.parse),
+        token_rate=args.token_rate,
+        completion_tokens=args.completion_tokens,
+        error_rate=_per_service(args.error_rate, float),
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        transcript_seconds=args.transcript_seconds,
+        fixtures_path=args.fixtures,
+        record_to=args.record_to,
+        seed=args.seed,
+    )
+    server = MockServer(args.host, args.port, config)
+    print(f"Mock server on {server.url} ({len(server.fixtures)} fixtures loaded)")
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    print(f"Stats: {server.url}/_mock/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
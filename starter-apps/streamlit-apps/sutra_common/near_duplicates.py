@@ -0,0 +1,28 @@
+import unicodedata
+from typing import Set
+
+# Token-set overlap above which two questions count as the same question
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# Unicode categories treated as word breaks: punctuation, symbols, separators and controls.
+# Marks (M*) are kept, since Indic vowel signs and viramas are part of the word
+_BREAK_CATEGORIES = frozenset("PSZC")
+
+
+def fingerprint(text: str) -> str:
+    """Text with case, punctuation and spacing removed"""
+    text = unicodedata.normalize("NFC", text.casefold())
+    kept = "".join(" " if unicodedata.category(char)[0] in _BREAK_CATEGORIES else char for char in text)
+    return " ".join(kept.split())
+
+
+def token_set(text: str) -> Set[str]:
+    """Words of the fingerprint, for is_near_duplicate()"""
+    return set(fingerprint(text).split())
+
+
+def is_near_duplicate(tokens: Set[str], other: Set[str], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> bool:
+    """True when the Jaccard overlap of two token sets reaches threshold; two empty sets match"""
+    if not tokens or not other:
+        return tokens == other
+    return len(tokens & other) / len(tokens | other) >= threshold
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from .telemetry import propagate
+
+# Enough to hide per-item latency without tripping provider rate limits
+DEFAULT_WORKERS = 6
+
+
+def translate_as_completed(
+    items: List[Any],
+    translate: Callable[[Any], Any],
+    max_workers: int = DEFAULT_WORKERS
+) -> Iterator[Tuple[int, Any, Optional[Exception]]]:
+    """
+    Translate items concurrently, yielding (index, translated, error) as each one finishes
+
+    translate() runs on worker threads and must not touch the Streamlit UI; the caller
+    consumes this generator on the script thread and updates its placeholders there.
+    On failure translated is the original item and error is the exception.
+    """
+    if not items:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="translate") as executor:
+        # Per-item spans on the worker threads stay children of the caller's span
+        translate = propagate(translate)
+        futures = {executor.submit(translate, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                yield i, future.result(), None
+            except Exception as e:
+                yield i, items[i], e
@@ -0,0 +1,34 @@
+from typing import Callable, Tuple
+
+from .language_detection import is_probably_english
+from .translation_memory import get_translation_memory, normalize_segment
+
+
+def translate_query_cached(
+    query: str,
+    prompt_version: str,
+    translate: Callable[[str], str]
+) -> Tuple[str, str]:
+    """
+    Translate a search query to English, skipping the model whenever possible
+
+    Returns (english_query, source) where source is "english" when the query was
+    already English, "cache" when it came from the persistent query cache and
+    "model" when translate() had to be called.
+    """
+    query = normalize_segment(query)
+    if not query or is_probably_english(query):
+        return query, "english"
+
+    # Queries are cached case-insensitively; the target language is always English
+    translation_memory = get_translation_memory()
+    key = query.casefold()
+    cached = translation_memory.lookup(key, "English", prompt_version)
+    if cached is not None:
+        return cached, "cache"
+
+    translated = translate(query).strip()
+    if translated:
+        translation_memory.store(key, translated, "English", prompt_version)
+        return translated, "model"
+    return query, "model"
@@ -0,0 +1,275 @@
+import os
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .telemetry import HTTP, span
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, highest first
+INTERACTIVE = 0
+BACKGROUND = 1
+PREFETCH = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", PREFETCH: "prefetch"}
+
+# Share of a bucket that each class must leave untouched, so interactive requests
+# always find burst headroom while background work uses the rest
+RESERVE = {INTERACTIVE: 0.0, BACKGROUND: 0.25, PREFETCH: 0.5}
+
+# (requests per minute, burst) per upstream endpoint
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    "sutra": (120, 20),
+    "serper": (300, 20),
+    "serpapi": (60, 5),
+    "assemblyai": (120, 10),
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+_TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectionError", "Timeout", "ReadTimeout"}
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+# Waiting requests re-check the bucket at least this often
+MAX_SLEEP = 0.5
+
+
+class Clock:
+    """Monotonic wall clock used by the limiter"""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class FakeClock(Clock):
+    """Manual clock for tests: sleep() advances time instantly and records each delay"""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._lock = threading.Lock()
+        self.sleeps: List[float] = []
+
+    def now(self) -> float:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.sleeps.append(seconds)
+            self._now += max(0.0, seconds)
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._now += seconds
+
+
+class TokenBucket:
+    def __init__(self, requests_per_minute: float, burst: int, now: float):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = now
+        self.blocked_until = 0.0
+        self.waiting = {priority: 0 for priority in PRIORITY_NAMES}
+
+    def delay(self, priority: int, now: float) -> float:
+        """Seconds until a request of this priority may take a token; 0 when it may go now"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if any(self.waiting[p] for p in PRIORITY_NAMES if p < priority):
+            return 1.0 / self.rate
+        needed = min(self.capacity, 1.0 + RESERVE[priority] * self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+@dataclass
+class LimiterStats:
+    endpoint: str
+    priority: str
+    requests: int = 0
+    waited_seconds: float = 0.0
+    max_wait: float = 0.0
+    throttled: int = 0
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an openai, requests or httpx error, if any"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error: BaseException, now: Optional[float] = None) -> Optional[float]:
+    """Seconds from the Retry-After header of a failed response, given as seconds or an HTTP date"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (now if now is not None else time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    status = status_code(error)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(error, OSError) or type(error).__name__ in _TRANSIENT_ERRORS
+
+
+class RateLimiter:
+    """
+    Per-endpoint token buckets with priority classes, shared by every thread in the process
+
+    A request takes one token from its endpoint's bucket. Lower priorities leave a reserve
+    in the bucket and yield to higher-priority waiters, so interactive calls keep their
+    latency while background translation and prefetch fill the spare capacity. A 429 pauses
+    the whole endpoint for its Retry-After, since every caller shares the same quota.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None, clock: Optional[Clock] = None):
+        self._clock = clock or Clock()
+        self._lock = threading.Lock()
+        self._limits = dict(DEFAULT_LIMITS)
+        self._limits.update(limits or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[Tuple[str, int], LimiterStats] = {}
+
+    def configure(self, endpoint: str, requests_per_minute: float, burst: int) -> None:
+        """Set or replace the limit for an endpoint; its bucket starts full"""
+        with self._lock:
+            self._limits[endpoint] = (requests_per_minute, burst)
+            self._buckets.pop(endpoint, None)
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            rpm, burst = self._limits.get(endpoint, (60, 5))
+            bucket = self._buckets[endpoint] = TokenBucket(rpm, burst, self._clock.now())
+        return bucket
+
+    def _stat(self, endpoint: str, priority: int) -> LimiterStats:
+        key = (endpoint, priority)
+        if key not in self._stats:
+            self._stats[key] = LimiterStats(endpoint, PRIORITY_NAMES[priority])
+        return self._stats[key]
+
+    def acquire(self, endpoint: str, priority: int = INTERACTIVE) -> float:
+        """Block until a request to endpoint may start; returns the seconds spent waiting"""
+        waited = 0.0
+        registered = False
+        try:
+            while True:
+                with self._lock:
+                    bucket = self._bucket(endpoint)
+                    delay = bucket.delay(priority, self._clock.now())
+                    if delay <= 0:
+                        bucket.tokens -= 1
+                        stat = self._stat(endpoint, priority)
+                        stat.requests += 1
+                        stat.waited_seconds += waited
+                        stat.max_wait = max(stat.max_wait, waited)
+                        return waited
+                    if not registered:
+                        bucket.waiting[priority] += 1
+                        registered = True
+                pause = min(delay, MAX_SLEEP)
+                self._clock.sleep(pause)
+                waited += pause
+        finally:
+            if registered:
+                with self._lock:
+                    self._bucket(endpoint).waiting[priority] -= 1
+
+    def backoff(self, endpoint: str, seconds: float, priority: int = INTERACTIVE) -> None:
+        """Pause every request to endpoint for seconds, e.g. after a 429"""
+        with self._lock:
+            bucket = self._bucket(endpoint)
+            bucket.blocked_until = max(bucket.blocked_until, self._clock.now() + seconds)
+            bucket.tokens = 0.0
+            self._stat(endpoint, priority).throttled += 1
+
+    def call(self, endpoint: str, fn: Callable[[], Any], priority: int = INTERACTIVE, max_retries: int = 3) -> Any:
+        """
+        Run fn() once a token is available, retrying throttled and transient failures
+
+        The wait before a retry is the response's Retry-After when present, otherwise
+        exponential backoff with jitter. Other errors are raised straight away.
+        """
+        with span(f"upstream.{endpoint}", HTTP, endpoint=endpoint, priority=PRIORITY_NAMES[priority]) as call_span:
+            waited = 0.0
+            for attempt in range(max_retries + 1):
+                waited += self.acquire(endpoint, priority)
+                call_span.set_attributes(attempts=attempt + 1, limiter_wait_s=round(waited, 3))
+                try:
+                    return fn()
+                except Exception as e:
+                    if attempt == max_retries or not is_retryable(e):
+                        raise
+                    delay = retry_after(e)
+                    if delay is None:
+                        delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt) * random.uniform(0.5, 1.0)
+                    delay = min(delay, MAX_BACKOFF * 4)
+                    logger.warning(f"{endpoint} call failed ({str(e)}); retrying in {delay:.1f}s")
+                    call_span.add_event("retry", status=status_code(e), delay_s=round(delay, 3))
+                    if status_code(e) == 429:
+                        self.backoff(endpoint, delay, priority)
+                    else:
+                        self._clock.sleep(delay)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Requests, waits and 429s per endpoint and priority class"""
+        with self._lock:
+            return [
+                {
+                    "endpoint": s.endpoint,
+                    "priority": s.priority,
+                    "requests": s.requests,
+                    "avg_wait_s": round(s.waited_seconds / s.requests, 3) if s.requests else 0.0,
+                    "max_wait_s": round(s.max_wait, 3),
+                    "throttled": s.throttled,
+                }
+                for s in sorted(self._stats.values(), key=lambda s: (s.endpoint, s.priority))
+            ]
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    """Limits from "sutra=120/20,serper=300" (requests per minute, optional burst)"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        try:
+            endpoint, value = part.split("=", 1)
+            rpm, _, burst = value.partition("/")
+            limits[endpoint.strip()] = (float(rpm), int(burst) if burst else max(1, int(float(rpm) / 6)))
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit {part!r}")
+    return limits
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter; SUTRA_RATE_LIMITS overrides the default limits"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(parse_limits(os.getenv("SUTRA_RATE_LIMITS", "")))
+        return _limiter
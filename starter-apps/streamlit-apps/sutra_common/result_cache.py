@@ -0,0 +1,142 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Short-TTL cache for upstream search results
+
+    Identical concurrent requests are collapsed into one upstream call (single-flight),
+    and prefetch() loads entries in the background before anyone asks for them.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        maxsize: int = 512,
+        prefetch_workers: int = 4,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="prefetch")
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint: str, query: str, params: Optional[Dict[str, Any]] = None, page: int = 1) -> str:
+        """Cache key for (endpoint, query, params, page)"""
+        return json.dumps(
+            {"endpoint": endpoint, "query": query.strip().casefold(), "params": params or {}, "page": page},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+
+    def _fresh(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < self._clock():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None when missing or expired"""
+        with self._lock:
+            found, value = self._fresh(key)
+            return value if found else None
+
+    def contains(self, key: str) -> bool:
+        """True when key is cached or currently being loaded"""
+        with self._lock:
+            return self._fresh(key)[0] or key in self._inflight
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        should_cache: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Return the cached value, joining an in-flight load or running loader exactly once
+
+        A result rejected by should_cache, such as an API error payload, is returned to the
+        callers of this load but not kept.
+        """
+        with self._lock:
+            found, value = self._fresh(key)
+            if found:
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.hits += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            if should_cache is None or should_cache(value):
+                self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def prefetch(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        on_loaded: Optional[Callable[[Any], None]] = None
+    ) -> Optional[Future]:
+        """Load key in the background unless it is already cached or loading"""
+        if self.contains(key):
+            return None
+
+        def run():
+            value = self.get_or_load(key, loader)
+            if on_loaded is not None:
+                on_loaded(value)
+            return value
+
+        future = self._executor.submit(run)
+        future.add_done_callback(_log_prefetch_error)
+        return future
+
+
+def _log_prefetch_error(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Prefetch failed: {str(error)}")
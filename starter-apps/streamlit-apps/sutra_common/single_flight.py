@@ -0,0 +1,164 @@
+import json
+import hashlib
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .telemetry import current_span, propagate
+
+logger = logging.getLogger(__name__)
+
+
+def _secret(value: Any) -> str:
+    if value is None:
+        return ""
+    return value.get_secret_value() if hasattr(value, "get_secret_value") else str(value)
+
+
+def _message(message: Any) -> Any:
+    if hasattr(message, "content"):
+        return [getattr(message, "type", type(message).__name__), message.content]
+    return message
+
+
+def request_key(model: Any, messages: Sequence[Any]) -> str:
+    """Identity of a chat request: model settings, a hash of the API key, and the messages"""
+    settings = {
+        "model": getattr(model, "model_name", None),
+        "temperature": getattr(model, "temperature", None),
+        "max_tokens": getattr(model, "max_tokens", None),
+        "base_url": getattr(model, "openai_api_base", None),
+        # Requests made with different keys are never shared
+        "key": hashlib.sha256(_secret(getattr(model, "openai_api_key", None)).encode()).hexdigest(),
+    }
+    payload = json.dumps([settings, [_message(m) for m in messages]], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Collapses identical in-flight chat requests into one upstream streaming call
+
+    The upstream call runs on its own thread and buffers tokens. Every caller, the first one
+    included, replays the buffer and then follows new tokens on its own thread, so each
+    StreamHandler only ever touches its own session's placeholders. Finished requests are
+    not cached; a request that arrives after the call completes starts a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    def invoke(
+        self,
+        model: Any,
+        messages: Sequence[Any],
+        handler: Any = None,
+        timeout: Optional[float] = None,
+        limit: Optional[Callable[[Callable[[], Any]], Any]] = None,
+    ) -> Any:
+        """
+        Response message for messages, sharing the upstream call with identical concurrent requests
+
+        handler.on_llm_new_token(token) is called for every streamed token, as with a
+        streaming=True model. model only needs a LangChain-style stream(messages).
+        limit(fn), e.g. a rate limiter's call(), wraps opening the upstream stream; it runs
+        only for the request that starts the call, so coalesced followers use no tokens.
+        """
+        key = request_key(model, messages)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.upstream_calls += 1
+                threading.Thread(
+                    # The upstream call's LLM span joins the leader's trace
+                    target=propagate(self._run), args=(key, flight, model, list(messages), limit), name="single-flight", daemon=True
+                ).start()
+            else:
+                self.coalesced += 1
+                current = current_span()
+                if current is not None:
+                    current.set_attribute("single_flight.coalesced", True)
+        return self._follow(flight, handler, timeout)
+
+    def _run(self, key: str, flight: _Flight, model: Any, messages: List[Any], limit: Optional[Callable]) -> None:
+        def open_stream():
+            # Rate limit and connection errors surface on the first chunk; retrying up to
+            # there cannot replay tokens that followers have already seen
+            stream = iter(model.stream(messages))
+            return next(stream, None), stream
+
+        try:
+            first, stream = limit(open_stream) if limit is not None else open_stream()
+            result = None
+            for chunk in itertools.chain([first] if first is not None else [], stream):
+                result = chunk if result is None else result + chunk
+                if chunk.content:
+                    with flight.cond:
+                        flight.tokens.append(chunk.content)
+                        flight.cond.notify_all()
+            flight.result = result
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
+
+    def _follow(self, flight: _Flight, handler: Any, timeout: Optional[float]) -> Any:
+        sent = 0
+        while True:
+            with flight.cond:
+                while len(flight.tokens) == sent and not flight.done:
+                    if not flight.cond.wait(timeout):
+                        raise TimeoutError("No tokens received from the shared request in time")
+                pending = flight.tokens[sent:]
+                sent += len(pending)
+                done = flight.done
+            if handler is not None:
+                for token in pending:
+                    handler.on_llm_new_token(token)
+            if done:
+                break
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"upstream_calls": self.upstream_calls, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight layer shared by every session of an app"""
+    return _single_flight
+
+
+def invoke_coalesced(
+    model: Any,
+    messages: Sequence[Any],
+    handler: Any = None,
+    timeout: Optional[float] = None,
+    limit: Optional[Callable[[Callable[[], Any]], Any]] = None,
+) -> Any:
+    """Shorthand for get_single_flight().invoke()"""
+    return _single_flight.invoke(model, messages, handler, timeout, limit)
@@ -0,0 +1,231 @@
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+
+@dataclass
+class ItemEvent:
+    """A complete element of a watched array, e.g. one flashcard"""
+    path: str
+    index: int
+    value: Any
+
+
+@dataclass
+class ValueEvent:
+    """A complete value at a watched key, e.g. the story title"""
+    path: str
+    value: Any
+
+
+@dataclass
+class TextEvent:
+    """Newly decoded characters of a watched string that is still being generated"""
+    path: str
+    text: str
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_SCALAR_END = set(",}] \t\r\n")
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "key", "expect_key", "index", "capture_start", "capture_path")
+
+    def __init__(self, kind: str, path: str):
+        self.kind = kind
+        self.path = path
+        self.key: Optional[str] = None
+        self.expect_key = kind == "object"
+        self.index = 0
+        self.capture_start: Optional[int] = None
+        self.capture_path: Optional[str] = None
+
+    def child_path(self) -> str:
+        if self.kind == "array":
+            return self.path
+        return f"{self.path}.{self.key}" if self.path else (self.key or "")
+
+
+class StreamingJSONParser:
+    """
+    Incremental JSON parser for LLM output that arrives token by token
+
+    Watched paths are dotted object keys from the root, with array levels left out
+    ("flashcards", "story.content"). Anything before the first '{' or '[' (such as a
+    ```json fence) and anything after the root value is ignored.
+    """
+
+    def __init__(
+        self,
+        item_paths: Sequence[str] = (),
+        value_paths: Sequence[str] = (),
+        text_paths: Sequence[str] = ()
+    ):
+        self.item_paths = set(item_paths)
+        self.value_paths = set(value_paths)
+        self.text_paths = set(text_paths)
+        self.buffer = ""
+        self._pos = 0
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        self._stack: List[_Frame] = []
+        self._events: List[Any] = []
+
+        self._in_string = False
+        self._string_is_key = False
+        self._string_text_path: Optional[str] = None
+        self._key_chars: List[str] = []
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        self._in_scalar = False
+
+    @property
+    def done(self) -> bool:
+        return self._root_end is not None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume the next chunk and return the events it completed"""
+        self.buffer += chunk
+        while self._pos < len(self.buffer) and not self.done:
+            self._step(self.buffer[self._pos], self._pos)
+            self._pos += 1
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> Any:
+        """The fully parsed document; raises ValueError if the root value never closed"""
+        if not self.done:
+            raise ValueError("Incomplete JSON document")
+        return json.loads(self.buffer[self._root_start:self._root_end + 1])
+
+    # --- character handling ---
+
+    def _step(self, char: str, i: int) -> None:
+        if self._root_start is None:
+            if char in "{[":
+                self._root_start = i
+                self._stack.append(_Frame("object" if char == "{" else "array", ""))
+            return
+
+        if self._in_string:
+            self._string_char(char, i)
+            return
+
+        if self._in_scalar and char in _SCALAR_END:
+            self._in_scalar = False
+            self._value_end(i - 1)
+
+        frame = self._stack[-1]
+        if char in " \t\r\n":
+            return
+        if char == '"':
+            self._in_string = True
+            self._string_is_key = frame.kind == "object" and frame.expect_key
+            self._string_text_path = None
+            if self._string_is_key:
+                self._key_chars = []
+            else:
+                self._value_start(i)
+                if frame.child_path() in self.text_paths:
+                    self._string_text_path = frame.child_path()
+        elif char == ":":
+            frame.expect_key = False
+        elif char == ",":
+            if frame.kind == "object":
+                frame.expect_key = True
+        elif char in "{[":
+            self._value_start(i)
+            self._stack.append(_Frame("object" if char == "{" else "array", frame.child_path()))
+        elif char in "}]":
+            self._stack.pop()
+            if self._stack:
+                self._value_end(i)
+            else:
+                self._root_end = i
+        elif not self._in_scalar:
+            self._in_scalar = True
+            self._value_start(i)
+
+    def _string_char(self, char: str, i: int) -> None:
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                code = int(self._unicode, 16)
+                self._unicode = None
+                if 0xD800 <= code <= 0xDBFF:
+                    self._high_surrogate = code
+                    return
+                if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+                    code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+                self._high_surrogate = None
+                self._decoded(chr(code))
+        elif self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._decoded(_ESCAPES.get(char, char))
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._stack[-1].key = "".join(self._key_chars)
+            else:
+                self._value_end(i)
+        else:
+            self._decoded(char)
+
+    def _decoded(self, text: str) -> None:
+        if self._string_is_key:
+            self._key_chars.append(text)
+        elif self._string_text_path is not None:
+            if self._events and isinstance(self._events[-1], TextEvent) and self._events[-1].path == self._string_text_path:
+                self._events[-1].text += text
+            else:
+                self._events.append(TextEvent(self._string_text_path, text))
+
+    # --- value boundaries ---
+
+    def _value_start(self, i: int) -> None:
+        frame = self._stack[-1]
+        path = frame.child_path()
+        if (frame.kind == "array" and path in self.item_paths) or (frame.kind == "object" and path in self.value_paths):
+            frame.capture_start = i
+            frame.capture_path = path
+
+    def _value_end(self, i: int) -> None:
+        frame = self._stack[-1]
+        if frame.capture_start is not None:
+            raw = self.buffer[frame.capture_start:i + 1]
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError:
+                value = None
+            if value is not None:
+                if frame.kind == "array":
+                    self._events.append(ItemEvent(frame.capture_path, frame.index, value))
+                else:
+                    self._events.append(ValueEvent(frame.capture_path, value))
+            frame.capture_start = None
+        if frame.kind == "array":
+            frame.index += 1
+
+
+class ParagraphSplitter:
+    """Turns streamed text into complete paragraphs (separated by a blank line)"""
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._pending += text
+        *paragraphs, self._pending = self._pending.split("\n\n")
+        return [paragraph.strip() for paragraph in paragraphs if paragraph.strip()]
+
+    def flush(self) -> Optional[str]:
+        paragraph, self._pending = self._pending.strip(), ""
+        return paragraph or None
+
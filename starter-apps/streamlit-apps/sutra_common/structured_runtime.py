@@ -0,0 +1,396 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from langchain_openai import ChatOpenAI
+from langchain.prompts import PromptTemplate
+from langchain_core.messages import AIMessage, HumanMessage
+
+from .endpoints import SUTRA_BASE_URL
+from .telemetry import llm_callbacks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = SUTRA_BASE_URL
+# Compiled prompts kept per process; the least recently used are dropped first
+MAX_PROMPTS = 256
+# Error text that shows the endpoint refused JSON mode itself, as opposed to the prompt
+_JSON_MODE_ERRORS = ("response_format", "json_object", "json mode")
+
+
+class LLMConfig:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: str = "sutra-v2",
+        max_tokens: int = 1500,
+        temperature: float = 0.7,
+        custom_model: Optional[Any] = None,
+        base_url: Optional[str] = DEFAULT_BASE_URL,
+        default_headers: Optional[dict] = None
+    ):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.custom_model = custom_model
+        self.base_url = base_url
+        self.default_headers = default_headers
+
+    def client_key(self) -> Tuple[Any, ...]:
+        headers = tuple(sorted((self.default_headers or {}).items()))
+        return (self.api_key, self.model_name, self.max_tokens, self.temperature, self.base_url, headers)
+
+
+class StructuredOutputError(Exception):
+    """Raised when a response still fails validation after the allowed re-asks"""
+
+    def __init__(self, raw: str, errors: List[Dict[str, Any]]):
+        super().__init__(f"Structured output failed validation: {len(errors)} error(s)")
+        self.raw = raw
+        self.errors = errors
+
+
+@dataclass
+class CallStats:
+    """Latency, token and parse counters for one kind of call"""
+    calls: int = 0
+    latency: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    parse_failures: int = 0
+    repairs: int = 0
+    failures: int = 0
+
+    @property
+    def parse_failure_rate(self) -> float:
+        return self.parse_failures / self.calls if self.calls else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.latency / self.calls if self.calls else 0.0
+
+
+@dataclass
+class RuntimeMetrics:
+    """Per-call-name stats shared by every runtime in the process"""
+    calls: Dict[str, CallStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, name: str, **deltas: float) -> None:
+        with self._lock:
+            stats = self.calls.setdefault(name, CallStats())
+            for attr, delta in deltas.items():
+                setattr(stats, attr, getattr(stats, attr) + delta)
+
+    def totals(self) -> CallStats:
+        total = CallStats()
+        with self._lock:
+            for stats in self.calls.values():
+                for counter in fields(CallStats):
+                    setattr(total, counter.name, getattr(total, counter.name) + getattr(stats, counter.name))
+        return total
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-call stats as table rows"""
+        with self._lock:
+            items = sorted(self.calls.items())
+        return [
+            {
+                "Call": name,
+                "Calls": stats.calls,
+                "Avg latency (s)": round(stats.avg_latency, 2),
+                "Input tokens": stats.input_tokens,
+                "Output tokens": stats.output_tokens,
+                "Parse failure rate": f"{stats.parse_failure_rate:.0%}",
+                "Re-asks": stats.repairs,
+                "Failed": stats.failures
+            }
+            for name, stats in items
+        ]
+
+
+_metrics = RuntimeMetrics()
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_prompts: "OrderedDict[Tuple[Any, ...], PromptTemplate]" = OrderedDict()
+# (base URL, model) pairs that rejected response_format
+_json_mode_unsupported = set()
+_lock = threading.Lock()
+
+
+def get_metrics() -> RuntimeMetrics:
+    """Process-wide metrics for every structured generation call"""
+    return _metrics
+
+
+def get_llm(llm_config: LLMConfig) -> Any:
+    """Pooled chat client; identical configs share one client and its HTTP connections"""
+    if llm_config.custom_model:
+        return llm_config.custom_model
+    key = llm_config.client_key()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = ChatOpenAI(
+                model=llm_config.model_name,
+                api_key=llm_config.api_key,
+                max_tokens=llm_config.max_tokens,
+                temperature=llm_config.temperature,
+                base_url=llm_config.base_url,
+                default_headers=llm_config.default_headers,
+                stream_usage=True,
+                callbacks=llm_callbacks()
+            )
+            _clients[key] = client
+        return client
+
+
+def get_prompt(
+    template: str,
+    input_variables: Sequence[str],
+    partial_variables: Optional[Dict[str, str]] = None
+) -> PromptTemplate:
+    """
+    Compiled PromptTemplate, built once per distinct template and partials
+
+    Keep per-request text such as user instructions in input variables, not in the template;
+    only the MAX_PROMPTS most recently used templates are kept.
+    """
+    partials = partial_variables or {}
+    key = (template, tuple(input_variables), tuple(sorted(partials.items())))
+    with _lock:
+        prompt = _prompts.get(key)
+        if prompt is None:
+            prompt = PromptTemplate(
+                input_variables=list(input_variables),
+                template=template,
+                partial_variables=partials
+            )
+            _prompts[key] = prompt
+            while len(_prompts) > MAX_PROMPTS:
+                _prompts.popitem(last=False)
+        else:
+            _prompts.move_to_end(key)
+        return prompt
+
+
+def extract_json(content: str) -> Optional[Any]:
+    """The JSON object in a response, ignoring code fences and surrounding prose"""
+    content = content.strip().replace("```json", "").replace("```", "").strip()
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end == -1:
+        return None
+    try:
+        return json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def _usage(message: Any) -> Tuple[int, int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+
+
+def _endpoint(llm: Any) -> Tuple[str, str]:
+    base_url = str(getattr(llm, "openai_api_base", None) or type(llm).__name__)
+    return base_url, str(getattr(llm, "model_name", None) or "")
+
+
+def _rejects_json_mode(error: Exception) -> bool:
+    # A 400 alone can come from the prompt or the context length; only the error text says it was JSON mode
+    message = str(getattr(error, "body", None) or error).lower()
+    return any(marker in message for marker in _JSON_MODE_ERRORS)
+
+
+class StructuredRuntime:
+    """
+    Runs prompts that must return a pydantic model
+
+    Requests use JSON mode where the endpoint accepts it. When a response fails validation,
+    only the failing top-level fields are asked for again and merged into the first answer.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        json_mode: bool = True,
+        max_repairs: int = 1,
+        metrics: Optional[RuntimeMetrics] = None
+    ):
+        self.llm = llm
+        self.json_mode = json_mode
+        self.max_repairs = max_repairs
+        self.metrics = metrics if metrics is not None else _metrics
+
+    def _bound(self, llm: Any) -> Any:
+        if self.json_mode and _endpoint(llm) not in _json_mode_unsupported and hasattr(llm, "bind"):
+            return llm.bind(response_format={"type": "json_object"})
+        return llm
+
+    def _mark_json_mode_unsupported(self, llm: Any, error: Exception) -> None:
+        base_url, model = _endpoint(llm)
+        logger.info(f"JSON mode rejected by {model} at {base_url}, falling back to prompt-only JSON: {str(error)}")
+        with _lock:
+            _json_mode_unsupported.add(_endpoint(llm))
+
+    def _invoke(self, llm: Any, messages: List[Any], name: str) -> str:
+        bound = self._bound(llm)
+        started = time.perf_counter()
+        try:
+            message = bound.invoke(messages)
+        except Exception as e:
+            if bound is llm or not _rejects_json_mode(e):
+                raise
+            self._mark_json_mode_unsupported(llm, e)
+            message = llm.invoke(messages)
+        input_tokens, output_tokens = _usage(message)
+        self.metrics.record(
+            name,
+            calls=1,
+            latency=time.perf_counter() - started,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens
+        )
+        return message.content
+
+    def generate(
+        self,
+        prompt: PromptTemplate,
+        inputs: Dict[str, Any],
+        response_model: Type[BaseModel],
+        name: str = "generate",
+        llm: Optional[Any] = None
+    ) -> BaseModel:
+        """Run prompt and return a validated response_model; raises StructuredOutputError"""
+        llm = llm if llm is not None else self.llm
+        prompt_text = prompt.format(**inputs)
+        raw = self._invoke(llm, [HumanMessage(content=prompt_text)], name)
+        return self.validate(raw, response_model, prompt_text, name, llm)
+
+    def stream(
+        self,
+        prompt: PromptTemplate,
+        inputs: Dict[str, Any],
+        name: str = "stream",
+        llm: Optional[Any] = None
+    ) -> Iterator[str]:
+        """Yield response text as it arrives; pass the joined text to validate() afterwards"""
+        llm = llm if llm is not None else self.llm
+        messages = [HumanMessage(content=prompt.format(**inputs))]
+        bound = self._bound(llm)
+        started = time.perf_counter()
+        input_tokens = output_tokens = 0
+        yielded = False
+        try:
+            try:
+                for chunk in bound.stream(messages):
+                    chunk_in, chunk_out = _usage(chunk)
+                    input_tokens += chunk_in
+                    output_tokens += chunk_out
+                    if chunk.content:
+                        yielded = True
+                        yield chunk.content
+            except Exception as e:
+                if yielded or bound is llm or not _rejects_json_mode(e):
+                    raise
+                self._mark_json_mode_unsupported(llm, e)
+                for chunk in llm.stream(messages):
+                    chunk_in, chunk_out = _usage(chunk)
+                    input_tokens += chunk_in
+                    output_tokens += chunk_out
+                    if chunk.content:
+                        yield chunk.content
+        finally:
+            self.metrics.record(
+                name,
+                calls=1,
+                latency=time.perf_counter() - started,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens
+            )
+
+    def validate(
+        self,
+        raw: str,
+        response_model: Type[BaseModel],
+        prompt_text: str,
+        name: str = "generate",
+        llm: Optional[Any] = None
+    ) -> BaseModel:
+        """Validate raw against response_model, re-asking for failed fields up to max_repairs times"""
+        llm = llm if llm is not None else self.llm
+        data = extract_json(raw)
+        errors = self._errors(data, response_model)
+        if not errors:
+            return response_model.model_validate(data)
+
+        self.metrics.record(name, parse_failures=1)
+        answer = raw
+        for _ in range(self.max_repairs):
+            failed = self._failed_fields(errors, response_model)
+            logger.info(f"{name}: re-asking for {', '.join(failed)}")
+            self.metrics.record(name, repairs=1)
+            answer = self._invoke(
+                llm,
+                [
+                    HumanMessage(content=prompt_text),
+                    AIMessage(content=answer),
+                    HumanMessage(content=self._repair_prompt(failed, errors, response_model))
+                ],
+                f"{name} (re-ask)"
+            )
+            patch = extract_json(answer)
+            if isinstance(patch, dict):
+                data = {**(data if isinstance(data, dict) else {}), **{k: v for k, v in patch.items() if k in failed}}
+            errors = self._errors(data, response_model)
+            if not errors:
+                return response_model.model_validate(data)
+
+        self.metrics.record(name, failures=1)
+        raise StructuredOutputError(raw, errors)
+
+    @staticmethod
+    def _errors(data: Any, response_model: Type[BaseModel]) -> List[Dict[str, Any]]:
+        if not isinstance(data, dict):
+            return [{"loc": (), "msg": "Response is not a JSON object"}]
+        try:
+            response_model.model_validate(data)
+        except ValidationError as e:
+            return e.errors()
+        return []
+
+    @staticmethod
+    def _failed_fields(errors: List[Dict[str, Any]], response_model: Type[BaseModel]) -> List[str]:
+        fields = []
+        for error in errors:
+            loc = error.get("loc") or ()
+            if not loc:
+                # Nothing usable came back, so every field has to be asked for again
+                return list(response_model.model_fields)
+            if loc[0] not in fields:
+                fields.append(str(loc[0]))
+        return fields
+
+    @staticmethod
+    def _repair_prompt(failed: List[str], errors: List[Dict[str, Any]], response_model: Type[BaseModel]) -> str:
+        full_schema = response_model.model_json_schema()
+        properties = full_schema.get("properties", {})
+        schema: Dict[str, Any] = {"properties": {name: properties.get(name, {}) for name in failed}}
+        if "$defs" in full_schema:
+            schema["$defs"] = full_schema["$defs"]
+        problems = "\n".join(
+            f"- {'.'.join(str(part) for part in error.get('loc') or ()) or 'response'}: {error.get('msg')}"
+            for error in errors[:20]
+        )
+        return (
+            "Some fields of your previous response were missing or invalid:\n"
+            f"{problems}\n\n"
+            "Return ONLY a JSON object with these corrected fields and nothing else: "
+            f"{', '.join(failed)}. Keep the same language and content style.\n"
+            f"Field schema: {json.dumps(schema, ensure_ascii=False)}"
+        )
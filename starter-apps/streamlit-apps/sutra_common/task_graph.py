@@ -0,0 +1,137 @@
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class TaskFailed(Exception):
+    """Raised by TaskGraph.run when a node raises"""
+
+    def __init__(self, name: str, error: BaseException):
+        super().__init__(f"Task '{name}' failed: {str(error)}")
+        self.name = name
+        self.error = error
+
+
+@dataclass
+class TaskNode:
+    """One unit of work; fn receives each dependency's result as a keyword argument"""
+    name: str
+    fn: Callable[..., Any]
+    deps: Sequence[str] = field(default_factory=tuple)
+
+
+@dataclass
+class TaskTiming:
+    """When a node started and finished, in seconds since the graph started"""
+    name: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class TaskGraph:
+    """
+    Small DAG executor for independent agent and API calls
+
+    Every node starts as soon as its dependencies have finished, so the total run time
+    is the critical path rather than the sum of all nodes.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.nodes: Dict[str, TaskNode] = {}
+        self.timings: Dict[str, TaskTiming] = {}
+        self.total_time = 0.0
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = ()) -> "TaskGraph":
+        if name in self.nodes:
+            raise ValueError(f"Duplicate task '{name}'")
+        self.nodes[name] = TaskNode(name, fn, tuple(deps))
+        return self
+
+    def _check(self) -> None:
+        for node in self.nodes.values():
+            for dep in node.deps:
+                if dep not in self.nodes:
+                    raise ValueError(f"Task '{node.name}' depends on unknown task '{dep}'")
+
+        # Kahn's algorithm: any node left unvisited sits on a cycle
+        remaining = {name: len(node.deps) for name, node in self.nodes.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for other in self.nodes.values():
+                if name in other.deps:
+                    remaining[other.name] -= 1
+                    if remaining[other.name] == 0:
+                        ready.append(other.name)
+        if visited != len(self.nodes):
+            raise ValueError("Task graph contains a cycle")
+
+    def run(self) -> Dict[str, Any]:
+        """Run every node and return {name: result}; raises TaskFailed on the first error"""
+        self._check()
+        results: Dict[str, Any] = {}
+        self.timings = {}
+        started = time.perf_counter()
+
+        def execute(node: TaskNode) -> Any:
+            start = time.perf_counter() - started
+            try:
+                return node.fn(**{dep: results[dep] for dep in node.deps})
+            finally:
+                self.timings[node.name] = TaskTiming(node.name, start, time.perf_counter() - started)
+
+        pending = dict(self.nodes)
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="task-graph") as executor:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    if all(dep in results for dep in node.deps):
+                        running[executor.submit(execute, node)] = name
+                        del pending[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        for other in running:
+                            other.cancel()
+                        self.total_time = time.perf_counter() - started
+                        raise TaskFailed(name, e) from e
+
+        self.total_time = time.perf_counter() - started
+        return results
+
+    def critical_path(self) -> List[str]:
+        """Chain of dependent nodes that determined the total run time"""
+        if not self.timings:
+            return []
+        name: Optional[str] = max(self.timings, key=lambda n: self.timings[n].end)
+        path = []
+        while name is not None:
+            path.append(name)
+            deps = [dep for dep in self.nodes[name].deps if dep in self.timings]
+            name = max(deps, key=lambda n: self.timings[n].end) if deps else None
+        return list(reversed(path))
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-node timings as table rows, in start order"""
+        critical = set(self.critical_path())
+        rows = []
+        for timing in sorted(self.timings.values(), key=lambda t: t.start):
+            rows.append({
+                "Task": timing.name,
+                "Start (s)": round(timing.start, 2),
+                "Duration (s)": round(timing.duration, 2),
+                "Critical path": "✓" if timing.name in critical else ""
+            })
+        return rows
@@ -0,0 +1,645 @@
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import secrets
+import threading
+import contextvars
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:
+    BaseCallbackHandler = None
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sutra-cookbook", "telemetry")
+# Seconds; the Prometheus client defaults stretched to cover long LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Metrics files are rewritten and span files flushed this often
+FLUSH_INTERVAL = 10.0
+# Recent durations kept per span name for the in-app report
+REPORT_WINDOW = 1000
+
+# Span kinds used across the apps
+LLM = "llm"
+HTTP = "http"
+PDF = "pdf"
+CHUNKING = "chunking"
+EMBEDDING = "embedding"
+VECTOR_SEARCH = "vector_search"
+INTERNAL = "internal"
+
+
+def _parse_mode(value: str) -> Tuple[str, ...]:
+    value = value.strip().lower()
+    if value in ("", "0", "off", "false", "no"):
+        return ()
+    if value in ("1", "on", "true", "yes"):
+        return ("file",)
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+_MODE = _parse_mode(os.getenv("SUTRA_TELEMETRY", ""))
+# Checked first by every entry point, so instrumentation costs one branch when telemetry is off
+_ENABLED = bool(_MODE)
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("sutra_span", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> (count per bucket, sum, count)
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {bucket_count}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named counters and histograms, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, help, labels)
+            return self._metrics[name]
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help, labels, buckets)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+class Span:
+    """
+    One timed operation, recorded with OpenTelemetry field names
+
+    LLM spans also carry time to first token (call token() as chunks arrive) and token usage
+    under the gen_ai.* semantic-convention attributes.
+    """
+
+    def __init__(self, telemetry: "Telemetry", name: str, kind: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.telemetry = telemetry
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = dict(attributes)
+        self.events: List[Dict[str, Any]] = []
+        self.status = "OK"
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.first_token: Optional[float] = None
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self._otel = telemetry.otel_start(self)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes})
+
+    def token(self) -> None:
+        """Mark a streamed token; the first one sets time to first token"""
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self._started
+
+    def usage(self, input_tokens: Optional[int] = None, output_tokens: Optional[int] = None) -> None:
+        if input_tokens is not None:
+            self.attributes["gen_ai.usage.input_tokens"] = int(input_tokens)
+        if output_tokens is not None:
+            self.attributes["gen_ai.usage.output_tokens"] = int(output_tokens)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+        if error is not None:
+            self.status = "ERROR"
+            self.attributes["error.type"] = type(error).__name__
+            self.add_event("exception", **{"exception.message": str(error)[:500]})
+        self.telemetry.finish(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "kind": self.kind,
+            "service": self.telemetry.service,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+        if self.first_token is not None:
+            record["ttft_ms"] = round(self.first_token * 1000, 3)
+        if self.events:
+            record["events"] = self.events
+        return record
+
+
+class _NoopSpan:
+    """Stand-in returned while telemetry is off; every method does nothing"""
+    name = kind = ""
+    attributes: Dict[str, Any] = {}
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def token(self) -> None:
+        pass
+
+    def usage(self, input_tokens: Optional[int] = None, output_tokens: Optional[int] = None) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _NoopScope:
+    def __enter__(self) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+    """Context manager that makes a span current for its block and ends it on exit"""
+
+    def __init__(self, telemetry: "Telemetry", name: str, kind: str, attributes: Dict[str, Any]):
+        self._telemetry = telemetry
+        self._args = (name, kind, attributes)
+        self._token = None
+        self.span: Optional[Span] = None
+
+    def __enter__(self) -> Span:
+        name, kind, attributes = self._args
+        self.span = Span(self._telemetry, name, kind, _current.get(), attributes)
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current.reset(self._token)
+        self.span.end(exc)
+        return False
+
+
+class _SpanStats:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.calls = 0
+        self.errors = 0
+        self.durations: Deque[float] = deque(maxlen=REPORT_WINDOW)
+        self.ttfts: Deque[float] = deque(maxlen=REPORT_WINDOW)
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+
+def _percentile(values: Iterable[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * q)))]
+
+
+def _service_name() -> str:
+    # streamlit run sets argv[0] to the app script, so the app folder names the service
+    script = sys.argv[0] if sys.argv and sys.argv[0] else ""
+    return os.path.basename(os.path.dirname(os.path.abspath(script))) if script.endswith(".py") else "python"
+
+
+class Telemetry:
+    """
+    Span recorder, metrics registry and exporters for one process
+
+    Finished spans update the standard metrics, feed the in-app report, are appended to
+    spans.jsonl in the telemetry directory and, in "otel" mode, are mirrored to the
+    OpenTelemetry API. The metrics are rewritten to a Prometheus textfile every FLUSH_INTERVAL.
+    """
+
+    def __init__(self, mode: Sequence[str] = ("file",), directory: Optional[str] = None, service: Optional[str] = None):
+        self.mode = tuple(mode)
+        self.directory = directory or os.getenv("SUTRA_TELEMETRY_DIR", DEFAULT_DIR)
+        self.service = service or os.getenv("SUTRA_TELEMETRY_SERVICE") or _service_name()
+        self.metrics = MetricsRegistry()
+        self.span_duration = self.metrics.histogram(
+            "sutra_span_duration_seconds", "Duration of instrumented operations", ("service", "name", "kind"))
+        self.span_errors = self.metrics.counter(
+            "sutra_span_errors_total", "Instrumented operations that raised", ("service", "name", "kind"))
+        self.llm_duration = self.metrics.histogram(
+            "sutra_llm_duration_seconds", "Total LLM call latency", ("service", "feature", "model"))
+        self.llm_ttft = self.metrics.histogram(
+            "sutra_llm_time_to_first_token_seconds", "Time to the first streamed token", ("service", "feature", "model"))
+        self.llm_tokens = self.metrics.counter(
+            "sutra_llm_tokens_total", "LLM tokens by direction", ("service", "feature", "model", "direction"))
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _SpanStats] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=REPORT_WINDOW)
+        self._file = None
+        self._tracer = None
+        if "file" in self.mode:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(os.path.join(self.directory, "spans.jsonl"), "a", encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Telemetry file export disabled: {str(e)}")
+        if "otel" in self.mode:
+            if otel_trace is None:
+                logger.warning("SUTRA_TELEMETRY=otel needs the opentelemetry-api package; spans stay local")
+            else:
+                self._tracer = otel_trace.get_tracer("sutra_common.telemetry")
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def otel_start(self, span: Span) -> Any:
+        if self._tracer is None:
+            return None
+        parent = span.parent._otel if span.parent is not None else None
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        return self._tracer.start_span(span.name, context=context, start_time=span.start_ns)
+
+    def finish(self, span: Span) -> None:
+        labels = {"service": self.service, "name": span.name, "kind": span.kind}
+        self.span_duration.observe(span.duration, **labels)
+        if span.status == "ERROR":
+            self.span_errors.inc(**labels)
+        input_tokens = span.attributes.get("gen_ai.usage.input_tokens", 0)
+        output_tokens = span.attributes.get("gen_ai.usage.output_tokens", 0)
+        if span.kind == LLM:
+            llm_labels = {
+                "service": self.service,
+                "feature": span.attributes.get("feature", "unknown"),
+                "model": span.attributes.get("gen_ai.request.model", "unknown"),
+            }
+            self.llm_duration.observe(span.duration, **llm_labels)
+            if span.first_token is not None:
+                self.llm_ttft.observe(span.first_token, **llm_labels)
+            self.llm_tokens.inc(input_tokens, direction="input", **llm_labels)
+            self.llm_tokens.inc(output_tokens, direction="output", **llm_labels)
+
+        record = span.to_dict()
+        with self._lock:
+            stats = self._stats.setdefault((span.name, span.kind), _SpanStats(span.kind))
+            stats.calls += 1
+            stats.errors += span.status == "ERROR"
+            stats.durations.append(span.duration)
+            if span.first_token is not None:
+                stats.ttfts.append(span.first_token)
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            self.recent.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+        if span._otel is not None:
+            span._otel.set_attributes({
+                k: v for k, v in dict(span.attributes, **{"sutra.kind": span.kind}).items()
+                if isinstance(v, (str, bool, int, float))
+            })
+            if span.status == "ERROR":
+                span._otel.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+            span._otel.end(end_time=span.end_ns)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-span-name stats over recent calls, as table rows"""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: -sum(item[1].durations))
+            return [
+                {
+                    "Span": name,
+                    "Kind": kind,
+                    "Calls": stats.calls,
+                    "Errors": stats.errors,
+                    "p50 (ms)": round(_percentile(stats.durations, 0.5) * 1000, 1),
+                    "p95 (ms)": round(_percentile(stats.durations, 0.95) * 1000, 1),
+                    "TTFT p50 (ms)": round(_percentile(stats.ttfts, 0.5) * 1000, 1) if stats.ttfts else None,
+                    "Tokens in": stats.input_tokens,
+                    "Tokens out": stats.output_tokens,
+                }
+                for (name, kind), stats in items
+            ]
+
+    def flush(self) -> None:
+        """Write the metrics textfile and flush buffered spans"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        if "file" not in self.mode:
+            return
+        path = os.path.join(self.directory, f"metrics-{self.service}-{os.getpid()}.prom")
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(self.metrics.render())
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.debug(f"Telemetry metrics export failed: {str(e)}")
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    """Process-wide telemetry, or None while SUTRA_TELEMETRY is off"""
+    global _telemetry
+    if not _ENABLED:
+        return None
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry(_MODE)
+    return _telemetry
+
+
+def configure(mode: str) -> Optional[Telemetry]:
+    """Switch telemetry on or off at runtime, e.g. from a benchmark; same values as SUTRA_TELEMETRY"""
+    global _MODE, _ENABLED, _telemetry
+    with _telemetry_lock:
+        _MODE = _parse_mode(mode)
+        _ENABLED = bool(_MODE)
+        if _telemetry is not None:
+            _telemetry.close()
+        _telemetry = None
+    return get_telemetry()
+
+
+def current_span() -> Optional[Span]:
+    return _current.get() if _ENABLED else None
+
+
+def span(name: str, kind: str = INTERNAL, **attributes: Any):
+    """Context manager timing a block as a child of the current span"""
+    if not _ENABLED:
+        return _NOOP_SCOPE
+    return _SpanScope(get_telemetry(), name, kind, attributes)
+
+
+def start_span(name: str, kind: str = INTERNAL, **attributes: Any):
+    """Span that is not made current and must be ended explicitly, e.g. across a generator"""
+    if not _ENABLED:
+        return _NOOP_SPAN
+    return Span(get_telemetry(), name, kind, _current.get(), attributes)
+
+
+def llm_span(name: str, model: str = "unknown", **attributes: Any):
+    """span() for an LLM call; the feature label is the enclosing span's name"""
+    if not _ENABLED:
+        return _NOOP_SCOPE
+    parent = _current.get()
+    attributes.setdefault("feature", parent.name if parent else name)
+    return _SpanScope(get_telemetry(), name, LLM, dict(attributes, **{"gen_ai.request.model": model}))
+
+
+def traced(name: Optional[str] = None, kind: str = INTERNAL) -> Callable:
+    """Decorator recording each call of a function as a span"""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            with _SpanScope(get_telemetry(), span_name, kind, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(fn: Callable) -> Callable:
+    """Run fn under the caller's current span, for work handed to another thread"""
+    if not _ENABLED:
+        return fn
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def usage_from_result(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(input, output) tokens reported in a LangChain LLMResult, or (None, None) when the API sent none"""
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return metadata.get("input_tokens"), metadata.get("output_tokens")
+    return None, None
+
+
+if BaseCallbackHandler is not None:
+    class TelemetryCallbackHandler(BaseCallbackHandler):
+        """Spans for LangChain chat model and retriever runs, with TTFT and token usage"""
+
+        def __init__(self):
+            self._spans: Dict[Any, Span] = {}
+            self._lock = threading.Lock()
+
+        def _start(self, run_id: Any, name: str, kind: str, attributes: Dict[str, Any]) -> None:
+            parent = _current.get()
+            if kind == LLM:
+                attributes.setdefault("feature", parent.name if parent else name)
+            new_span = Span(get_telemetry(), name, kind, parent, attributes)
+            with self._lock:
+                self._spans[run_id] = new_span
+
+        def _end(self, run_id: Any) -> Optional[Span]:
+            with self._lock:
+                return self._spans.pop(run_id, None)
+
+        def _model_attributes(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            params = kwargs.get("invocation_params") or {}
+            model = params.get("model") or params.get("model_name") or (kwargs.get("metadata") or {}).get("ls_model_name")
+            return {"gen_ai.request.model": model or "unknown", "gen_ai.system": "openai"}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            attributes = self._model_attributes(kwargs)
+            attributes["prompt.chars"] = sum(len(str(getattr(m, "content", ""))) for batch in messages for m in batch)
+            self._start(run_id, "llm.chat", LLM, attributes)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            attributes = self._model_attributes(kwargs)
+            attributes["prompt.chars"] = sum(len(p) for p in prompts)
+            self._start(run_id, "llm.completion", LLM, attributes)
+
+        def on_llm_new_token(self, token, *, run_id, **kwargs):
+            with self._lock:
+                current = self._spans.get(run_id)
+            if current is not None:
+                current.token()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            finished = self._end(run_id)
+            if finished is not None:
+                finished.usage(*usage_from_result(response))
+                finished.end()
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            finished = self._end(run_id)
+            if finished is not None:
+                finished.end(error)
+
+        def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+            self._start(run_id, "vector.search", VECTOR_SEARCH, {"query.chars": len(query)})
+
+        def on_retriever_end(self, documents, *, run_id, **kwargs):
+            finished = self._end(run_id)
+            if finished is not None:
+                finished.set_attribute("documents", len(documents))
+                finished.end()
+
+        def on_retriever_error(self, error, *, run_id, **kwargs):
+            finished = self._end(run_id)
+            if finished is not None:
+                finished.end(error)
+else:
+    TelemetryCallbackHandler = None
+
+_callback_handler = None
+
+
+def llm_callbacks(*handlers: Any) -> Optional[List[Any]]:
+    """
+    Callbacks for a LangChain model or retriever: the given handlers plus telemetry when on
+
+    Returns None when the list would be empty, matching the apps' callbacks=None default.
+    """
+    global _callback_handler
+    callbacks = [handler for handler in handlers if handler is not None]
+    if _ENABLED and TelemetryCallbackHandler is not None:
+        if _callback_handler is None:
+            _callback_handler = TelemetryCallbackHandler()
+        callbacks.append(_callback_handler)
+    return callbacks or None
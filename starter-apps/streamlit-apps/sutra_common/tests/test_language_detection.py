@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sutra_common.language_detection import is_probably_english
+
+
+def test_english_queries_are_recognised():
+    assert is_probably_english("latest news on climate")
+    assert is_probably_english("cheap running shoes for women")
+    assert is_probably_english("2024")
+
+
+def test_other_scripts_and_languages_are_not_english():
+    assert not is_probably_english("सस्ता मोबाइल फोन")
+    assert not is_probably_english("zapatos para correr")
+    assert not is_probably_english("chaussures de sport")
+
+
+def test_latin_text_without_english_evidence_is_translated():
+    assert not is_probably_english("sasta mobile phone")
+    assert not is_probably_english("iphone 15")
+    assert not is_probably_english("sabse sasta phone kahan milega")
@@ -0,0 +1,32 @@
+import os
+import sys
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sutra_common.near_duplicates import fingerprint, is_near_duplicate, token_set
+
+
+def test_fingerprint_drops_case_punctuation_and_spacing():
+    assert fingerprint("  What is the capital_of France?! ") == "what is the capital of france"
+
+
+def test_indic_vowel_signs_stay_part_of_the_word():
+    assert fingerprint("पानी का रंग क्या है?") == "पानी का रंग क्या है"
+    assert fingerprint("பூமியின் நிறம் என்ன?") == "பூமியின் நிறம் என்ன"
+
+
+def test_hindi_questions_differing_only_in_vowel_signs_are_distinct():
+    water, pen = "पानी का रंग क्या है?", "पेन का रंग क्या है?"
+
+    assert fingerprint(water) != fingerprint(pen)
+    assert not is_near_duplicate(token_set(water), token_set(pen))
+
+
+def test_rephrased_punctuation_is_a_near_duplicate():
+    assert is_near_duplicate(token_set("भारत की राजधानी क्या है?"), token_set("भारत की राजधानी क्या है"))
+    assert is_near_duplicate(token_set("What is the capital of France?"), token_set("what is the capital of France"))
+
+
+def test_empty_sets_only_match_each_other():
+    assert is_near_duplicate(set(), set())
+    assert not is_near_duplicate(set(), token_set("anything"))
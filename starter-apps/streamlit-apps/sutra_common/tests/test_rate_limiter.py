@@ -0,0 +1,109 @@
+import os
+import sys
+
+import pytest
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sutra_common.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    PREFETCH,
+    FakeClock,
+    RateLimiter,
+    parse_limits,
+)
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = _Response(headers or {})
+
+
+def _limiter(rpm=60, burst=2):
+    clock = FakeClock()
+    return RateLimiter({"sutra": (rpm, burst)}, clock=clock), clock
+
+
+def test_burst_then_refill_at_the_configured_rate():
+    limiter, clock = _limiter(rpm=60, burst=2)
+
+    assert [limiter.acquire("sutra") for _ in range(3)] == [0.0, 0.0, 1.0]
+    assert clock.now() == pytest.approx(1.0)
+
+    # Two idle seconds refill the bucket to its burst, and no further
+    clock.advance(5.0)
+    assert [limiter.acquire("sutra") for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_background_and_prefetch_leave_a_reserve_for_interactive():
+    limiter, clock = _limiter(rpm=60, burst=4)
+
+    assert limiter.acquire("sutra") == 0.0
+    assert limiter.acquire("sutra") == 0.0
+
+    # Prefetch needs 1 + 50% of the bucket and background 1 + 25%, so with two of four
+    # tokens left prefetch waits while background goes
+    assert limiter.acquire("sutra", PREFETCH) == pytest.approx(1.0)
+    assert limiter.acquire("sutra", BACKGROUND) == 0.0
+    assert limiter.acquire("sutra", BACKGROUND) == pytest.approx(1.0)
+
+    # The single token left over is the reserve, and interactive requests may take it
+    assert limiter.acquire("sutra", INTERACTIVE) == 0.0
+    assert clock.now() == pytest.approx(2.0)
+
+
+def test_429_waits_for_retry_after_before_retrying():
+    limiter, clock = _limiter(rpm=60, burst=5)
+    attempts = []
+
+    def throttled_once():
+        attempts.append(clock.now())
+        if len(attempts) == 1:
+            raise _HTTPError(429, {"Retry-After": "5"})
+        return "ok"
+
+    assert limiter.call("sutra", throttled_once) == "ok"
+    assert attempts == [0.0, pytest.approx(5.0)]
+
+    report = {(r["endpoint"], r["priority"]): r for r in limiter.report()}
+    assert report[("sutra", "interactive")]["throttled"] == 1
+
+
+def test_backoff_blocks_every_priority_on_the_endpoint_only():
+    limiter, clock = _limiter(rpm=60, burst=5)
+
+    limiter.backoff("sutra", 5.0)
+
+    assert limiter.acquire("sutra", INTERACTIVE) == pytest.approx(5.0)
+    assert limiter.acquire("sutra", BACKGROUND) == 0.0
+    assert limiter.acquire("serper") == 0.0
+
+
+def test_client_errors_are_not_retried():
+    limiter, clock = _limiter()
+    attempts = []
+
+    def bad_request():
+        attempts.append(clock.now())
+        raise _HTTPError(400)
+
+    with pytest.raises(_HTTPError):
+        limiter.call("sutra", bad_request)
+    assert len(attempts) == 1
+    assert clock.sleeps == []
+
+
+def test_parse_limits_skips_malformed_entries():
+    limits = parse_limits(" sutra=120/20, serper=300,,bad,serpapi=abc/2,assemblyai=60/x ")
+
+    # A missing burst defaults to ten seconds of traffic
+    assert limits == {"sutra": (120.0, 20), "serper": (300.0, 50)}
+    assert parse_limits("") == {}
@@ -0,0 +1,21 @@
+import os
+import sys
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sutra_common.tool_cache import normalize_query
+
+
+def test_case_spacing_and_surrounding_punctuation_are_ignored():
+    assert normalize_query('  "Hotels   in Goa?" ') == "hotels in goa"
+    assert normalize_query("दिल्ली।") == "दिल्ली"
+
+
+def test_indic_vowel_signs_are_kept():
+    assert normalize_query("दिल्ली") != normalize_query("दिल्ला")
+    assert normalize_query("दिल्ली") == "दिल्ली"
+
+
+def test_symbols_and_meaningful_punctuation_are_kept():
+    assert {normalize_query("C++"), normalize_query("C#"), normalize_query("C")} == {"c++", "c#", "c"}
+    assert normalize_query("50%") == "50%"
@@ -0,0 +1,48 @@
+import os
+import sys
+
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sutra_common.translation_memory import TranslationMemory
+
+FOOTER = "Copyright 2024 Example Corporation. All rights reserved."
+
+
+def _memory():
+    memory = TranslationMemory(":memory:")
+    memory.store(FOOTER, "कॉपीराइट 2024 उदाहरण कॉर्पोरेशन। सर्वाधिकार सुरक्षित।", "Hindi", "v1")
+    return memory
+
+
+def test_fuzzy_lookup_returns_close_matches_with_their_similarity():
+    translation, similarity = _memory().lookup_fuzzy(FOOTER.rstrip("."), "Hindi", "v1")
+
+    assert translation.startswith("कॉपीराइट 2024")
+    assert 0.95 <= similarity < 1.0
+
+
+def test_fuzzy_lookup_never_matches_different_numbers():
+    assert _memory().lookup_fuzzy(FOOTER.replace("2024", "2025"), "Hindi", "v1") is None
+
+
+def test_fuzzy_lookup_stays_within_language_and_version():
+    memory = _memory()
+
+    assert memory.lookup_fuzzy(FOOTER.rstrip("."), "Tamil", "v1") is None
+    assert memory.lookup_fuzzy(FOOTER.rstrip("."), "Hindi", "v2") is None
+
+
+def test_translate_segments_uses_near_matches_only_when_asked():
+    batches = []
+
+    def translate_batch(segments):
+        batches.append(segments)
+        return [segment.upper() for segment in segments]
+
+    text = f"{FOOTER.rstrip('.')}\nContact us"
+    exact_only = _memory().translate_segments(text, "Hindi", "v1", translate_batch)
+    with_fuzzy = _memory().translate_segments(text, "Hindi", "v1", translate_batch, min_similarity=0.95)
+
+    assert exact_only.split("\n")[0] == FOOTER.rstrip(".").upper()
+    assert with_fuzzy.split("\n")[0].startswith("कॉपीराइट 2024")
+    assert batches == [[FOOTER.rstrip("."), "Contact us"], ["Contact us"]]
@@ -0,0 +1,400 @@
+import os
+import re
+import math
+import logging
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:
+    BaseCallbackHandler = None
+
+from .telemetry import current_span, usage_from_result
+
+logger = logging.getLogger(__name__)
+
+# Budget levels, from full settings to the cheapest ones
+NORMAL = "normal"
+ECONOMY = "economy"
+EXHAUSTED = "exhausted"
+
+# Share of the session budget after which features switch to their economy settings
+DEFAULT_ECONOMY_AT = 0.8
+# Sessions kept for the process-wide report; the least recently active are dropped first.
+# Budget levels use each SessionBudget's own total, so eviction never resets a live session
+MAX_SESSIONS = 1000
+# Estimator: ASCII text averages about 4 characters per token, Indic and other scripts far fewer
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 1.5
+# Tokens the chat format adds around each message
+MESSAGE_OVERHEAD = 4
+# Target size of the passages trim_text() ranks against a query
+PASSAGE_TOKENS = 150
+
+SESSION_KEY = "_sutra_token_budget"
+
+_WORD = re.compile(r"\w{3,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text, for responses that carry no usage fields"""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return max(1, math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + other_chars / OTHER_CHARS_PER_TOKEN))
+
+
+def _content(message: Any) -> str:
+    if isinstance(message, dict):
+        content = message.get("content", "")
+    else:
+        content = getattr(message, "content", message)
+    return content if isinstance(content, str) else str(content)
+
+
+def estimate_messages(messages: Sequence[Any]) -> int:
+    """Approximate prompt tokens of LangChain messages or role/content dicts"""
+    return sum(estimate_tokens(_content(message)) + MESSAGE_OVERHEAD for message in messages)
+
+
+def _cut(text: str, max_tokens: int) -> str:
+    keep = int(len(text) * max_tokens / estimate_tokens(text))
+    return text[:keep].rstrip() + "\n[...]"
+
+
+def _passages(text: str) -> List[str]:
+    # Sentences grouped into passages of about PASSAGE_TOKENS, so a transcript with no line breaks still splits
+    passages, current, size = [], [], 0
+    for sentence in _SENTENCE_END.split(text):
+        if not sentence.strip():
+            continue
+        current.append(sentence.strip())
+        size += estimate_tokens(sentence)
+        if size >= PASSAGE_TOKENS:
+            passages.append(" ".join(current))
+            current, size = [], 0
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def trim_text(text: str, max_tokens: Optional[int], query: Optional[str] = None) -> str:
+    """
+    text shortened to about max_tokens
+
+    With a query, the passages sharing the most words with it are kept in their original order
+    and the gaps are marked with [...]; without one the text is cut at the end. Text already
+    within the limit, or a max_tokens of None, returns text unchanged.
+    """
+    if not text or max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+    words = set(_WORD.findall(query.lower())) if query else set()
+    if not words:
+        return _cut(text, max_tokens)
+
+    passages = _passages(text)
+    overlap = [len(words & set(_WORD.findall(passage.lower()))) for passage in passages]
+    kept, used = set(), 0
+    for i in sorted(range(len(passages)), key=lambda i: (-overlap[i], i)):
+        cost = estimate_tokens(passages[i])
+        if used + cost <= max_tokens:
+            kept.add(i)
+            used += cost
+    if not kept:
+        return _cut(text, max_tokens)
+
+    parts, previous = [], -1
+    for i in sorted(kept):
+        if i != previous + 1:
+            parts.append("[...]")
+        parts.append(passages[i])
+        previous = i
+    if previous != len(passages) - 1:
+        parts.append("[...]")
+    return "\n".join(parts)
+
+
+def parse_prices(spec: str) -> Optional[Tuple[float, float]]:
+    """(input, output) USD per million tokens from "input/output", e.g. SUTRA_TOKEN_PRICES="0.5/1.5" """
+    if not spec.strip():
+        return None
+    try:
+        input_price, _, output_price = spec.partition("/")
+        return float(input_price), float(output_price or input_price)
+    except ValueError:
+        logger.warning(f"Ignoring malformed SUTRA_TOKEN_PRICES: {spec!r}")
+        return None
+
+
+class _Usage:
+    __slots__ = ("calls", "input_tokens", "output_tokens", "estimated_calls")
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.estimated_calls = 0
+
+    @property
+    def total(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class TokenLedger:
+    """
+    Prompt and completion tokens per session and feature for one process
+
+    Features are free-form names such as "news.translate". Counts come from the API's usage
+    fields where the response has them and from estimate_tokens() otherwise; the report says
+    how many calls were estimated.
+    """
+
+    def __init__(self, prices: Optional[Tuple[float, float]] = None, max_sessions: int = MAX_SESSIONS):
+        self.prices = prices
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict[str, _Usage]]" = OrderedDict()
+
+    def record(self, session: str, feature: str, input_tokens: int, output_tokens: int, estimated: bool = False) -> None:
+        with self._lock:
+            features = self._sessions.get(session)
+            if features is None:
+                features = self._sessions[session] = {}
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session)
+            usage = features.setdefault(feature, _Usage())
+            usage.calls += 1
+            usage.input_tokens += input_tokens
+            usage.output_tokens += output_tokens
+            usage.estimated_calls += estimated
+
+    def session_total(self, session: str) -> int:
+        with self._lock:
+            return sum(usage.total for usage in self._sessions.get(session, {}).values())
+
+    def cost(self, input_tokens: int, output_tokens: int) -> Optional[float]:
+        if self.prices is None:
+            return None
+        return round((input_tokens * self.prices[0] + output_tokens * self.prices[1]) / 1_000_000, 4)
+
+    def _row(self, usage: _Usage, grand_total: int, **labels: str) -> Dict[str, Any]:
+        row = dict(labels)
+        row.update({
+            "Calls": usage.calls,
+            "Tokens in": usage.input_tokens,
+            "Tokens out": usage.output_tokens,
+            "Total": usage.total,
+            "Share": f"{usage.total / grand_total:.0%}" if grand_total else "-",
+            "Estimated calls": usage.estimated_calls,
+        })
+        if self.prices is not None:
+            row["Cost (USD)"] = self.cost(usage.input_tokens, usage.output_tokens)
+        return row
+
+    def report(self, session: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-feature rows, largest first, for one session or summed over all of them"""
+        totals: Dict[str, _Usage] = {}
+        with self._lock:
+            sessions = [self._sessions.get(session, {})] if session is not None else list(self._sessions.values())
+            for features in sessions:
+                for feature, usage in features.items():
+                    total = totals.setdefault(feature, _Usage())
+                    total.calls += usage.calls
+                    total.input_tokens += usage.input_tokens
+                    total.output_tokens += usage.output_tokens
+                    total.estimated_calls += usage.estimated_calls
+        grand_total = sum(usage.total for usage in totals.values())
+        ordered = sorted(totals.items(), key=lambda item: -item[1].total)
+        return [self._row(usage, grand_total, Feature=feature) for feature, usage in ordered]
+
+    def top_consumers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """The largest session/feature pairs in the process"""
+        with self._lock:
+            pairs = [
+                (session, feature, usage)
+                for session, features in self._sessions.items()
+                for feature, usage in features.items()
+            ]
+            grand_total = sum(usage.total for _, _, usage in pairs)
+            pairs.sort(key=lambda pair: -pair[2].total)
+            return [self._row(usage, grand_total, Session=session, Feature=feature) for session, feature, usage in pairs[:limit]]
+
+
+def response_usage(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(input, output) tokens reported on a LangChain message or an OpenAI SDK response"""
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata:
+        return metadata.get("input_tokens"), metadata.get("output_tokens")
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    return None, None
+
+
+class SessionBudget:
+    """
+    One session's token allowance and the degradation it implies
+
+    Below economy_at of the limit, features run with their normal settings. Past it they
+    switch to economy settings: fewer retrieved chunks, shorter context and compact prompts.
+    Past the limit they use their minimum settings and skip optional work such as prefetch
+    translations. The limit is soft, so calls keep working but each one is as small as the
+    feature allows. A limit of 0 only counts.
+    """
+
+    def __init__(
+        self,
+        limit: int = 0,
+        economy_at: float = DEFAULT_ECONOMY_AT,
+        ledger: Optional[TokenLedger] = None,
+        session_id: Optional[str] = None,
+    ):
+        self.limit = limit
+        self.economy_at = economy_at
+        self.ledger = ledger or get_token_ledger()
+        self.session_id = session_id or secrets.token_hex(4)
+        self._last_level = NORMAL
+        self._lock = threading.Lock()
+        self._used = 0
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return max(0, self.limit - self.used) if self.limit else None
+
+    @property
+    def level(self) -> str:
+        if not self.limit:
+            return NORMAL
+        used = self.used
+        if used >= self.limit:
+            return EXHAUSTED
+        if used >= self.limit * self.economy_at:
+            return ECONOMY
+        return NORMAL
+
+    def scale(self, value: int, minimum: int = 1) -> int:
+        """A count such as retrieval k: value normally, half in economy, minimum once exhausted"""
+        level = self.level
+        if level == NORMAL:
+            return value
+        if level == ECONOMY:
+            return max(minimum, value // 2)
+        return min(value, minimum)
+
+    def context_tokens(self, tokens: int) -> int:
+        """Context allowance: tokens normally, half in economy, a quarter once exhausted"""
+        return {NORMAL: tokens, ECONOMY: tokens // 2, EXHAUSTED: tokens // 4}[self.level]
+
+    def allows_optional(self) -> bool:
+        return self.level != EXHAUSTED
+
+    def record(self, feature: str, input_tokens: int, output_tokens: int, estimated: bool = False) -> None:
+        # Worker threads of the same session record concurrently
+        with self._lock:
+            self._used += input_tokens + output_tokens
+        self.ledger.record(self.session_id, feature, input_tokens, output_tokens, estimated)
+        current = current_span()
+        if current is not None:
+            current.set_attribute("budget.session", self.session_id)
+        level = self.level
+        if level != self._last_level:
+            logger.info(f"Session {self.session_id} token budget now {level}: {self.used} of {self.limit} tokens used")
+            self._last_level = level
+
+    def record_call(self, feature: str, messages: Sequence[Any], response: Any, text: Optional[str] = None) -> None:
+        """Charge one call, from the response's usage fields or estimated from messages and reply text"""
+        input_tokens, output_tokens = response_usage(response)
+        estimated = input_tokens is None or output_tokens is None
+        if input_tokens is None:
+            input_tokens = estimate_messages(messages)
+        if output_tokens is None:
+            output_tokens = estimate_tokens(text if text is not None else _content(response))
+        self.record(feature, input_tokens, output_tokens, estimated)
+
+    def callback(self, feature: str) -> Any:
+        """LangChain callback charging every model run of an invoke() to this budget"""
+        if BudgetCallbackHandler is None:
+            raise ImportError("SessionBudget.callback() needs langchain_core")
+        return BudgetCallbackHandler(self, feature)
+
+    def report(self) -> List[Dict[str, Any]]:
+        return self.ledger.report(self.session_id)
+
+    def summary(self) -> str:
+        used = self.used
+        if not self.limit:
+            return f"{used:,} tokens used this session"
+        return f"{used:,} of {self.limit:,} tokens used this session ({self.level})"
+
+
+if BaseCallbackHandler is not None:
+    class BudgetCallbackHandler(BaseCallbackHandler):
+        """Charges each LangChain model run to a session budget under one feature name"""
+
+        def __init__(self, budget: SessionBudget, feature: str):
+            self.budget = budget
+            self.feature = feature
+            self._prompt_estimates: Dict[Any, int] = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._prompt_estimates[run_id] = sum(estimate_messages(batch) for batch in messages)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._prompt_estimates[run_id] = sum(estimate_tokens(prompt) for prompt in prompts)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            prompt_estimate = self._prompt_estimates.pop(run_id, 0)
+            input_tokens, output_tokens = usage_from_result(response)
+            estimated = input_tokens is None or output_tokens is None
+            if input_tokens is None:
+                input_tokens = prompt_estimate
+            if output_tokens is None:
+                output_tokens = sum(
+                    estimate_tokens(generation.text) for generations in response.generations for generation in generations
+                )
+            self.budget.record(self.feature, input_tokens, output_tokens, estimated)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._prompt_estimates.pop(run_id, None)
+else:
+    BudgetCallbackHandler = None
+
+
+_ledger = TokenLedger(parse_prices(os.getenv("SUTRA_TOKEN_PRICES", "")))
+
+
+def get_token_ledger() -> TokenLedger:
+    """Process-wide ledger shared by every session of an app"""
+    return _ledger
+
+
+def session_budget(session_state: Any, limit: Optional[int] = None) -> SessionBudget:
+    """
+    The budget kept in a Streamlit session_state, created on first use
+
+    limit defaults to SUTRA_SESSION_TOKEN_BUDGET and the economy threshold to
+    SUTRA_TOKEN_ECONOMY_AT. Call it from the script thread and hand the budget to worker
+    threads, since session_state is not available there.
+    """
+    budget = session_state.get(SESSION_KEY)
+    if budget is None:
+        if limit is None:
+            limit = int(os.getenv("SUTRA_SESSION_TOKEN_BUDGET", "0") or 0)
+        economy_at = float(os.getenv("SUTRA_TOKEN_ECONOMY_AT", "") or DEFAULT_ECONOMY_AT)
+        budget = SessionBudget(limit, economy_at)
+        session_state[SESSION_KEY] = budget
+    return budget
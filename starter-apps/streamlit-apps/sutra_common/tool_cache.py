@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import unicodedata
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sutra-cookbook", "tool_cache.db")
+
+# Seconds a tool result stays fresh; search results for a destination change slowly
+DEFAULT_TTLS = {
+    "search_google": 24 * 3600,
+    "search_youtube": 7 * 24 * 3600,
+}
+DEFAULT_TTL = 6 * 3600
+
+# Bookkeeping fields of SerpAPI and Serper payloads; a payload with nothing else found no results
+SEARCH_METADATA_KEYS = {"search_metadata", "search_parameters", "search_information", "searchParameters", "credits"}
+
+_WHITESPACE = re.compile(r"\s+")
+# Punctuation that is part of a search term ("C#", "50%", "AT&T") rather than around it
+_MEANINGFUL_PUNCTUATION = set("#%&@*")
+
+
+def _is_edge_punctuation(char: str) -> bool:
+    # Only punctuation and spaces; symbols ("C++", "₹") and combining marks (Indic vowel signs) stay
+    return unicodedata.category(char)[0] in "PZ" and char not in _MEANINGFUL_PUNCTUATION
+
+
+def normalize_query(text: str) -> str:
+    """Case, whitespace and surrounding punctuation do not change a search"""
+    text = unicodedata.normalize("NFC", _WHITESPACE.sub(" ", text).strip().casefold())
+    start, end = 0, len(text)
+    while start < end and _is_edge_punctuation(text[start]):
+        start += 1
+    while end > start and _is_edge_punctuation(text[end - 1]):
+        end -= 1
+    return text[start:end]
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: normalize_query(value) if isinstance(value, str) else value for name, value in arguments.items()}
+
+
+def is_cacheable(result: Any) -> bool:
+    """False for results that must not outlive the call: errors and empty search payloads"""
+    if result is None:
+        return False
+    if isinstance(result, str):
+        text = result.strip()
+        if not text or text.lower().startswith("error"):
+            return False
+        try:
+            result = json.loads(text)
+        except ValueError:
+            return True
+    if isinstance(result, dict):
+        if "error" in result:
+            return False
+        return any(value for key, value in result.items() if key not in SEARCH_METADATA_KEYS)
+    if isinstance(result, (list, tuple)):
+        return bool(result)
+    return True
+
+
+@dataclass
+class ToolStats:
+    """Hit/miss counters for one tool"""
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+    upstream_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class ToolCacheMetrics:
+    """Per-tool stats plus totals"""
+    tools: Dict[str, ToolStats] = field(default_factory=dict)
+
+    def for_tool(self, tool: str) -> ToolStats:
+        return self.tools.setdefault(tool, ToolStats())
+
+    def totals(self) -> ToolStats:
+        total = ToolStats()
+        for stats in self.tools.values():
+            total.hits += stats.hits
+            total.misses += stats.misses
+            total.saved_seconds += stats.saved_seconds
+            total.upstream_seconds += stats.upstream_seconds
+        return total
+
+
+class ToolCache:
+    """Persistent cache for agent tool calls keyed by (tool, normalized arguments)"""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL
+    ):
+        self.db_path = db_path
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.metrics = ToolCacheMetrics()
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tool_results (
+                tool TEXT NOT NULL,
+                arguments_hash TEXT NOT NULL,
+                arguments TEXT NOT NULL,
+                result TEXT NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (tool, arguments_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def ttl_for(self, tool: str) -> float:
+        return self.ttls.get(tool, self.default_ttl)
+
+    @staticmethod
+    def _arguments_key(arguments: Dict[str, Any]) -> str:
+        return json.dumps(normalize_arguments(arguments), sort_keys=True, ensure_ascii=False, default=str)
+
+    def get(self, tool: str, arguments: Dict[str, Any]) -> Optional[Tuple[Any, float]]:
+        """Fresh cached result and the latency it originally took, or None"""
+        key = self._arguments_key(arguments)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, latency, created_at FROM tool_results WHERE tool = ? AND arguments_hash = ?",
+                (tool, hashlib.sha256(key.encode("utf-8")).hexdigest())
+            ).fetchone()
+        if row is None or row[2] + self.ttl_for(tool) < time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, tool: str, arguments: Dict[str, Any], result: Any, latency: float) -> None:
+        key = self._arguments_key(arguments)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_results "
+                "(tool, arguments_hash, arguments, result, latency, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    tool,
+                    hashlib.sha256(key.encode("utf-8")).hexdigest(),
+                    key,
+                    json.dumps(result, ensure_ascii=False),
+                    latency,
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def call(
+        self,
+        tool: str,
+        fn: Callable[..., Any],
+        should_cache: Optional[Callable[[Any], bool]] = None,
+        **arguments: Any
+    ) -> Any:
+        """
+        Return fn(**arguments), served from the cache when a fresh result exists
+
+        Errors and empty payloads are never stored (see is_cacheable); should_cache can
+        reject further results.
+        """
+        cached = self.get(tool, arguments)
+        stats = self.metrics.for_tool(tool)
+        if cached is not None:
+            result, latency = cached
+            with self._lock:
+                stats.hits += 1
+                stats.saved_seconds += latency
+            return result
+
+        started = time.perf_counter()
+        result = fn(**arguments)
+        latency = time.perf_counter() - started
+        with self._lock:
+            stats.misses += 1
+            stats.upstream_seconds += latency
+        if not is_cacheable(result) or (should_cache is not None and not should_cache(result)):
+            return result
+        try:
+            self.put(tool, arguments, result, latency)
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            logger.warning(f"Could not cache {tool} result: {str(e)}")
+        return result
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many were removed"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for (tool,) in self._conn.execute("SELECT DISTINCT tool FROM tool_results").fetchall():
+                cursor = self._conn.execute(
+                    "DELETE FROM tool_results WHERE tool = ? AND created_at < ?",
+                    (tool, now - self.ttl_for(tool))
+                )
+                removed += cursor.rowcount
+            self._conn.commit()
+        return removed
+
+
+_cache: Optional[ToolCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolCache:
+    """Process-wide tool cache shared by every agent on this machine"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            db_path = os.getenv("SUTRA_TOOL_CACHE_PATH", DEFAULT_DB_PATH)
+            try:
+                _cache = ToolCache(db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open tool cache at {db_path}: {str(e)}. Using in-memory store.")
+                _cache = ToolCache(":memory:")
+        return _cache
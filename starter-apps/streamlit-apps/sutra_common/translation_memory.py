@@ -0,0 +1,329 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sutra-cookbook", "translation_memory.db")
+
+# Apps that translate line by line share this prompt, and therefore each other's entries
+SEGMENT_PROMPT_VERSION = "segments-v1"
+# Upper bounds for one translate_batch call, so a long page never overruns the model's output limit
+MAX_BATCH_SEGMENTS = 40
+MAX_BATCH_CHARS = 4000
+# Similarity a stored segment needs to stand in for a line that has no exact match
+FUZZY_MIN_SIMILARITY = 0.95
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def normalize_segment(text: str) -> str:
+    """Normalize a segment so trivially different copies share one entry"""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def segment_hash(text: str) -> str:
+    """Stable hash of a normalized source segment"""
+    return hashlib.sha256(normalize_segment(text).encode("utf-8")).hexdigest()
+
+
+def split_segments(text: str) -> List[str]:
+    """Split text into line-level segments, keeping blank lines as separators"""
+    return text.split("\n")
+
+
+def batch_segments(
+    segments: List[str], max_segments: int = MAX_BATCH_SEGMENTS, max_chars: int = MAX_BATCH_CHARS
+) -> List[List[str]]:
+    """Split segments into consecutive batches within both limits; an oversized segment gets a batch of its own"""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for segment in segments:
+        if current and (len(current) >= max_segments or size + len(segment) > max_chars):
+            batches.append(current)
+            current, size = [], 0
+        current.append(segment)
+        size += len(segment)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class LRUTier:
+    """Thread-safe in-process LRU cache in front of the on-disk store"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, str, str], value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class TranslationMemory:
+    """Segment-level translation memory keyed by (source hash, target language, prompt version)"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, lru_size: int = 4096):
+        self.db_path = db_path
+        self.lru = LRUTier(lru_size)
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                source_hash TEXT NOT NULL,
+                target_language TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                source_text TEXT NOT NULL,
+                source_length INTEGER NOT NULL,
+                translation TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (source_hash, target_language, prompt_version)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_segments_fuzzy "
+            "ON segments (target_language, prompt_version, source_length)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(text: str, target_language: str, prompt_version: str) -> Tuple[str, str, str]:
+        return (segment_hash(text), target_language.lower(), prompt_version)
+
+    def lookup(self, text: str, target_language: str, prompt_version: str) -> Optional[str]:
+        """Exact lookup, LRU tier first and SQLite second"""
+        key = self._key(text, target_language, prompt_version)
+        cached = self.lru.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM segments "
+                "WHERE source_hash = ? AND target_language = ? AND prompt_version = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE segments SET hits = hits + 1 "
+                "WHERE source_hash = ? AND target_language = ? AND prompt_version = ?",
+                key
+            )
+            self._conn.commit()
+
+        self.lru.put(key, row[0])
+        return row[0]
+
+    def lookup_fuzzy(
+        self,
+        text: str,
+        target_language: str,
+        prompt_version: str,
+        min_similarity: float = FUZZY_MIN_SIMILARITY,
+        max_candidates: int = 200
+    ) -> Optional[Tuple[str, float]]:
+        """Best fuzzy match as (translation, similarity), or None below the threshold"""
+        exact = self.lookup(text, target_language, prompt_version)
+        if exact is not None:
+            return exact, 1.0
+
+        source = normalize_segment(text)
+        if not source:
+            return None
+
+        # Only segments of similar length can reach the similarity threshold
+        low = int(len(source) * min_similarity)
+        high = int(len(source) / min_similarity) + 1
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_text, translation FROM segments "
+                "WHERE target_language = ? AND prompt_version = ? AND source_length BETWEEN ? AND ? "
+                "ORDER BY hits DESC LIMIT ?",
+                (target_language.lower(), prompt_version, low, high, max_candidates)
+            ).fetchall()
+
+        # A near match with different numbers would carry the wrong price, date or count
+        numbers = _NUMBER.findall(source)
+        best = None
+        for candidate, translation in rows:
+            matcher = SequenceMatcher(None, source, candidate, autojunk=False)
+            if matcher.real_quick_ratio() < min_similarity or matcher.quick_ratio() < min_similarity:
+                continue
+            score = matcher.ratio()
+            if score >= min_similarity and (best is None or score > best[1]) and _NUMBER.findall(candidate) == numbers:
+                best = (translation, score)
+        return best
+
+    def store(self, text: str, translation: str, target_language: str, prompt_version: str) -> None:
+        """Store one translated segment"""
+        self.store_many([(text, translation)], target_language, prompt_version)
+
+    def store_many(self, pairs: List[Tuple[str, str]], target_language: str, prompt_version: str) -> None:
+        """Store several (source, translation) segments in one transaction"""
+        rows = []
+        now = time.time()
+        for text, translation in pairs:
+            source = normalize_segment(text)
+            if not source or translation is None:
+                continue
+            key = self._key(source, target_language, prompt_version)
+            self.lru.put(key, translation)
+            rows.append((*key, source, len(source), translation, now))
+
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segments "
+                "(source_hash, target_language, prompt_version, source_text, source_length, translation, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def lookup_fields(self, fields: Dict[str, str], target_language: str, prompt_version: str) -> Dict[str, str]:
+        """Translate a dict of fields from memory; returns only the fields that were found"""
+        found = {}
+        for name, value in fields.items():
+            if not normalize_segment(value):
+                found[name] = value or ""
+                continue
+            translation = self.lookup(value, target_language, prompt_version)
+            if translation is not None:
+                found[name] = translation
+        return found
+
+    def store_fields(
+        self,
+        fields: Dict[str, str],
+        translated: Dict[str, str],
+        target_language: str,
+        prompt_version: str
+    ) -> None:
+        """Store the translated counterpart of each source field"""
+        pairs = [(fields[name], translated[name]) for name in fields if name in translated]
+        self.store_many(pairs, target_language, prompt_version)
+
+    def translate_segments(
+        self,
+        text: str,
+        target_language: str,
+        prompt_version: str,
+        translate_batch: Callable[[List[str]], List[str]],
+        min_similarity: Optional[float] = None
+    ) -> str:
+        """
+        Translate text line by line, sending only uncached segments to translate_batch
+
+        With min_similarity set, a line without an exact entry reuses the closest stored
+        segment at or above that similarity instead of being sent for translation.
+        """
+        segments = split_segments(text)
+        translated = list(segments)
+        missing: Dict[str, List[int]] = OrderedDict()
+
+        # Segments are stored without indentation; put it back so nested lists survive
+        def indented(i: int, translation: str) -> str:
+            indent = segments[i][:len(segments[i]) - len(segments[i].lstrip())]
+            return indent + translation.strip()
+
+        for i, segment in enumerate(segments):
+            if not normalize_segment(segment):
+                continue
+            if min_similarity is None:
+                hit = self.lookup(segment, target_language, prompt_version)
+            else:
+                match = self.lookup_fuzzy(segment, target_language, prompt_version, min_similarity)
+                hit = match[0] if match is not None else None
+            if hit is not None:
+                translated[i] = indented(i, hit)
+            else:
+                missing.setdefault(normalize_segment(segment), []).append(i)
+
+        # Each batch is stored as soon as it returns, so a failure later on keeps the earlier work
+        for sources in batch_segments(list(missing.keys())):
+            results = translate_batch(sources)
+            if len(results) != len(sources):
+                raise ValueError(f"Expected {len(sources)} translated segments, got {len(results)}")
+            for source, result in zip(sources, results):
+                for i in missing[source]:
+                    translated[i] = indented(i, result)
+            self.store_many(list(zip(sources, results)), target_language, prompt_version)
+
+        return "\n".join(translated)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of stored segments and total memory hits"""
+        with self._lock:
+            count, hits = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM segments").fetchone()
+        return {"segments": count, "hits": hits}
+
+
+def build_segment_prompt(segments: List[str], target_language: str) -> str:
+    """Prompt asking for one translation per segment, returned as a JSON array"""
+    return f"""Translate each string in the following JSON array to {target_language}.
+Important:
+1. Return ONLY a JSON array with the same number of strings, in the same order
+2. Keep markdown, bullet points, numbers, table formatting and emojis intact inside each string
+3. Keep proper nouns (names, places, brands) in their original form
+4. If a string is already in {target_language}, return it as is
+
+Strings to translate: {json.dumps(segments, ensure_ascii=False)}"""
+
+
+def parse_json_list(content: str) -> List[str]:
+    """Parse an LLM reply that should contain a JSON array of strings"""
+    content = content.strip().replace("```json", "").replace("```", "").strip()
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end == -1:
+        raise ValueError("No JSON array found in translation response")
+    values = json.loads(content[start:end + 1])
+    return [str(value) for value in values]
+
+
+_memory: Optional[TranslationMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Process-wide translation memory shared by every app on this machine"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            db_path = os.getenv("SUTRA_TM_PATH", DEFAULT_DB_PATH)
+            try:
+                _memory = TranslationMemory(db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open translation memory at {db_path}: {str(e)}. Using in-memory store.")
+                _memory = TranslationMemory(":memory:")
+        return _memory
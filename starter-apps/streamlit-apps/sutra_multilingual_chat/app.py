@@ -1,10 +1,16 @@
 import os
+import sys
 import streamlit as st
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 from langchain.callbacks.base import BaseCallbackHandler
 from dotenv import load_dotenv
 
+# Shared helpers live in ../sutra_common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sutra_common.endpoints import SUTRA_BASE_URL
+from sutra_common.telemetry import llm_callbacks
+
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("SUTRA_API_KEY")
@@ -48,9 +54,10 @@ class StreamHandler(BaseCallbackHandler):
 def get_base_chat_model():
     return ChatOpenAI(
         api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
+        callbacks=llm_callbacks()
     )
 
 # Create a streaming version of the model with callback handler
@@ -58,11 +65,11 @@ def get_streaming_chat_model(callback_handler=None):
     # Create a new instance with streaming enabled
     return ChatOpenAI(
         api_key=os.getenv("SUTRA_API_KEY"),
-        base_url="https://api.two.ai/v2",
+        base_url=SUTRA_BASE_URL,
         model="sutra-v2",
         temperature=0.7,
         streaming=True,
-        callbacks=[callback_handler] if callback_handler else None
+        callbacks=llm_callbacks(callback_handler)
     )
 
 # Sidebar for language selection